@@ -1,18 +1,43 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
 import xmlrpc.client
+import http.client
+import socket
 import os
 from dotenv import load_dotenv
 import datetime
 from dateutil.relativedelta import relativedelta
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import json
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextlib
+import contextvars
+import copy
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
 import psutil
 import atexit
 import re
+import sys
+import sqlite3
+import pickle
+import tempfile
+import gzip
+import hashlib
+import bisect
+import array
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; planning proration falls back to plain Python
+    np = None
+try:
+    import fcntl
+except ImportError:  # Windows: the warmer lease file is used without OS-level locking
+    fcntl = None
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -64,8 +89,18 @@ MAX_WORKERS = 3  # Number of parallel workers (match number of departments to av
 REQUEST_TIMEOUT = 45  # Timeout in seconds for parallel requests
 CONNECTION_HEALTH_CHECK_INTERVAL = 300  # Check connection health every 5 minutes
 MAX_CONSECUTIVE_FAILURES = 2  # Max consecutive failures before marking connection as unhealthy
+ODOO_POOL_SIZE = int(os.environ.get('ODOO_POOL_SIZE', '8'))  # Max concurrent XML-RPC connections to Odoo
+ODOO_POOL_IDLE_TIMEOUT = int(os.environ.get('ODOO_POOL_IDLE_TIMEOUT', '60'))  # Evict connections idle longer than this (seconds)
+ODOO_POOL_CHECKOUT_TIMEOUT = int(os.environ.get('ODOO_POOL_CHECKOUT_TIMEOUT', '30'))  # Max wait for a free connection (seconds)
+ODOO_CONNECT_TIMEOUT = float(os.environ.get('ODOO_CONNECT_TIMEOUT', '10'))  # Socket timeout for TCP/TLS connect (seconds)
+ODOO_READ_TIMEOUT = float(os.environ.get('ODOO_READ_TIMEOUT', '60'))  # Socket timeout while waiting for a response (seconds)
+ODOO_CALL_TIMEOUT = float(os.environ.get('ODOO_CALL_TIMEOUT', '60'))  # Max time a single Odoo call may take (seconds)
+ODOO_REQUEST_DEADLINE_SECONDS = float(os.environ.get('ODOO_REQUEST_DEADLINE_SECONDS', '120'))  # Odoo time budget per HTTP request
+ODOO_IO_MAX_QUEUE = int(os.environ.get('ODOO_IO_MAX_QUEUE', '64'))  # Max Odoo calls waiting for an I/O worker
 
 # Connection pool for Odoo
+# 'models' holds a pooled proxy that borrows one of up to ODOO_POOL_SIZE ServerProxy
+# instances per call, because a single ServerProxy must not be shared between threads.
 _odoo_connection_pool = {
     'models': None,
     'uid': None,
@@ -73,92 +108,449 @@ _odoo_connection_pool = {
     'lock': threading.Lock(),
     'connection_health': 'unknown',  # 'healthy', 'unhealthy', 'unknown'
     'last_health_check': None,
-    'consecutive_failures': 0
+    'consecutive_failures': 0,
+    'available': threading.Condition(),  # Guards the pool counters below
+    'idle': [],  # List of (ServerProxy, last_returned_ts), most recently used last
+    'in_use': 0,
+    'waiting': 0,
+    'created': 0,
+    'evicted': 0
 }
 
-# Cache for storing department data and holiday data
-department_cache = {
-    'creative': {},
-    'creative_strategy': {},
-    'cache_timestamps': {},  # Individual timestamps for each cache key
-    'cache_duration': 300  # 5 minutes cache duration
-}
+# Unified in-process cache: namespaced keys with a TTL per namespace, LRU eviction by entry
+# count and approximate size, a background sweeper, and hit/miss/eviction counters
+# (reported by /api/cache-status). Every process-level cache in the app lives here.
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '2000'))
+CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+CACHE_SWEEP_INTERVAL_SECONDS = int(os.environ.get('CACHE_SWEEP_INTERVAL_SECONDS', '60'))
+
+def _approx_size(value):
+    """Rough in-memory footprint of a cached value, in bytes (its JSON length)."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if hasattr(value, 'nbytes'):
+        return value.nbytes
+    if isinstance(value, dict) and any(isinstance(v, (bytes, bytearray)) for v in value.values()):
+        return sum(_approx_size(v) for v in value.values())
+    try:
+        return len(json.dumps(value, default=str))
+    except Exception:
+        return sys.getsizeof(value)
 
-# Dedicated cache for holiday data to prevent redundant fetching
-holiday_cache = {
-    'cache_data': {},  # Key format: "holidays_{company_id}_{start_date}_{end_date}"
-    'cache_timestamps': {},
-    'cache_duration': 3600  # 1 hour cache duration for holidays (they don't change frequently)
-}
+class BoundedCache:
+    """
+    Thread-safe TTL + LRU cache shared by all namespaces. Entries expire after their
+    namespace's TTL; the least recently used entries are evicted once the store holds more
+    than max_entries entries or max_bytes (approximate) bytes.
+    """
 
-# Cache for employee data to avoid redundant employee fetching
-employee_cache = {
-    'cache_data': {},  # Key format: "employees_{department_name}"
-    'cache_timestamps': {},
-    'cache_duration': 900  # 15 minutes cache duration for employee data
-}
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (namespace, key) -> {'value', 'stored_at', 'expires_at', 'size', 'version'}
+        self._namespaces = {}
+        self._bytes = 0
+
+    def namespace(self, name, ttl, evictable=True):
+        """Register a namespace (or update its TTL, in seconds). Entries of a non-evictable namespace only expire."""
+        with self._lock:
+            stats = self._namespaces.setdefault(name, {
+                'ttl': ttl, 'entries': 0, 'bytes': 0,
+                'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0
+            })
+            stats['ttl'] = ttl
+            stats['evictable'] = evictable
+
+    def _remove(self, full_key):
+        entry = self._entries.pop(full_key)
+        self._bytes -= entry['size']
+        stats = self._namespaces[full_key[0]]
+        stats['entries'] -= 1
+        stats['bytes'] -= entry['size']
+        return entry
+
+    def _lookup(self, namespace, key, now):
+        full_key = (namespace, key)
+        entry = self._entries.get(full_key)
+        stats = self._namespaces[namespace]
+        if entry is not None and entry['expires_at'] <= now:
+            self._remove(full_key)
+            stats['expirations'] += 1
+            entry = None
+        if entry is None:
+            stats['misses'] += 1
+            return None
+        self._entries.move_to_end(full_key)
+        stats['hits'] += 1
+        return entry
+
+    def get(self, namespace, key, default=None):
+        with self._lock:
+            entry = self._lookup(namespace, key, time.time())
+            return default if entry is None else entry['value']
+
+    def get_with_timestamp(self, namespace, key):
+        """(value, stored_at) of a live entry, or (None, None)."""
+        with self._lock:
+            entry = self._lookup(namespace, key, time.time())
+            return (None, None) if entry is None else (entry['value'], entry['stored_at'])
+
+    def get_versioned(self, namespace, key):
+        """(value, version) of a live entry, or (None, None); pass the version to compare_and_set()."""
+        with self._lock:
+            entry = self._lookup(namespace, key, time.time())
+            return (None, None) if entry is None else (entry['value'], entry['version'])
+
+    def compare_and_set(self, namespace, key, value, expected_version, ttl=None):
+        """Store value only if the entry still has expected_version (None = must not exist)."""
+        size = _approx_size(value)
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry['expires_at'] <= time.time():
+                entry = None
+            if (None if entry is None else entry['version']) != expected_version:
+                return False
+            self._store(namespace, key, value, ttl, size)
+            return True
+
+    def set(self, namespace, key, value, ttl=None):
+        size = _approx_size(value)
+        with self._lock:
+            self._store(namespace, key, value, ttl, size)
+
+    def _store(self, namespace, key, value, ttl, size):
+        # Caller holds self._lock
+        now = time.time()
+        stats = self._namespaces[namespace]
+        full_key = (namespace, key)
+        version = 1
+        if full_key in self._entries:
+            version = self._remove(full_key)['version'] + 1
+        if size > self.max_bytes:
+            # Would evict everything else and still not fit
+            stats['evictions'] += 1
+            return
+        self._entries[full_key] = {
+            'value': value,
+            'stored_at': now,
+            'expires_at': now + (stats['ttl'] if ttl is None else ttl),
+            'size': size,
+            'version': version
+        }
+        self._bytes += size
+        stats['entries'] += 1
+        stats['bytes'] += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            evicted_key = next((k for k in self._entries if self._namespaces[k[0]]['evictable']), None)
+            if evicted_key is None:
+                break
+            self._remove(evicted_key)
+            self._namespaces[evicted_key[0]]['evictions'] += 1
+
+    def delete(self, namespace, key):
+        with self._lock:
+            if (namespace, key) in self._entries:
+                self._remove((namespace, key))
+
+    def clear(self, namespace=None):
+        with self._lock:
+            for full_key in [k for k in self._entries if namespace is None or k[0] == namespace]:
+                self._remove(full_key)
+
+    def keys(self, namespace):
+        """Keys of the live (unexpired) entries of a namespace."""
+        now = time.time()
+        with self._lock:
+            return [k[1] for k, entry in self._entries.items() if k[0] == namespace and entry['expires_at'] > now]
+
+    def sweep(self):
+        """Drop expired entries; returns how many were removed."""
+        now = time.time()
+        with self._lock:
+            expired = [k for k, entry in self._entries.items() if entry['expires_at'] <= now]
+            for full_key in expired:
+                self._remove(full_key)
+                self._namespaces[full_key[0]]['expirations'] += 1
+            return len(expired)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'namespaces': {name: dict(stats) for name, stats in self._namespaces.items()}
+            }
 
-cache_lock = threading.Lock()
+class SQLiteCache:
+    """
+    Cache backend with the BoundedCache interface, stored in a SQLite database in WAL mode so
+    every worker process on the host shares one cache (and one set of Odoo results).
+    Values are pickled; LRU eviction uses the last access time across all processes. Reads do
+    not write: each process batches its access times and records them with its next write or
+    sweep (at most every TOUCH_FLUSH_SECONDS). Hit/miss/eviction counters are per process.
+    """
+    TOUCH_FLUSH_SECONDS = 30
+
+    def __init__(self, path, max_entries, max_bytes):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._namespaces = {}
+        self._touched = {}  # (namespace, repr(key)) -> last access time not yet written
+        self._touches_flushed_at = time.time()
+        with contextlib.closing(sqlite3.connect(path, timeout=30)) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    key_blob BLOB NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    stored_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    version INTEGER NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )""")
+            conn.execute('CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (accessed_at)')
+            conn.commit()
+
+    def _conn(self):
+        # One connection per thread; autocommit mode with explicit BEGIN IMMEDIATE for writes
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _count(self, namespace, counter, delta=1):
+        with self._lock:
+            self._namespaces[namespace][counter] += delta
+
+    def namespace(self, name, ttl, evictable=True):
+        with self._lock:
+            stats = self._namespaces.setdefault(name, {
+                'ttl': ttl, 'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0
+            })
+            stats['ttl'] = ttl
+            stats['evictable'] = evictable
+
+    def _flush_touches(self, conn):
+        # Caller holds a write transaction
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._touches_flushed_at = time.time()
+        if touched:
+            conn.executemany('UPDATE cache_entries SET accessed_at = MAX(accessed_at, ?) WHERE namespace = ? AND key = ?',
+                             [(accessed_at, namespace, key) for (namespace, key), accessed_at in touched.items()])
+
+    def _lookup(self, namespace, key):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute('SELECT value, stored_at, expires_at, version FROM cache_entries WHERE namespace = ? AND key = ?',
+                           (namespace, repr(key))).fetchone()
+        if row is not None and row[2] <= now:
+            row = None
+        if row is None:
+            self._count(namespace, 'misses')
+            return None
+        with self._lock:
+            self._touched[(namespace, repr(key))] = now
+        self._count(namespace, 'hits')
+        return pickle.loads(row[0]), row[1], row[3]
+
+    def get(self, namespace, key, default=None):
+        found = self._lookup(namespace, key)
+        return default if found is None else found[0]
+
+    def get_with_timestamp(self, namespace, key):
+        found = self._lookup(namespace, key)
+        return (None, None) if found is None else (found[0], found[1])
+
+    def get_versioned(self, namespace, key):
+        found = self._lookup(namespace, key)
+        return (None, None) if found is None else (found[0], found[2])
+
+    def _write(self, namespace, key, value, ttl, expected_version=None, check_version=False):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            self._count(namespace, 'evictions')
+            return False
+        now = time.time()
+        with self._lock:
+            expires_at = now + (self._namespaces[namespace]['ttl'] if ttl is None else ttl)
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT version, expires_at FROM cache_entries WHERE namespace = ? AND key = ?',
+                               (namespace, repr(key))).fetchone()
+            current_version = row[0] if row is not None and row[1] > now else None
+            if check_version and current_version != expected_version:
+                conn.execute('ROLLBACK')
+                return False
+            conn.execute('INSERT OR REPLACE INTO cache_entries '
+                         '(namespace, key, key_blob, value, size, stored_at, expires_at, accessed_at, version) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         (namespace, repr(key), pickle.dumps(key), blob, len(blob), now, expires_at, now,
+                          (row[0] + 1) if row is not None else 1))
+            self._flush_touches(conn)
+            evicted = self._evict(conn)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        for evicted_namespace in evicted:
+            if evicted_namespace in self._namespaces:
+                self._count(evicted_namespace, 'evictions')
+        return True
+
+    def _evict(self, conn):
+        count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries').fetchone()
+        evicted = []
+        if count <= self.max_entries and total <= self.max_bytes:
+            return evicted
+        with self._lock:
+            pinned = [name for name, stats in self._namespaces.items() if not stats['evictable']]
+        for namespace, key, size in conn.execute(
+                f"SELECT namespace, key, size FROM cache_entries WHERE namespace NOT IN ({','.join('?' * len(pinned))}) "
+                'ORDER BY accessed_at', pinned).fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', (namespace, key))
+            count -= 1
+            total -= size
+            evicted.append(namespace)
+        return evicted
+
+    def set(self, namespace, key, value, ttl=None):
+        self._write(namespace, key, value, ttl)
+
+    def compare_and_set(self, namespace, key, value, expected_version, ttl=None):
+        """Atomically store value only if the entry still has expected_version (None = must not exist)."""
+        return self._write(namespace, key, value, ttl, expected_version, check_version=True)
+
+    def delete(self, namespace, key):
+        self._conn().execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', (namespace, repr(key)))
+
+    def clear(self, namespace=None):
+        if namespace is None:
+            self._conn().execute('DELETE FROM cache_entries')
+        else:
+            self._conn().execute('DELETE FROM cache_entries WHERE namespace = ?', (namespace,))
+
+    def keys(self, namespace):
+        rows = self._conn().execute('SELECT key_blob FROM cache_entries WHERE namespace = ? AND expires_at > ?',
+                                    (namespace, time.time())).fetchall()
+        return [pickle.loads(row[0]) for row in rows]
+
+    def sweep(self):
+        conn = self._conn()
+        now = time.time()
+        if self._touched and now - self._touches_flushed_at >= self.TOUCH_FLUSH_SECONDS:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._flush_touches(conn)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        rows = conn.execute('SELECT namespace, COUNT(*) FROM cache_entries WHERE expires_at <= ? GROUP BY namespace', (now,)).fetchall()
+        conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (now,))
+        for namespace, count in rows:
+            if namespace in self._namespaces:
+                self._count(namespace, 'expirations', count)
+        return sum(count for _, count in rows)
+
+    def stats(self):
+        rows = self._conn().execute('SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries GROUP BY namespace').fetchall()
+        sizes = {namespace: (count, total) for namespace, count, total in rows}
+        with self._lock:
+            namespaces = {name: dict(stats, entries=sizes.get(name, (0, 0))[0], bytes=sizes.get(name, (0, 0))[1])
+                          for name, stats in self._namespaces.items()}
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'entries': sum(count for count, _ in sizes.values()),
+            'bytes': sum(total for _, total in sizes.values()),
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'namespaces': namespaces
+        }
+
+# CACHE_BACKEND=memory keeps the cache in this process; CACHE_BACKEND=sqlite shares it
+# between all worker processes on the host through CACHE_SQLITE_PATH.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory').lower()
+CACHE_SQLITE_PATH = os.environ.get('CACHE_SQLITE_PATH',
+                                   os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache.sqlite3'))
+
+def create_cache_store():
+    if CACHE_BACKEND == 'sqlite':
+        try:
+            return SQLiteCache(CACHE_SQLITE_PATH, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+        except Exception as e:
+            print(f"Could not open shared cache at {CACHE_SQLITE_PATH}, using in-process cache: {e}")
+    return BoundedCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+
+cache_store = create_cache_store()
+
+# Leases: short-lived cache entries taken with compare_and_set, so only one worker
+# (across processes when the backend is shared) recomputes a given key at a time.
+# Never evicted under cache pressure: a lease only ends when released or expired.
+CACHE_LEASE_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+cache_store.namespace('leases', 60, evictable=False)
+
+def acquire_cache_lease(name, ttl):
+    """Take (or renew, if already ours) the lease `name` for `ttl` seconds; False if another worker holds it."""
+    holder, version = cache_store.get_versioned('leases', name)
+    if holder is not None and holder != CACHE_LEASE_OWNER:
+        return False
+    return cache_store.compare_and_set('leases', name, CACHE_LEASE_OWNER, version, ttl=ttl)
+
+def release_cache_lease(name):
+    holder, version = cache_store.get_versioned('leases', name)
+    if holder == CACHE_LEASE_OWNER:
+        # Expire it immediately; compare_and_set keeps us from dropping a lease someone else just took
+        cache_store.compare_and_set('leases', name, CACHE_LEASE_OWNER, version, ttl=0)
+
+# Department dashboard data per (department key, period/view). Entries are fresh for
+# DEPARTMENT_CACHE_TTL_SECONDS; with stale-while-revalidate on, older entries are still
+# served (and refreshed in the background) until DEPARTMENT_CACHE_MAX_STALE_SECONDS later.
+DEPARTMENT_CACHE_TTL_SECONDS = int(os.environ.get('DEPARTMENT_CACHE_TTL_SECONDS', '300'))  # 5 minutes by default
+DEPARTMENT_CACHE_STALE_WHILE_REVALIDATE = os.environ.get('DEPARTMENT_CACHE_STALE_WHILE_REVALIDATE', 'true').lower() in ('1', 'true', 'yes')
+DEPARTMENT_CACHE_MAX_STALE_SECONDS = int(os.environ.get('DEPARTMENT_CACHE_MAX_STALE_SECONDS', '3600'))
+cache_store.namespace('department', DEPARTMENT_CACHE_TTL_SECONDS +
+                      (DEPARTMENT_CACHE_MAX_STALE_SECONDS if DEPARTMENT_CACHE_STALE_WHILE_REVALIDATE else 0))
+
+# Public holiday index per (company, year), to prevent redundant fetching (they don't change frequently)
+cache_store.namespace('holidays', 3600)
 
 def get_cache_key(prefix, *args):
     """Generate a cache key from prefix and arguments"""
     return f"{prefix}_{'_'.join(str(arg) for arg in args if arg is not None)}"
 
-def is_cache_valid(cache_dict, key):
-    """Check if cache entry is still valid"""
-    if key not in cache_dict['cache_data']:
-        return False
-    
-    timestamp = cache_dict['cache_timestamps'].get(key, 0)
-    return (time.time() - timestamp) < cache_dict['cache_duration']
-
-def get_from_cache(cache_dict, key):
-    """Get data from cache if valid"""
-    with cache_lock:
-        if is_cache_valid(cache_dict, key):
-            return cache_dict['cache_data'][key]
-    return None
-
-def set_cache(cache_dict, key, data):
-    """Set data in cache with timestamp"""
-    with cache_lock:
-        cache_dict['cache_data'][key] = data
-        cache_dict['cache_timestamps'][key] = time.time()
-
 def clear_expired_cache():
     """Clear expired cache entries"""
-    with cache_lock:
-        current_time = time.time()
-        
-        # Clear expired department cache
-        expired_keys = []
-        for key, timestamp in department_cache['cache_timestamps'].items():
-            if current_time - timestamp > department_cache['cache_duration']:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            department_cache['cache_data'].pop(key, None)
-            department_cache['cache_timestamps'].pop(key, None)
-        
-        # Clear expired holiday cache
-        expired_keys = []
-        for key, timestamp in holiday_cache['cache_timestamps'].items():
-            if current_time - timestamp > holiday_cache['cache_duration']:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            holiday_cache['cache_data'].pop(key, None)
-            holiday_cache['cache_timestamps'].pop(key, None)
-        
-        # Clear expired employee cache
-        expired_keys = []
-        for key, timestamp in employee_cache['cache_timestamps'].items():
-            if current_time - timestamp > employee_cache['cache_duration']:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            employee_cache['cache_data'].pop(key, None)
-            employee_cache['cache_timestamps'].pop(key, None)
+    removed = cache_store.sweep()
+    if removed:
+        print(f"Cache sweeper removed {removed} expired entries")
+    return removed
+
+_cache_sweep_stop = threading.Event()
+
+def _cache_sweeper_loop():
+    while not _cache_sweep_stop.wait(CACHE_SWEEP_INTERVAL_SECONDS):
+        try:
+            clear_expired_cache()
+        except Exception as e:
+            print(f"Cache sweep failed: {e}")
 
 # Helper functions for time formatting
 def decimal_hours_to_hm_format(decimal_hours):
@@ -308,121 +700,782 @@ def should_use_google_sheets(period):
 
 
 
-# Simple LRU/TTL cache for employee category names to avoid repeated reads
-CATEGORY_CACHE_TTL_SECONDS = int(os.environ.get('CATEGORY_CACHE_TTL_SECONDS', '3600'))
-_category_cache_lock = threading.Lock()
-_category_cache = {}  # id -> { 'name': str, 'ts': float }
+# "Time Off" project.task ids, resolved once so timesheet domains filter on task_id instead of joining task names
+TIME_OFF_TASK_NAME = 'Time Off'
+TIME_OFF_TASK_CACHE_TTL_SECONDS = int(os.environ.get('TIME_OFF_TASK_CACHE_TTL_SECONDS', '3600'))
+cache_store.namespace('time_off_tasks', TIME_OFF_TASK_CACHE_TTL_SECONDS)
 
-def get_category_names_cached(models, uid, category_ids):
-    """Return mapping of category_id -> name using a process cache with TTL; fetch missing in one batch."""
-    if not category_ids:
-        return {}
-    now_ts = time.time()
-    missing_ids = []
-    result = {}
-    with _category_cache_lock:
-        for cid in category_ids:
-            cached = _category_cache.get(cid)
-            if cached and (now_ts - cached['ts'] <= CATEGORY_CACHE_TTL_SECONDS) and cached.get('name'):
-                result[cid] = cached['name']
-            else:
-                missing_ids.append(cid)
-    if missing_ids:
-        try:
-            categories = models.execute_kw(
-                ODOO_DB, uid, ODOO_PASSWORD,
-                'hr.employee.category', 'read',
-                [list(set(missing_ids))], {'fields': ['name']}
-            )
-            with _category_cache_lock:
-                for cat in categories:
-                    name = cat.get('name')
-                    cid = cat.get('id')
-                    if cid is None:
-                        continue
-                    _category_cache[cid] = {'name': name, 'ts': now_ts}
-                    result[cid] = name
-        except Exception as e:
-            # If fetch fails, return what we have
-            print(f"Category cache fetch failed: {e}")
-    return result
+def get_time_off_task_ids(models, uid):
+    """Return the ids of all (including archived) "Time Off" tasks, cached with TTL."""
+    task_ids = cache_store.get('time_off_tasks', TIME_OFF_TASK_NAME)
+    if task_ids is not None:
+        return task_ids
+    task_ids = models.execute_kw(
+        ODOO_DB, uid, ODOO_PASSWORD,
+        'project.task', 'search',
+        [[('name', '=', TIME_OFF_TASK_NAME)]],
+        {'context': {'active_test': False}}
+    )
+    task_ids = frozenset(task_ids or [])
+    cache_store.set('time_off_tasks', TIME_OFF_TASK_NAME, task_ids)
+    print(f"Resolved {len(task_ids)} '{TIME_OFF_TASK_NAME}' task ids")
+    return task_ids
+
+def time_off_task_domain(models, uid, time_off=True):
+    """Domain term selecting (time_off=True) or excluding (time_off=False) Time Off timesheet lines."""
+    return ('task_id', 'in' if time_off else 'not in', sorted(get_time_off_task_ids(models, uid)))
+
+# Access-driven warming: every dashboard request records its (department, period, view, include)
+# key with an exponentially decaying score; the warmer refreshes the top keys before they expire
+# and adjacent periods are prefetched as soon as a user opens a period.
+CACHE_WARM_TOP_K = int(os.environ.get('CACHE_WARM_TOP_K', '12'))
+CACHE_WARM_ODOO_CALL_BUDGET = int(os.environ.get('CACHE_WARM_ODOO_CALL_BUDGET', '400'))
+CACHE_ACCESS_HALF_LIFE_SECONDS = int(os.environ.get('CACHE_ACCESS_HALF_LIFE_SECONDS', '21600'))
+CACHE_ACCESS_MAX_KEYS = 500
+CACHE_PREFETCH_ADJACENT = os.environ.get('CACHE_PREFETCH_ADJACENT', 'true').lower() in ('1', 'true', 'yes')
+_cache_access = {'lock': threading.Lock(), 'keys': {}}  # (department key, period, view_type, include) -> {'score', 'ts'}
+
+def _decayed_score(entry, now):
+    return entry['score'] * 0.5 ** ((now - entry['ts']) / CACHE_ACCESS_HALF_LIFE_SECONDS)
+
+def record_department_access(department_keys, period, view_type, include):
+    """Count one request for each department's (period, view_type, include) key."""
+    if not period:
+        return
+    now = time.time()
+    include_key = tuple(sorted(include or ()))
+    with _cache_access['lock']:
+        keys = _cache_access['keys']
+        for department in department_keys:
+            key = (department, period, view_type, include_key)
+            entry = keys.get(key)
+            score = _decayed_score(entry, now) if entry else 0.0
+            keys[key] = {'score': score + 1.0, 'ts': now}
+        if len(keys) > CACHE_ACCESS_MAX_KEYS:
+            ranked = sorted(keys, key=lambda k: _decayed_score(keys[k], now))
+            for key in ranked[:len(keys) - CACHE_ACCESS_MAX_KEYS]:
+                del keys[key]
+
+def top_accessed_departments(limit):
+    """[((department key, period, view_type), score)] by decayed score, include variants summed."""
+    now = time.time()
+    scores = defaultdict(float)
+    with _cache_access['lock']:
+        for (department, period, view_type, _include), entry in _cache_access['keys'].items():
+            scores[(department, period, view_type)] += _decayed_score(entry, now)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+def _week_period_for_date(day):
+    """'YYYY-WW' of the Sunday-Saturday week containing `day`, matching get_date_range."""
+    days_since_sunday = (day.weekday() - 6) % 7
+    week_start = day - datetime.timedelta(days=days_since_sunday)
+    # Number the week within the year its Sunday falls in (early-January days belong to December's week)
+    start_of_year = datetime.date(week_start.year, 1, 1)
+    days_until_sunday = (6 - start_of_year.weekday()) % 7
+    first_sunday = start_of_year + datetime.timedelta(days=days_until_sunday)
+    week_number = max(((week_start - first_sunday).days // 7) + 1, 1)
+    return f"{week_start.year}-{week_number:02d}"
+
+def adjacent_periods(period, view_type='monthly'):
+    """The previous and next period of a monthly/weekly period, skipping periods that have not started."""
+    try:
+        start_date, _ = get_date_range(view_type, period)
+        if view_type == 'monthly':
+            candidates = [(start_date + relativedelta(months=delta)).strftime('%Y-%m') for delta in (-1, 1)]
+        elif view_type == 'weekly':
+            candidates = [_week_period_for_date(start_date + datetime.timedelta(days=delta)) for delta in (-7, 7)]
+        else:
+            return []
+    except Exception:
+        return []
+    today = datetime.date.today()
+    return [p for p in candidates if p != period and get_date_range(view_type, p)[0] <= today]
+
+def prefetch_adjacent_periods(department_keys, period, view_type='monthly'):
+    """Compute neighbouring periods in the background so navigating to them is instant."""
+    if not CACHE_PREFETCH_ADJACENT or not period:
+        return
+    for adjacent in adjacent_periods(period, view_type):
+        for department in department_keys:
+            # get_cached_entry also schedules revalidation of stale neighbours
+            if get_cached_entry(department, adjacent, view_type)[0] is None:
+                schedule_department_refresh(department, adjacent, view_type)
+
+def _department_needs_warming(department, period, view_type):
+    """True when the entry is missing or will expire before the next warmer cycle."""
+    if is_closed_period(period, view_type) and load_closed_period_data(department, period, view_type) is not None:
+        return False
+    _, stored_at = cache_store.get_with_timestamp('department', (department, department_cache_key(period, view_type)))
+    return stored_at is None or time.time() - stored_at + CACHE_WARM_INTERVAL_SECONDS > DEPARTMENT_CACHE_TTL_SECONDS
 
 # Background cache warmer to precompute hot datasets periodically
 CACHE_WARM_INTERVAL_SECONDS = int(os.environ.get('CACHE_WARM_INTERVAL_SECONDS', '600'))
 def _warm_cache_once():
+    # The budget is a hard cap enforced on every Odoo call of the run, worker threads included
+    with odoo_read_memo(), odoo_call_budget(CACHE_WARM_ODOO_CALL_BUDGET):
+        _warm_cache_run()
+
+def _warm_cache_candidates():
+    """Current month and week for every department, then the most requested keys."""
+    today = datetime.date.today()
+    candidates = []
+    for view_type, period in (('monthly', today.strftime('%Y-%m')), ('weekly', _week_period_for_date(today))):
+        for department in DEPARTMENT_KEY_NAMES:
+            candidates.append((department, period, view_type))
+    for key, _score in top_accessed_departments(CACHE_WARM_TOP_K):
+        if key not in candidates:
+            candidates.append(key)
+    return candidates
+
+def _warm_cache_run():
     try:
         models, uid = connect_to_odoo()
         if not models or not uid:
             return
-        # Warm current month and current week for all departments
-        today = datetime.date.today()
-        period_month = today.strftime('%Y-%m')
-        # ISO week; ensure two digits
-        iso_week = today.isocalendar()[1]
-        period_week = f"{today.year}-{iso_week:02d}"
-        for view_type, period in (('monthly', period_month), ('weekly', period_week)):
-            for dept in ('Creative', 'Creative Strategy', 'Instructional Design'):
+        # Group departments needing a refresh by period so each period is fetched with one snapshot
+        due = OrderedDict()
+        for department, period, view_type in _warm_cache_candidates():
+            if _department_needs_warming(department, period, view_type):
+                due.setdefault((period, view_type), []).append(department)
+        refreshed = 0
+        for (period, view_type), departments in due.items():
+            if odoo_call_budget_exhausted():
+                print(f"Cache warmer stopped: Odoo call budget of {CACHE_WARM_ODOO_CALL_BUDGET} calls used up")
+                break
+            try:
+                snapshot = build_department_snapshot(period, view_type, [DEPARTMENT_KEY_NAMES[d] for d in departments])
+            except Exception as e:
+                print(f"Cache warmer could not fetch {view_type} {period}: {e}")
+                continue
+            for department in departments:
                 try:
-                    data = fetch_department_data_parallel(dept, period, view_type)
+                    data = fetch_department_data_parallel(DEPARTMENT_KEY_NAMES[department], period, view_type, snapshot)
                     if data:
-                        key = 'creative' if dept == 'Creative' else 'creative_strategy' if dept == 'Creative Strategy' else 'instructional_design'
-                        set_cached_data(key, data, period, view_type)
-                except Exception as _e:
-                    continue
-    except Exception:
-        pass
+                        refreshed += 1
+                except Exception as e:
+                    print(f"Cache warmer could not refresh {department} {view_type} {period}: {e}")
+        print(f"Cache warmer refreshed {refreshed} department entries across {len(due)} periods")
+    except Exception as e:
+        print(f"Cache warmer run failed: {e}")
+
+# Only one process per host warms: the leader holds a lease file and renews its heartbeat
+# every CACHE_WARMER_HEARTBEAT_SECONDS; if the heartbeat is older than CACHE_WARMER_LEASE_SECONDS
+# (leader died or hung) another process takes over.
+CACHE_WARMER_LEASE_PATH = os.environ.get('CACHE_WARMER_LEASE_PATH',
+                                         os.path.join(tempfile.gettempdir(), f"dashboard-cache-warmer-{ODOO_DB}.lease"))
+CACHE_WARMER_HEARTBEAT_SECONDS = int(os.environ.get('CACHE_WARMER_HEARTBEAT_SECONDS', '15'))
+CACHE_WARMER_LEASE_SECONDS = int(os.environ.get('CACHE_WARMER_LEASE_SECONDS', '60'))
+CACHE_WARMER_MAX_BACKOFF_SECONDS = int(os.environ.get('CACHE_WARMER_MAX_BACKOFF_SECONDS', '3600'))
+CACHE_WARMER_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+_cache_warmer_state = {
+    'lock': threading.Lock(),
+    'is_leader': False,
+    'leader_since': None,
+    'takeovers': 0,
+    'runs': 0,
+    'last_run': None,
+    'unhealthy_streak': 0,
+    'next_run': 0
+}
+
+def _update_warmer_lease(release=False):
+    """
+    Read-modify-write the lease file under an exclusive file lock. Claims (or renews) the
+    lease when it is free, ours, or its heartbeat is stale; returns True if we hold it.
+    With release=True, gives up our lease instead.
+    """
+    with open(CACHE_WARMER_LEASE_PATH, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            raw = f.read()
+            try:
+                lease = json.loads(raw) if raw.strip() else {}
+            except ValueError:
+                lease = {}
+            now = time.time()
+            owner = lease.get('owner')
+            if release:
+                if owner == CACHE_WARMER_OWNER:
+                    f.seek(0)
+                    f.truncate()
+                return False
+            if owner not in (None, CACHE_WARMER_OWNER) and now - float(lease.get('heartbeat') or 0) <= CACHE_WARMER_LEASE_SECONDS:
+                return False
+            if owner not in (None, CACHE_WARMER_OWNER):
+                print(f"Cache warmer leader {owner} missed its heartbeat; {CACHE_WARMER_OWNER} taking over")
+                with _cache_warmer_state['lock']:
+                    _cache_warmer_state['takeovers'] += 1
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps({'owner': CACHE_WARMER_OWNER, 'heartbeat': now}))
+            f.flush()
+            return True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def _cache_warmer_heartbeat():
+    """Claim or renew warmer leadership; returns True if this process is the leader."""
+    try:
+        is_leader = _update_warmer_lease()
+    except Exception as e:
+        print(f"Cache warmer lease update failed: {e}")
+        is_leader = False
+    with _cache_warmer_state['lock']:
+        if is_leader and not _cache_warmer_state['is_leader']:
+            print(f"Cache warmer leadership acquired by {CACHE_WARMER_OWNER}")
+            _cache_warmer_state['leader_since'] = time.time()
+        elif not is_leader:
+            _cache_warmer_state['leader_since'] = None
+        _cache_warmer_state['is_leader'] = is_leader
+    return is_leader
+
+def _odoo_connection_unhealthy():
+    if get_connection_status()['connection_health'] != 'unhealthy':
+        return False
+    # Probe once (authenticate + one cheap call) instead of running a full warm against a broken Odoo
+    connect_to_odoo()
+    return get_connection_status()['connection_health'] == 'unhealthy'
+
+def _cache_warm_if_due():
+    state = _cache_warmer_state
+    now = time.time()
+    if now < state['next_run']:
+        return
+    if _odoo_connection_unhealthy():
+        with state['lock']:
+            delay = min(CACHE_WARM_INTERVAL_SECONDS * (2 ** state['unhealthy_streak']), CACHE_WARMER_MAX_BACKOFF_SECONDS)
+            state['unhealthy_streak'] += 1
+            state['next_run'] = now + delay
+        print(f"Odoo connection unhealthy; cache warmer backing off for {delay}s")
+        return
+    _warm_cache_once()
+    with state['lock']:
+        state['unhealthy_streak'] = 0
+        state['runs'] += 1
+        state['last_run'] = time.time()
+        state['next_run'] = time.time() + CACHE_WARM_INTERVAL_SECONDS
 
 _cache_warm_thread = None
+_cache_heartbeat_thread = None
 _cache_warm_stop = threading.Event()
 
+def _cache_heartbeat_loop():
+    # Separate from the warmer loop so a long warm run does not let the lease go stale
+    while not _cache_warm_stop.is_set():
+        _cache_warmer_heartbeat()
+        _cache_warm_stop.wait(CACHE_WARMER_HEARTBEAT_SECONDS)
+
 def _cache_warmer_loop():
     while not _cache_warm_stop.is_set():
-        _warm_cache_once()
-        _cache_warm_stop.wait(CACHE_WARM_INTERVAL_SECONDS)
+        if _cache_warmer_state['is_leader']:
+            try:
+                _cache_warm_if_due()
+            except Exception as e:
+                print(f"Cache warmer run failed: {e}")
+        _cache_warm_stop.wait(CACHE_WARMER_HEARTBEAT_SECONDS)
 
 def start_cache_warmer():
-    global _cache_warm_thread
+    global _cache_warm_thread, _cache_heartbeat_thread
+    if _cache_heartbeat_thread is None or not _cache_heartbeat_thread.is_alive():
+        _cache_heartbeat_thread = threading.Thread(target=_cache_heartbeat_loop, daemon=True, name='cache-warmer-heartbeat')
+        _cache_heartbeat_thread.start()
     if _cache_warm_thread is None or not _cache_warm_thread.is_alive():
-        _cache_warm_thread = threading.Thread(target=_cache_warmer_loop, daemon=True)
+        _cache_warm_thread = threading.Thread(target=_cache_warmer_loop, daemon=True, name='cache-warmer')
         _cache_warm_thread.start()
 
 def stop_cache_warmer():
     _cache_warm_stop.set()
+    try:
+        _update_warmer_lease(release=True)
+    except Exception as e:
+        print(f"Cache warmer could not release its lease: {e}")
 
-# Start warmer on import and ensure it stops on exit
-start_cache_warmer()
-atexit.register(stop_cache_warmer)
+def get_cache_warmer_status():
+    with _cache_warmer_state['lock']:
+        return {
+            'owner': CACHE_WARMER_OWNER,
+            'is_leader': _cache_warmer_state['is_leader'],
+            'leader_since': _cache_warmer_state['leader_since'],
+            'takeovers': _cache_warmer_state['takeovers'],
+            'runs': _cache_warmer_state['runs'],
+            'last_run': _cache_warmer_state['last_run'],
+            'next_run': _cache_warmer_state['next_run'],
+            'unhealthy_streak': _cache_warmer_state['unhealthy_streak']
+        }
 
-# Cache: resource.calendar.id -> set of working weekdays (Mon=0..Sun=6)
-calendar_weekdays_cache = {}
+# Change detection: poll Odoo for records written since the last check and invalidate only the
+# cached (department, period) entries whose date range those records touch, so department data can
+# be cached for hours without going out of date. Deleted records are not seen by write_date.
+# Only the cache warmer leader polls Odoo; it records each change in a journal on the host that
+# every worker process applies to its own caches, so a change costs one poll and one re-warm.
+CHANGE_DETECTION_INTERVAL_SECONDS = int(os.environ.get('CHANGE_DETECTION_INTERVAL_SECONDS', '60'))
+CHANGE_DETECTION_MAX_RECORDS = 2000  # Above this many changes in one poll, invalidate everything
+CHANGE_JOURNAL_PATH = (os.environ.get('CHANGE_JOURNAL_PATH')
+                       or os.path.join(tempfile.gettempdir(), f"dashboard-changes-{ODOO_DB}.sqlite3"))
+CHANGE_JOURNAL_RETENTION_SECONDS = 86400
+# model -> (date fields giving the affected range, or () when a change can affect any period)
+CHANGE_DETECTION_MODELS = {
+    'account.analytic.line': ('date', 'date'),
+    'planning.slot': ('start_datetime', 'end_datetime'),
+    'resource.calendar.leaves': ('date_from', 'date_to'),
+    'hr.employee': (),
+    'hr.department': (),
+    'resource.calendar': ()
+}
+_change_detection = {
+    'lock': threading.Lock(),
+    'apply_lock': threading.RLock(),
+    'initialized': False,
+    'last_write_date': {},  # model -> newest write_date seen by this process as leader (Odoo UTC string)
+    'applied_seq': 0,  # newest journal entry applied by this process
+    'polls': 0,
+    'changes': 0,
+    'published': 0,
+    'applied': 0,
+    'invalidated': 0,
+    'last_poll': None
+}
+
+def _open_change_journal():
+    conn = sqlite3.connect(CHANGE_JOURNAL_PATH, timeout=10)
+    if not _change_detection['initialized']:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                ranges TEXT,
+                holidays INTEGER NOT NULL,
+                reference INTEGER NOT NULL
+            )""")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS watermarks (
+                model TEXT PRIMARY KEY,
+                write_date TEXT NOT NULL,
+                ids TEXT NOT NULL
+            )""")
+        conn.commit()
+        # A new process starts with empty caches: only changes published from now on concern it
+        _change_detection['applied_seq'] = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM changes').fetchone()[0]
+        _change_detection['initialized'] = True
+    return conn
+
+def _odoo_date(value):
+    return datetime.datetime.strptime(str(value)[:10], '%Y-%m-%d').date() if value else None
+
+def _save_change_watermark(conn, model_name, write_date, ids):
+    conn.execute('INSERT OR REPLACE INTO watermarks (model, write_date, ids) VALUES (?, ?, ?)',
+                 (model_name, write_date, json.dumps(sorted(ids))))
+    conn.commit()
+    _change_detection['last_write_date'][model_name] = write_date
+
+def _poll_model_changes(models, uid, conn, model_name, date_fields):
+    """
+    Return (changed, ranges) for records written since the last poll: changed is False when
+    nothing changed, ranges is a list of (start_date, end_date) or None for "any period".
+    The watermark is kept in the journal so a new leader continues where the last one stopped.
+    """
+    row = conn.execute('SELECT write_date, ids FROM watermarks WHERE model = ?', (model_name,)).fetchone()
+    if row is None:
+        newest = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, model_name, 'search_read', [[]],
+                                   {'fields': ['write_date'], 'order': 'write_date desc, id desc', 'limit': 1,
+                                    'context': {'active_test': False}})
+        if newest:
+            _save_change_watermark(conn, model_name, newest[0]['write_date'], [newest[0]['id']])
+        else:
+            _save_change_watermark(conn, model_name, '1970-01-01 00:00:00', [])
+        return False, []
+    last_seen, seen_ids = row[0], set(json.loads(row[1]))
+    # write_date has second precision: read >= last_seen so records written later in that same
+    # second are not missed, and skip the ones already seen at it
+    limit = CHANGE_DETECTION_MAX_RECORDS + len(seen_ids)
+    records = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, model_name, 'search_read', [[('write_date', '>=', last_seen)]],
+                                {'fields': ['write_date'] + list(dict.fromkeys(date_fields)),
+                                 'order': 'write_date desc, id desc', 'limit': limit,
+                                 'context': {'active_test': False}})
+    truncated = len(records) >= limit
+    records = [record for record in records if not (record['write_date'] == last_seen and record['id'] in seen_ids)]
+    if not records:
+        return False, []
+    newest = records[0]['write_date']
+    newest_ids = {record['id'] for record in records if record['write_date'] == newest}
+    _save_change_watermark(conn, model_name, newest, newest_ids | seen_ids if newest == last_seen else newest_ids)
+    with _change_detection['lock']:
+        _change_detection['changes'] += len(records)
+    print(f"Change detection: {len(records)}{'+' if truncated else ''} {model_name} record(s) changed since {last_seen}")
+    if not date_fields or truncated:
+        return True, None
+    ranges = []
+    for record in records:
+        start, end = _odoo_date(record.get(date_fields[0])), _odoo_date(record.get(date_fields[1]))
+        if start or end:
+            ranges.append((start or end, end or start))
+    return True, ranges
+
+def _period_touched(period, view_type, ranges):
+    if ranges is None:
+        return True
+    try:
+        start_date, end_date = get_date_range(view_type, period)
+    except Exception:
+        return True
+    return any(start <= end_date and end >= start_date for start, end in ranges)
+
+def invalidate_changed_periods(ranges, refresh=True):
+    """
+    Drop department entries whose period overlaps any range; None = all. With refresh=True (the
+    process that detected the change) they are also re-warmed and removed from the stores shared
+    by the host; other processes only drop what they keep in memory.
+    """
+    invalidate_hours_cubes(ranges)
+    invalidated = 0
+    if refresh or not isinstance(cache_store, SQLiteCache):
+        for department, cache_key in cache_store.keys('department'):
+            period, _, view_type = cache_key.rpartition('_')
+            period = None if period == 'default' else period
+            if _period_touched(period, view_type, ranges):
+                cache_store.delete('department', (department, cache_key))
+                invalidated += 1
+                if period and refresh:
+                    schedule_department_refresh(department, period, view_type)
+    if refresh and PERIOD_CACHE_DB_PATH:
+        for department, period, view_type in closed_period_keys():
+            if _period_touched(period, view_type, ranges):
+                delete_closed_period_data(department, period, view_type)
+                invalidated += 1
+    with _change_detection['lock']:
+        _change_detection['invalidated'] += invalidated
+    if invalidated:
+        print(f"Change detection invalidated {invalidated} cached department period(s)")
+    return invalidated
+
+def _apply_change(ranges, holidays=False, reference=False, refresh=True):
+    if holidays:
+        cache_store.clear('holidays')
+    if reference:
+        invalidate_reference_data()
+    invalidate_changed_periods(ranges, refresh=refresh)
+
+def publish_changes(ranges, holidays=False, reference=False):
+    """
+    Record a change in the host's journal and apply it here (re-warming what it invalidated);
+    the other processes apply it on their next change detection round.
+    """
+    try:
+        with contextlib.closing(_open_change_journal()) as conn:
+            encoded = None if ranges is None else json.dumps([[start.isoformat(), end.isoformat()] for start, end in ranges])
+            cursor = conn.execute('INSERT INTO changes (created_at, ranges, holidays, reference) VALUES (?, ?, ?, ?)',
+                                  (time.time(), encoded, int(holidays), int(reference)))
+            conn.execute('DELETE FROM changes WHERE created_at < ?', (time.time() - CHANGE_JOURNAL_RETENTION_SECONDS,))
+            conn.commit()
+            with _change_detection['apply_lock']:
+                # Everything before our own entry is applied by apply_published_changes as usual
+                apply_published_changes(until=cursor.lastrowid - 1)
+                _change_detection['applied_seq'] = max(_change_detection['applied_seq'], cursor.lastrowid)
+        with _change_detection['lock']:
+            _change_detection['published'] += 1
+    except Exception as e:
+        print(f"Change journal write failed, invalidating this process only: {e}")
+    _apply_change(ranges, holidays, reference, refresh=True)
+
+def apply_published_changes(until=None):
+    """Apply journal entries published by another process since the last call; returns how many."""
+    with _change_detection['apply_lock']:
+        with contextlib.closing(_open_change_journal()) as conn:
+            rows = conn.execute('SELECT seq, ranges, holidays, reference FROM changes WHERE seq > ? AND seq <= ? ORDER BY seq',
+                                (_change_detection['applied_seq'], until if until is not None else sys.maxsize)).fetchall()
+        if not rows:
+            return 0
+        ranges, holidays, reference = [], False, False
+        for _seq, encoded, row_holidays, row_reference in rows:
+            holidays = holidays or bool(row_holidays)
+            reference = reference or bool(row_reference)
+            if encoded is None or ranges is None:
+                ranges = None
+            else:
+                ranges.extend((datetime.date.fromisoformat(start), datetime.date.fromisoformat(end))
+                              for start, end in json.loads(encoded))
+        _change_detection['applied_seq'] = rows[-1][0]
+    with _change_detection['lock']:
+        _change_detection['applied'] += len(rows)
+    _apply_change(ranges, holidays, reference, refresh=False)
+    return len(rows)
+
+def detect_odoo_changes():
+    """One polling round over CHANGE_DETECTION_MODELS (run by the cache warmer leader)."""
+    models, uid = connect_to_odoo()
+    if not models or not uid:
+        return
+    all_ranges = []
+    changed_any = holidays = reference = False
+    with odoo_deadline(ODOO_CALL_TIMEOUT), contextlib.closing(_open_change_journal()) as conn:
+        for model_name, date_fields in CHANGE_DETECTION_MODELS.items():
+            if model_name == 'account.analytic.line' and timesheet_mirror_syncing() \
+                    and timesheet_mirror_covers(datetime.date.today()):
+                # The mirror sync sees these changes (and deletes) and publishes them once they are in
+                # the mirror, so no worker recomputes from a mirror that does not have them yet
+                continue
+            try:
+                changed, ranges = _poll_model_changes(models, uid, conn, model_name, date_fields)
+            except Exception as e:
+                print(f"Change detection failed for {model_name}: {e}")
+                continue
+            if not changed:
+                continue
+            changed_any = True
+            if ranges is None:
+                all_ranges = None
+            elif all_ranges is not None:
+                all_ranges.extend(ranges)
+            holidays = holidays or model_name == 'resource.calendar.leaves'
+            reference = reference or model_name in REFERENCE_DATA_MODELS
+    with _change_detection['lock']:
+        _change_detection['polls'] += 1
+        _change_detection['last_poll'] = time.time()
+    if changed_any:
+        publish_changes(all_ranges, holidays=holidays, reference=reference)
+
+_change_detection_stop = threading.Event()
+
+def _change_detection_loop():
+    while not _change_detection_stop.wait(CHANGE_DETECTION_INTERVAL_SECONDS):
+        try:
+            if _cache_warmer_state['is_leader'] and get_connection_status()['connection_health'] != 'unhealthy':
+                detect_odoo_changes()
+            apply_published_changes()
+        except Exception as e:
+            print(f"Change detection round failed: {e}")
+
+def get_change_detection_status():
+    with _change_detection['lock']:
+        return {
+            'interval_seconds': CHANGE_DETECTION_INTERVAL_SECONDS,
+            'journal_path': CHANGE_JOURNAL_PATH,
+            'polling': _cache_warmer_state['is_leader'],
+            'last_write_date': dict(_change_detection['last_write_date']),
+            'applied_seq': _change_detection['applied_seq'],
+            'polls': _change_detection['polls'],
+            'changes': _change_detection['changes'],
+            'published': _change_detection['published'],
+            'applied': _change_detection['applied'],
+            'invalidated': _change_detection['invalidated'],
+            'last_poll': _change_detection['last_poll']
+        }
+
+
+# Cache: resource.calendar.id -> {'weekdays': working weekdays (Mon=0..Sun=6), 'hours_per_day': {weekday: hours}}
+CALENDAR_CACHE_TTL_SECONDS = int(os.environ.get('CALENDAR_CACHE_TTL_SECONDS', '3600'))
+cache_store.namespace('calendar_schedules', CALENDAR_CACHE_TTL_SECONDS)
+
+def department_cache_key(period=None, view_type='monthly'):
+    return f"{period}_{view_type}" if period else f"default_{view_type}"
+
+DEPARTMENT_KEY_NAMES = {
+    'creative': 'Creative',
+    'creative_strategy': 'Creative Strategy',
+    'instructional_design': 'Instructional Design'
+}
+
+def get_cached_entry(department, period=None, view_type='monthly'):
+    """
+    Get cached data for a department, period and view type together with its age.
+    A stale entry (older than DEPARTMENT_CACHE_TTL_SECONDS, within the max staleness) is
+    returned as-is and a deduplicated background refresh is scheduled for it.
+    
+    Returns:
+        tuple: (data, stored_at, is_stale), or (None, None, False) if not cached
+    """
+    data, stored_at = cache_store.get_with_timestamp('department', (department, department_cache_key(period, view_type)))
+    if data is not None and time.time() - stored_at <= DEPARTMENT_CACHE_TTL_SECONDS:
+        return data, stored_at, False
+    if is_closed_period(period, view_type):
+        # Closed periods never go stale: read through to the persistent tier
+        stored = load_closed_period_data(department, period, view_type)
+        if stored is not None:
+            cache_store.set('department', (department, department_cache_key(period, view_type)), stored[0])
+            return stored[0], stored[1], False
+    if data is None:
+        return None, None, False
+    if not DEPARTMENT_CACHE_STALE_WHILE_REVALIDATE:
+        return None, None, False
+    schedule_department_refresh(department, period, view_type)
+    return data, stored_at, True
 
 def get_cached_data(department, period=None, view_type='monthly'):
     """
     Get cached data for a specific department, period, and view type.
     
     Args:
-        department (str): 'creative' or 'creative_strategy'
+        department (str): 'creative', 'creative_strategy' or 'instructional_design'
         period (str): Period in 'YYYY-MM' or 'YYYY-WW' format
         view_type (str): 'monthly', 'weekly', or 'daily'
     
     Returns:
-        dict: Cached data if valid, None if expired or not found
+        dict: Cached data if valid (or stale but being revalidated), None if expired or not found
     """
-    with cache_lock:
-        if department not in department_cache:
-            return None
-        
-        cache_key = f"{period}_{view_type}" if period else f"default_{view_type}"
-        if cache_key not in department_cache[department]:
-            return None
-        
-        # Check if cache is still valid using individual timestamp
-        if cache_key in department_cache['cache_timestamps']:
-            cache_age = time.time() - department_cache['cache_timestamps'][cache_key]
-            if cache_age > department_cache['cache_duration']:
+    return get_cached_entry(department, period, view_type)[0]
+
+def get_cached_timestamp(department, period=None, view_type='monthly'):
+    """time.time() at which a department's cached data was stored, or None if not cached."""
+    return get_cached_entry(department, period, view_type)[1]
+
+# Background revalidation of stale department data; one refresh per department/period/view at a time
+_department_refresh = {
+    'executor': ThreadPoolExecutor(max_workers=2, thread_name_prefix='department-refresh'),
+    'lock': threading.Lock(),
+    'in_progress': set(),
+    'started': 0,
+    'deduplicated': 0,
+    'failed': 0
+}
+
+def schedule_department_refresh(department, period=None, view_type='monthly'):
+    """Recompute a department's cached data in the background unless a refresh is already running."""
+    key = (department, department_cache_key(period, view_type))
+    with _department_refresh['lock']:
+        if key in _department_refresh['in_progress']:
+            _department_refresh['deduplicated'] += 1
+            return False
+        _department_refresh['in_progress'].add(key)
+        _department_refresh['started'] += 1
+
+    def refresh():
+        try:
+            # Runs outside any request: give it its own Odoo budget and read memo
+            with odoo_deadline(ODOO_REQUEST_DEADLINE_SECONDS), odoo_read_memo():
+                data = fetch_department_data_parallel(DEPARTMENT_KEY_NAMES[department], period, view_type)
+            if data:
+                print(f"Revalidated stale {department} data for {view_type} {period}")
+            else:
+                with _department_refresh['lock']:
+                    _department_refresh['failed'] += 1
+        except Exception as e:
+            with _department_refresh['lock']:
+                _department_refresh['failed'] += 1
+            print(f"Background refresh of {department} {view_type} {period} failed: {e}")
+        finally:
+            with _department_refresh['lock']:
+                _department_refresh['in_progress'].discard(key)
+
+    try:
+        _department_refresh['executor'].submit(refresh)
+    except Exception as e:
+        with _department_refresh['lock']:
+            _department_refresh['in_progress'].discard(key)
+        print(f"Could not schedule refresh of {department} {view_type} {period}: {e}")
+        return False
+    return True
+
+# Persistent tier for periods that ended more than CLOSED_PERIOD_AFTER_DAYS days ago: their
+# department payloads are kept in SQLite next to the app, survive restarts, and are never
+# recomputed from Odoo unless explicitly refreshed. Set PERIOD_CACHE_DB_PATH='' to disable.
+CLOSED_PERIOD_AFTER_DAYS = int(os.environ.get('CLOSED_PERIOD_AFTER_DAYS', '7'))
+PERIOD_CACHE_DB_PATH = os.environ.get('PERIOD_CACHE_DB_PATH',
+                                      os.path.join(os.path.dirname(os.path.abspath(__file__)), 'period_cache.sqlite3'))
+_period_db = {'lock': threading.Lock(), 'initialized': False, 'reads': 0, 'hits': 0, 'writes': 0, 'errors': 0}
+
+def is_closed_period(period, view_type='monthly'):
+    """True when the period ended more than CLOSED_PERIOD_AFTER_DAYS days ago (None = current period, never closed)."""
+    if not period or not PERIOD_CACHE_DB_PATH:
+        return False
+    try:
+        _, end_date = get_date_range(view_type, period)
+    except Exception:
+        return False
+    return datetime.date.today() > end_date + datetime.timedelta(days=CLOSED_PERIOD_AFTER_DAYS)
+
+def _open_period_db():
+    conn = sqlite3.connect(PERIOD_CACHE_DB_PATH, timeout=10)
+    if not _period_db['initialized']:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS department_periods (
+                department TEXT NOT NULL,
+                period TEXT NOT NULL,
+                view_type TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (department, period, view_type)
+            )""")
+        conn.commit()
+        _period_db['initialized'] = True
+    return conn
+
+def load_closed_period_data(department, period, view_type='monthly'):
+    """(data, stored_at) of a closed period from the persistent tier, or None."""
+    try:
+        with _period_db['lock']:
+            _period_db['reads'] += 1
+            with contextlib.closing(_open_period_db()) as conn:
+                row = conn.execute('SELECT payload, stored_at FROM department_periods '
+                                   'WHERE department = ? AND period = ? AND view_type = ?',
+                                   (department, period, view_type)).fetchone()
+            if row is None:
                 return None
-        
-        return department_cache[department][cache_key]
+            _period_db['hits'] += 1
+        return json.loads(row[0]), row[1]
+    except Exception as e:
+        with _period_db['lock']:
+            _period_db['errors'] += 1
+        print(f"Period cache read failed for {department} {view_type} {period}: {e}")
+        return None
+
+def save_closed_period_data(department, data, period, view_type='monthly'):
+    """Persist a closed period's department payload (replacing any previous one)."""
+    try:
+        payload = json.dumps(data, default=str)
+        with _period_db['lock']:
+            with contextlib.closing(_open_period_db()) as conn:
+                conn.execute('INSERT OR REPLACE INTO department_periods (department, period, view_type, payload, stored_at) '
+                             'VALUES (?, ?, ?, ?, ?)', (department, period, view_type, payload, time.time()))
+                conn.commit()
+            _period_db['writes'] += 1
+    except Exception as e:
+        with _period_db['lock']:
+            _period_db['errors'] += 1
+        print(f"Period cache write failed for {department} {view_type} {period}: {e}")
+
+def closed_period_keys():
+    """(department, period, view_type) of every payload in the persistent tier."""
+    try:
+        with _period_db['lock']:
+            with contextlib.closing(_open_period_db()) as conn:
+                return conn.execute('SELECT department, period, view_type FROM department_periods').fetchall()
+    except Exception as e:
+        print(f"Period cache listing failed: {e}")
+        return []
+
+def delete_closed_period_data(department, period, view_type='monthly'):
+    try:
+        with _period_db['lock']:
+            with contextlib.closing(_open_period_db()) as conn:
+                conn.execute('DELETE FROM department_periods WHERE department = ? AND period = ? AND view_type = ?',
+                             (department, period, view_type))
+                conn.commit()
+    except Exception as e:
+        print(f"Period cache delete failed for {department} {view_type} {period}: {e}")
+
+def get_period_db_stats():
+    with _period_db['lock']:
+        return {
+            'path': PERIOD_CACHE_DB_PATH or None,
+            'closed_after_days': CLOSED_PERIOD_AFTER_DAYS,
+            'reads': _period_db['reads'],
+            'hits': _period_db['hits'],
+            'writes': _period_db['writes'],
+            'errors': _period_db['errors']
+        }
+
+def get_department_refresh_stats():
+    with _department_refresh['lock']:
+        return {
+            'in_progress': len(_department_refresh['in_progress']),
+            'started': _department_refresh['started'],
+            'deduplicated': _department_refresh['deduplicated'],
+            'failed': _department_refresh['failed']
+        }
 
 def set_cached_data(department, data, period=None, view_type='monthly'):
     """
@@ -434,39 +1487,30 @@ def set_cached_data(department, data, period=None, view_type='monthly'):
         period (str): Period in 'YYYY-MM' or 'YYYY-WW' format
         view_type (str): 'monthly', 'weekly', or 'daily'
     """
-    with cache_lock:
-        if department not in department_cache:
-            department_cache[department] = {}
-        
-        cache_key = f"{period}_{view_type}" if period else f"default_{view_type}"
-        department_cache[department][cache_key] = data
-        department_cache['cache_timestamps'][cache_key] = time.time()
+    cache_store.set('department', (department, department_cache_key(period, view_type)), data)
+    if is_closed_period(period, view_type):
+        save_closed_period_data(department, data, period, view_type)
 
 def clear_cache():
-    """Clear all cached data."""
-    with cache_lock:
-        department_cache['creative'] = {}
-        department_cache['creative_strategy'] = {}
-        department_cache['cache_timestamps'] = {}
+    """Clear all cached department data, the hours cubes and reference data behind it, and the cached responses."""
+    cache_store.clear('department')
+    invalidate_hours_cubes()
+    invalidate_reference_data()
+    cache_store.clear('responses')
 
 # Currency conversion utilities for scorecard revenue only
-_exchange_rates_cache = {}
-_exchange_rates_timestamp = 0
 EXCHANGE_RATES_CACHE_TTL = 3600  # 1 hour in seconds
+cache_store.namespace('exchange_rates', EXCHANGE_RATES_CACHE_TTL)
 
 def get_exchange_rates():
     """
     Fetch current exchange rates with AED as base currency.
     Uses free exchangerate-api.com service with caching.
     """
-    global _exchange_rates_cache, _exchange_rates_timestamp
-    
-    current_time = time.time()
-    
     # Check if cache is still valid
-    if (_exchange_rates_cache and 
-        current_time - _exchange_rates_timestamp < EXCHANGE_RATES_CACHE_TTL):
-        return _exchange_rates_cache
+    cached_rates = cache_store.get('exchange_rates', 'AED')
+    if cached_rates:
+        return cached_rates
     
     try:
         # Using free exchangerate-api.com with AED as base currency
@@ -487,8 +1531,7 @@ def get_exchange_rates():
             # AED to AED is always 1
             rates_to_aed['AED'] = 1.0
             
-            _exchange_rates_cache = rates_to_aed
-            _exchange_rates_timestamp = current_time
+            cache_store.set('exchange_rates', 'AED', rates_to_aed)
             
             print(f"Updated exchange rates for scorecard: {len(rates_to_aed)} currencies")
             return rates_to_aed
@@ -556,541 +1599,217 @@ def get_connection_status():
             'last_health_check': _odoo_connection_pool['last_health_check'],
             'last_used': _odoo_connection_pool['last_used'],
             'has_models': _odoo_connection_pool['models'] is not None,
-            'has_uid': _odoo_connection_pool['uid'] is not None
+            'has_uid': _odoo_connection_pool['uid'] is not None,
+            'pool': get_odoo_pool_stats(),
+            'executor': get_odoo_executor_stats()
         }
 
 def get_cache_status():
     """Get cache status information."""
-    with cache_lock:
-        return {
-            'cache_timestamps': department_cache['cache_timestamps'],
-            'cache_duration': department_cache['cache_duration'],
-            'creative_periods': list(department_cache.get('creative', {}).keys()),
-            'creative_strategy_periods': list(department_cache.get('creative_strategy', {}).keys())
+    department_keys = cache_store.keys('department')
+    return {
+        'cache_duration': DEPARTMENT_CACHE_TTL_SECONDS,
+        'stale_while_revalidate': DEPARTMENT_CACHE_STALE_WHILE_REVALIDATE,
+        'max_stale_seconds': DEPARTMENT_CACHE_MAX_STALE_SECONDS,
+        'refresh': get_department_refresh_stats(),
+        'closed_periods': get_period_db_stats(),
+        'warmer': get_cache_warmer_status(),
+        'change_detection': get_change_detection_status(),
+        'timesheet_mirror': get_timesheet_mirror_status(),
+        'reference_data': get_reference_data_status(),
+        'hours_cube': get_hours_cube_status(),
+        'most_requested': [{'department': key[0], 'period': key[1], 'view_type': key[2], 'score': round(score, 2)}
+                           for key, score in top_accessed_departments(CACHE_WARM_TOP_K)],
+        'creative_periods': [key for dept, key in department_keys if dept == 'creative'],
+        'creative_strategy_periods': [key for dept, key in department_keys if dept == 'creative_strategy'],
+        'instructional_design_periods': [key for dept, key in department_keys if dept == 'instructional_design'],
+        'store': cache_store.stats()
+    }
+
+def department_section_functions(department_name, snapshot):
+    """
+    Zero-argument callables computing each dashboard section of a department from a
+    shared DepartmentSnapshot. Results are memoized on the snapshot, so a section that
+    another section depends on (e.g. available_resources for team_utilization) runs once.
+    """
+    period, view_type = snapshot.period, snapshot.view_type
+    if department_name == 'Creative':
+        functions = {
+            'employees': lambda: get_creative_employees(snapshot),
+            'team_utilization': lambda: get_team_utilization_data(period, view_type, snapshot=snapshot),
+            'timesheet_data': lambda: get_creative_timesheet_data(period, view_type, snapshot=snapshot),
+            'available_resources': lambda: get_available_creative_resources(view_type, period, snapshot=snapshot)
+        }
+    elif department_name == 'Creative Strategy':
+        functions = {
+            'employees': lambda: get_creative_strategy_employees(snapshot),
+            'team_utilization': lambda: get_creative_strategy_team_utilization_data(period, view_type, snapshot=snapshot),
+            'timesheet_data': lambda: get_creative_strategy_timesheet_data(period, view_type, snapshot=snapshot),
+            'available_resources': lambda: get_available_creative_strategy_resources(view_type, period, snapshot=snapshot)
+        }
+    else:
+        functions = {
+            'employees': lambda: get_instructional_design_employees(snapshot),
+            'team_utilization': lambda: get_instructional_design_team_utilization_data(period, view_type, snapshot=snapshot),
+            'timesheet_data': lambda: get_instructional_design_timesheet_data(period, view_type, snapshot=snapshot),
+            'available_resources': lambda: get_available_instructional_design_resources(view_type, period, snapshot=snapshot)
         }
+    return {part: (lambda part=part, fn=fn: snapshot.section((part, department_name), fn))
+            for part, fn in functions.items()}
+
+def _department_employee_totals(snapshot, department_name):
+    """Lightweight per-employee logged hours list used as the 'employees' section of the aggregators."""
+    logged_by_employee, _ = snapshot.work_and_time_off_hours()
+    employees_list = []
+    for emp in snapshot.employees(department_name):
+        employees_list.append({
+            'id': emp['id'],
+            'name': emp.get('name', ''),
+            'job_title': emp.get('job_title', ''),
+            'tags': snapshot.employee_tags(emp),
+            'total_hours': logged_by_employee.get(emp['id'], 0),
+            'timesheet_entries': [],  # Simplified for performance
+            'period_start': snapshot.start_date.isoformat(),
+            'period_end': snapshot.end_date.isoformat()
+        })
+    return employees_list
+
+def _department_flight_key(department_name, period, view_type):
+    # Parallel and sequential fetches produce the same data, so they share one in-flight key
+    return ('department_data', department_name, period, view_type)
 
-def fetch_department_data_parallel(department_name, period=None, view_type='monthly'):
+DEPARTMENT_COMPUTE_LEASE_SECONDS = int(os.environ.get('DEPARTMENT_COMPUTE_LEASE_SECONDS', '120'))
+
+def _compute_department_data_once(department_name, period, view_type, compute):
     """
-    Fetch all data for a department in parallel using ThreadPoolExecutor.
-    This significantly speeds up data retrieval by making concurrent API calls.
+    Run compute() in only one worker at a time for a department/period/view and store its
+    result. Other workers wait for that result to land in the (shared) cache, or compute it
+    themselves once the holder's lease is released or expires. This is the only place a computed
+    department payload is cached, so callers only store data they assemble themselves.
     """
-    try:
-        models, uid = connect_to_odoo()
-        if not models or not uid:
-            print(f"Failed to connect to Odoo for {department_name}")
+    lease = ('department', department_name, department_cache_key(period, view_type))
+    department_key = {name: key for key, name in DEPARTMENT_KEY_NAMES.items()}.get(department_name, department_name)
+    cache_key = (department_key, department_cache_key(period, view_type))
+    waiting_since = time.time()
+
+    def computed_by_another_worker():
+        data, stored_at = cache_store.get_with_timestamp('department', cache_key)
+        return data if data is not None and stored_at >= waiting_since else None
+
+    while not acquire_cache_lease(lease, DEPARTMENT_COMPUTE_LEASE_SECONDS):
+        data = computed_by_another_worker()
+        if data is not None:
+            print(f"Using {department_name} {view_type} {period} computed by another worker")
+            return data
+        remaining = get_odoo_time_remaining()
+        if remaining is not None and remaining <= 1:
+            print(f"Deadline reached waiting for another worker to compute {department_name} {view_type} {period}")
             return None
-        
-        start_date, end_date = get_date_range(view_type, period)
-        
-        # Get department employees
-        try:
-            department_ids = find_department_flexible(models, uid, department_name)
-            
-            if not department_ids:
-                print(f"No department found for {department_name}")
-                return None
-            
-            employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                           [[('department_id', 'in', department_ids)]])
-            
-            if not employee_ids:
-                print(f"No employees found for {department_name}")
-                return None
-            
-            # Get employee details
-            employees_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                             [employee_ids], {
-                                                 'fields': ['id', 'name', 'job_title', 'category_ids']
-                                             })
-        except Exception as e:
-            print(f"Error fetching employee data for {department_name}: {e}")
+        time.sleep(0.5)
+    try:
+        data = computed_by_another_worker()
+        if data is not None:
+            return data
+        data = compute()
+        if odoo_call_budget_exhausted():
+            # Sections that hit the budget returned empty results: do not keep a partial payload
+            print(f"Odoo call budget used up computing {department_name} {view_type} {period}; not caching it")
             return None
-        
-        # Batch fetch categories using LRU/TTL cache
-        all_category_ids = set()
-        for emp in employees_data:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
-        categories_dict = get_category_names_cached(models, uid, list(all_category_ids))
-        
-        # Prepare date strings
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        start_planning_str = start_date.strftime('%Y-%m-%d 00:00:00')
-        end_planning_str = end_date.strftime('%Y-%m-%d 23:59:59')
-        
-        def fetch_timesheets():
-            """Fetch timesheet data with pagination for large datasets"""
-            try:
-                all_timesheets = []
-                offset = 0
-                limit = 500  # Reduced batch size for better reliability
-                
-                while True:
-                    timesheets = models.execute_kw(
-                        ODOO_DB, uid, ODOO_PASSWORD,
-                        'account.analytic.line', 'search_read',
-                        [[('employee_id', 'in', employee_ids),
-                          ('date', '>=', start_str),
-                          ('date', '<=', end_str),
-                          ('task_id.name', '!=', 'Time Off')]],
-                        {'fields': ['employee_id', 'unit_amount'], 'offset': offset, 'limit': limit}
-                    )
-                    
-                    if not timesheets:
-                        break
-                        
-                    all_timesheets.extend(timesheets)
-                    offset += limit
-                    
-                    # Stop if we got fewer results than the limit (end of data)
-                    if len(timesheets) < limit:
-                        break
-                
-                return all_timesheets
-            except Exception as e:
-                print(f"Error fetching timesheets for {department_name}: {e}")
-                return []
-        
-        def fetch_planning_slots():
-            """Fetch planning slots data with pagination"""
-            try:
-                all_slots = []
-                offset = 0
-                limit = 500
-                
-                while True:
-                    slots = models.execute_kw(
-                        ODOO_DB, uid, ODOO_PASSWORD,
-                        'planning.slot', 'search_read',
-                        [[('resource_id', 'in', employee_ids),
-                          ('start_datetime', '<=', end_planning_str),
-                          ('end_datetime', '>=', start_planning_str)]],
-                        {'fields': ['resource_id', 'allocated_hours', 'start_datetime', 'end_datetime'], 
-                         'offset': offset, 'limit': limit}
-                    )
-                    
-                    if not slots:
-                        break
-                        
-                    all_slots.extend(slots)
-                    offset += limit
-                    
-                    if len(slots) < limit:
-                        break
-                
-                return all_slots
-            except Exception as e:
-                print(f"Error fetching planning slots for {department_name}: {e}")
-                return []
-        
-        def fetch_time_off():
-            """Fetch time off data with pagination"""
-            try:
-                all_time_off = []
-                offset = 0
-                limit = 500
-                
-                while True:
-                    time_off = models.execute_kw(
-                        ODOO_DB, uid, ODOO_PASSWORD,
-                        'account.analytic.line', 'search_read',
-                        [[('employee_id', 'in', employee_ids),
-                          ('date', '>=', start_str),
-                          ('date', '<=', end_str),
-                          ('task_id.name', '=', 'Time Off')]],
-                        {'fields': ['employee_id', 'unit_amount'], 'offset': offset, 'limit': limit}
-                    )
-                    
-                    if not time_off:
-                        break
-                        
-                    all_time_off.extend(time_off)
-                    offset += limit
-                    
-                    if len(time_off) < limit:
-                        break
-                
-                return all_time_off
-            except Exception as e:
-                print(f"Error fetching time off data for {department_name}: {e}")
-                return []
-        
-        # Execute all API calls in parallel with better error handling
-        try:
-            with ThreadPoolExecutor(max_workers=2) as executor:  # Reduced workers for stability
-                future_timesheets = executor.submit(fetch_timesheets)
-                future_planning = executor.submit(fetch_planning_slots)
-                future_time_off = executor.submit(fetch_time_off)
-                
-                # Wait for all results with timeout
-                timesheets = future_timesheets.result(timeout=30)
-                planning_slots = future_planning.result(timeout=30)
-                time_off_timesheets = future_time_off.result(timeout=30)
-                
-        except Exception as e:
-            print(f"Error in parallel execution for {department_name}: {e}")
-            # Fallback to sequential execution
-            print(f"Falling back to sequential execution for {department_name}")
-            timesheets = fetch_timesheets()
-            planning_slots = fetch_planning_slots()
-            time_off_timesheets = fetch_time_off()
-        
-        # Process results (same logic as existing functions)
-        employee_data = {}
-        for emp in employees_data:
-            emp_id = emp['id']
-            tags = []
-            if emp.get('category_ids'):
-                tags = [categories_dict.get(cat_id) for cat_id in emp['category_ids'] if categories_dict.get(cat_id)]
-            
-            employee_data[emp_id] = {
-                'name': emp.get('name', ''),
-                'job_title': emp.get('job_title', ''),
-                'tags': tags,
-                'logged_hours': 0,
-                'planned_hours': 0,
-                'time_off_hours': 0
-            }
-        
-        # Calculate time off hours
-        for ts in time_off_timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id in employee_data:
-                    employee_data[emp_id]['time_off_hours'] += float(ts.get('unit_amount', 0))
-        
-        # Calculate logged hours
-        for ts in timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id in employee_data:
-                    employee_data[emp_id]['logged_hours'] += float(ts.get('unit_amount', 0))
-        
-        # Calculate planned hours with edge case handling
-        for slot in planning_slots:
-            res_field = slot.get('resource_id')
-            if res_field:
-                emp_id = res_field[0] if isinstance(res_field, list) else res_field
-                if emp_id in employee_data:
-                    allocated_hours = slot.get('allocated_hours', 0)
-                    
-                    # Edge case handling
-                    task_start = datetime.datetime.strptime(slot['start_datetime'], '%Y-%m-%d %H:%M:%S')
-                    task_end = datetime.datetime.strptime(slot['end_datetime'], '%Y-%m-%d %H:%M:%S')
-                    filter_start = datetime.datetime.strptime(start_planning_str, '%Y-%m-%d %H:%M:%S')
-                    
-                    # Calculate proportional hours for slots that span across the filter period
-                    filter_end = datetime.datetime.strptime(end_planning_str, '%Y-%m-%d %H:%M:%S')
-                    
-                    if task_start < filter_start or task_end > filter_end:
-                        # Calculate overlap between task and filter period
-                        overlap_start = max(task_start, filter_start)
-                        overlap_end = min(task_end, filter_end)
-                        
-                        if overlap_start < overlap_end:
-                            # Calculate what proportion of the original task falls within the filter period
-                            total_task_duration = (task_end - task_start).total_seconds()
-                            overlap_duration = (overlap_end - overlap_start).total_seconds()
-                            proportion = overlap_duration / total_task_duration if total_task_duration > 0 else 0
-                            
-                            # Apply proportion to the original allocated hours
-                            original_hours = allocated_hours
-                            allocated_hours = allocated_hours * proportion
-                            print(f"Slot spans period: {slot['start_datetime']} to {slot['end_datetime']}, original {original_hours}h, proportional {allocated_hours:.2f}h")
-                        else:
-                            allocated_hours = 0
-                    
-                    employee_data[emp_id]['planned_hours'] += allocated_hours
-        
-        # Convert to list format
-        employees_list = []
-        for emp_id, data in employee_data.items():
-            employees_list.append({
-                'id': emp_id,
-                'name': data['name'],
-                'job_title': data['job_title'],
-                'tags': data['tags'],
-                'total_hours': data['logged_hours'],
-                'timesheet_entries': [],  # Simplified for performance
-                'period_start': start_date.isoformat(),
-                'period_end': end_date.isoformat()
-            })
-        
-        # Get team utilization data using the proper function with view_type parameter
-        if department_name == 'Creative':
-            team_stats = get_team_utilization_data(period, view_type)
-            print(f"DEBUG: Creative team_stats type: {type(team_stats)}")
-            print(f"DEBUG: Creative team_stats keys: {list(team_stats.keys()) if team_stats else 'None'}")
-        elif department_name == 'Creative Strategy':
-            team_stats = get_creative_strategy_team_utilization_data(period, view_type)
-            print(f"DEBUG: Creative Strategy team_stats type: {type(team_stats)}")
-            print(f"DEBUG: Creative Strategy team_stats keys: {list(team_stats.keys()) if team_stats else 'None'}")
-        else:
-            team_stats = {}  # Fallback
-        
-        # Get available resources using the proper function with view_type parameter
-        if department_name == 'Creative':
-            available_resources = get_available_creative_resources(view_type, period)
-            print(f"DEBUG: Creative available_resources type: {type(available_resources)}")
-            print(f"DEBUG: Creative available_resources length: {len(available_resources) if available_resources else 0}")
-            if available_resources and len(available_resources) > 0:
-                print(f"DEBUG: First Creative resource keys: {list(available_resources[0].keys())}")
-                print(f"DEBUG: First Creative resource base_available_hours: {available_resources[0].get('base_available_hours', 'NOT_FOUND')}")
-        elif department_name == 'Creative Strategy':
-            available_resources = get_available_creative_strategy_resources(view_type, period)
-        else:
-            available_resources = employees_list  # Fallback
-        
-        # Get timesheet data using the proper function with view_type parameter
-        if department_name == 'Creative':
-            timesheet_data = get_creative_timesheet_data(period, view_type)
-            print(f"DEBUG: Creative timesheet_data type: {type(timesheet_data)}")
-            print(f"DEBUG: Creative timesheet_data length: {len(timesheet_data) if timesheet_data else 0}")
-        elif department_name == 'Creative Strategy':
-            timesheet_data = get_creative_strategy_timesheet_data(period, view_type)
-            print(f"DEBUG: Creative Strategy timesheet_data type: {type(timesheet_data)}")
-            print(f"DEBUG: Creative Strategy timesheet_data length: {len(timesheet_data) if timesheet_data else 0}")
-        else:
-            timesheet_data = employees_list  # Fallback
-        
-        return {
-            'employees': employees_list,
-            'team_utilization': team_stats,
-            'timesheet_data': timesheet_data,
-            'available_resources': available_resources
-        }
-        
-    except Exception as e:
-        print(f"Error in parallel fetch for {department_name}: {e}")
-        return None
-def fetch_department_data_sequential(department_name, period=None, view_type='monthly'):
+        if data:
+            # Store before releasing the lease so waiting workers find it
+            set_cached_data(department_key, data, period, view_type)
+        return data
+    finally:
+        release_cache_lease(lease)
+
+def fetch_department_data_parallel(department_name, period=None, view_type='monthly', snapshot=None):
     """
-    Fetch department data sequentially as a reliable fallback.
-    This is slower but more stable than parallel processing.
+    Fetch all data for a department, computing its sections concurrently.
+    Every section reads from one DepartmentSnapshot (pass one in to share it across
+    departments), so each Odoo query runs once per request instead of once per section.
+    Concurrent fetches of the same department/period wait for the one already running.
     """
+    return single_flight(_department_flight_key(department_name, period, view_type),
+                         lambda: _compute_department_data_once(department_name, period, view_type,
+                                                               lambda: _compute_department_data_parallel(department_name, period, view_type, snapshot)))
+
+def _compute_department_data_parallel(department_name, period, view_type, snapshot):
     try:
-        print(f"Starting sequential fetch for {department_name}...")
-        models, uid = connect_to_odoo()
-        if not models or not uid:
+        snapshot = snapshot or build_department_snapshot(period, view_type, [department_name])
+        if snapshot is None:
             print(f"Failed to connect to Odoo for {department_name}")
             return None
         
-        print(f"Successfully connected to Odoo for {department_name}")
-        start_date, end_date = get_date_range(view_type, period)
-        
-        # Get department employees
-        print(f"Fetching department info for {department_name}...")
-        department_ids = find_department_flexible(models, uid, department_name)
-        
-        if not department_ids:
+        if not snapshot.has_department(department_name):
             print(f"No department found for {department_name}")
             return None
         
-        print(f"Found department IDs: {department_ids}")
-        employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                       [[('department_id', 'in', department_ids)]])
-        
-        if not employee_ids:
+        if not snapshot.employees(department_name):
             print(f"No employees found for {department_name}")
             return None
         
-        print(f"Found {len(employee_ids)} employees for {department_name}")
-        
-        # Get employee details
-        print(f"Fetching employee details for {department_name}...")
-        employees_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                         [employee_ids], {
-                                             'fields': ['id', 'name', 'job_title', 'category_ids']
-                                         })
-        
-        print(f"Successfully fetched {len(employees_data)} employee records")
-        
-        # Batch fetch categories
-        all_category_ids = set()
-        for emp in employees_data:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
-        
-        categories_dict = {}
-        if all_category_ids:
-            print(f"Fetching {len(all_category_ids)} categories...")
-            categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                         [list(all_category_ids)], {'fields': ['name']})
-            categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-            print(f"Successfully fetched {len(categories_dict)} categories")
-        
-        # Prepare date strings
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        start_planning_str = start_date.strftime('%Y-%m-%d 00:00:00')
-        end_planning_str = end_date.strftime('%Y-%m-%d 23:59:59')
-        
-        # Fetch data sequentially
-        print(f"Fetching timesheet data for {department_name}...")
-        timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '!=', 'Time Off')]],
-            {'fields': ['employee_id', 'unit_amount']}
-        )
-        print(f"Found {len(timesheets)} timesheet entries")
-        
-        print(f"Fetching planning data for {department_name}...")
-        planning_slots = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'planning.slot', 'search_read',
-            [[('resource_id', 'in', employee_ids),
-              ('start_datetime', '<=', end_planning_str),
-              ('end_datetime', '>=', start_planning_str)]],
-            {'fields': ['resource_id', 'allocated_hours', 'start_datetime', 'end_datetime']}
-        )
-        print(f"Found {len(planning_slots)} planning slots")
+        employees_list = _department_employee_totals(snapshot, department_name)
         
-        print(f"Fetching time off data for {department_name}...")
-        time_off_timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '=', 'Time Off')]],
-            {'fields': ['employee_id', 'unit_amount']}
-        )
-        print(f"Found {len(time_off_timesheets)} time off entries")
+        # Compute the remaining sections in parallel; they share the snapshot's data
+        functions = department_section_functions(department_name, snapshot)
+        sections = {}
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {part: submit_with_odoo_context(executor, functions[part])
+                       for part in ('team_utilization', 'available_resources', 'timesheet_data')}
+            for part, future in futures.items():
+                try:
+                    sections[part] = future.result(timeout=REQUEST_TIMEOUT)
+                except Exception as e:
+                    print(f"Error computing {part} for {department_name}: {e}")
         
-        # Process results (same logic as parallel function)
-        employee_data = {}
-        for emp in employees_data:
-            emp_id = emp['id']
-            tags = []
-            if emp.get('category_ids'):
-                tags = [categories_dict.get(cat_id) for cat_id in emp['category_ids'] if categories_dict.get(cat_id)]
-            
-            employee_data[emp_id] = {
-                'name': emp.get('name', ''),
-                'job_title': emp.get('job_title', ''),
-                'tags': tags,
-                'logged_hours': 0,
-                'planned_hours': 0,
-                'time_off_hours': 0
-            }
+        return {
+            'employees': employees_list,
+            'team_utilization': sections.get('team_utilization') or {},
+            'timesheet_data': sections.get('timesheet_data') or [],
+            'available_resources': sections.get('available_resources') or []
+        }
         
-        # Calculate time off hours
-        for ts in time_off_timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id in employee_data:
-                    employee_data[emp_id]['time_off_hours'] += float(ts.get('unit_amount', 0))
+    except Exception as e:
+        print(f"Error in parallel fetch for {department_name}: {e}")
+        return None
+
+def fetch_department_data_sequential(department_name, period=None, view_type='monthly', snapshot=None):
+    """
+    Fetch department data sequentially as a reliable fallback.
+    This is slower but more stable than parallel processing.
+    Concurrent fetches of the same department/period wait for the one already running.
+    """
+    return single_flight(_department_flight_key(department_name, period, view_type),
+                         lambda: _compute_department_data_once(department_name, period, view_type,
+                                                               lambda: _compute_department_data_sequential(department_name, period, view_type, snapshot)))
+
+def _compute_department_data_sequential(department_name, period, view_type, snapshot):
+    try:
+        print(f"Starting sequential fetch for {department_name}...")
+        snapshot = snapshot or build_department_snapshot(period, view_type, [department_name])
+        if snapshot is None:
+            print(f"Failed to connect to Odoo for {department_name}")
+            return None
         
-        # Calculate logged hours
-        for ts in timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id in employee_data:
-                    employee_data[emp_id]['logged_hours'] += float(ts.get('unit_amount', 0))
-        
-        # Calculate planned hours with edge case handling
-        for slot in planning_slots:
-            res_field = slot.get('resource_id')
-            if res_field:
-                emp_id = res_field[0] if isinstance(res_field, list) else res_field
-                if emp_id in employee_data:
-                    allocated_hours = slot.get('allocated_hours', 0)
-                    
-                    # Edge case handling
-                    task_start = datetime.datetime.strptime(slot['start_datetime'], '%Y-%m-%d %H:%M:%S')
-                    task_end = datetime.datetime.strptime(slot['end_datetime'], '%Y-%m-%d %H:%M:%S')
-                    filter_start = datetime.datetime.strptime(start_planning_str, '%Y-%m-%d %H:%M:%S')
-                    
-                    # Calculate proportional hours for slots that span across the filter period
-                    filter_end = datetime.datetime.strptime(end_planning_str, '%Y-%m-%d %H:%M:%S')
-                    
-                    if task_start < filter_start or task_end > filter_end:
-                        # Calculate overlap between task and filter period
-                        overlap_start = max(task_start, filter_start)
-                        overlap_end = min(task_end, filter_end)
-                        
-                        if overlap_start < overlap_end:
-                            # Calculate what proportion of the original task falls within the filter period
-                            total_task_duration = (task_end - task_start).total_seconds()
-                            overlap_duration = (overlap_end - overlap_start).total_seconds()
-                            proportion = overlap_duration / total_task_duration if total_task_duration > 0 else 0
-                            
-                            # Apply proportion to the original allocated hours
-                            original_hours = allocated_hours
-                            allocated_hours = allocated_hours * proportion
-                            print(f"Slot spans period: {slot['start_datetime']} to {slot['end_datetime']}, original {original_hours}h, proportional {allocated_hours:.2f}h")
-                        else:
-                            allocated_hours = 0
-                    
-                    employee_data[emp_id]['planned_hours'] += allocated_hours
+        if not snapshot.has_department(department_name):
+            print(f"No department found for {department_name}")
+            return None
         
-        # Convert to list format
-        employees_list = []
-        for emp_id, data in employee_data.items():
-            employees_list.append({
-                'id': emp_id,
-                'name': data['name'],
-                'job_title': data['job_title'],
-                'tags': data['tags'],
-                'total_hours': data['logged_hours'],
-                'timesheet_entries': [],
-                'period_start': start_date.isoformat(),
-                'period_end': end_date.isoformat()
-            })
+        if not snapshot.employees(department_name):
+            print(f"No employees found for {department_name}")
+            return None
         
-        print(f"Processed {len(employees_list)} employees for {department_name}")
+        print(f"Found {len(snapshot.employees(department_name))} employees for {department_name}")
         
-        # Get team utilization data using the proper function with view_type parameter
-        if department_name == 'Creative':
-            team_stats = get_team_utilization_data(period, view_type)
-            print(f"DEBUG: Creative team_stats type: {type(team_stats)}")
-            print(f"DEBUG: Creative team_stats keys: {list(team_stats.keys()) if team_stats else 'None'}")
-        elif department_name == 'Creative Strategy':
-            team_stats = get_creative_strategy_team_utilization_data(period, view_type)
-            print(f"DEBUG: Creative Strategy team_stats type: {type(team_stats)}")
-            print(f"DEBUG: Creative Strategy team_stats keys: {list(team_stats.keys()) if team_stats else 'None'}")
-        else:
-            team_stats = {}  # Fallback
-        
-        # Get available resources using the proper function with view_type parameter
-        if department_name == 'Creative':
-            available_resources = get_available_creative_resources(view_type, period)
-            print(f"DEBUG: Creative available_resources type: {type(available_resources)}")
-            print(f"DEBUG: Creative available_resources length: {len(available_resources) if available_resources else 0}")
-            if available_resources and len(available_resources) > 0:
-                print(f"DEBUG: First Creative resource keys: {list(available_resources[0].keys())}")
-                print(f"DEBUG: First Creative resource base_available_hours: {available_resources[0].get('base_available_hours', 'NOT_FOUND')}")
-        elif department_name == 'Creative Strategy':
-            available_resources = get_available_creative_strategy_resources(view_type, period)
-        else:
-            available_resources = employees_list  # Fallback
-        
-        # Get timesheet data using the proper function with view_type parameter
-        if department_name == 'Creative':
-            timesheet_data = get_creative_timesheet_data(period, view_type)
-            print(f"DEBUG: Creative timesheet_data type: {type(timesheet_data)}")
-            print(f"DEBUG: Creative timesheet_data length: {len(timesheet_data) if timesheet_data else 0}")
-        elif department_name == 'Creative Strategy':
-            timesheet_data = get_creative_strategy_timesheet_data(period, view_type)
-            print(f"DEBUG: Creative Strategy timesheet_data type: {type(timesheet_data)}")
-            print(f"DEBUG: Creative Strategy timesheet_data length: {len(timesheet_data) if timesheet_data else 0}")
-        else:
-            timesheet_data = employees_list  # Fallback
+        employees_list = _department_employee_totals(snapshot, department_name)
+        print(f"Processed {len(employees_list)} employees for {department_name}")
         
+        functions = department_section_functions(department_name, snapshot)
         result = {
             'employees': employees_list,
-            'team_utilization': team_stats,
-            'timesheet_data': timesheet_data,
-            'available_resources': available_resources
+            'team_utilization': functions['team_utilization']() or {},
+            'timesheet_data': functions['timesheet_data']() or [],
+            'available_resources': functions['available_resources']() or []
         }
         
         print(f"Successfully completed sequential fetch for {department_name}")
@@ -1168,6 +1887,824 @@ def find_department_flexible(models, uid, department_name):
         return models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
                                [[('name', '=', department_name)]])
 
+# Departments shown on the dashboard, and the Odoo names each one may be stored under (in priority order)
+DASHBOARD_DEPARTMENTS = ('Creative', 'Creative Strategy', 'Instructional Design')
+DEPARTMENT_NAME_CANDIDATES = {
+    'Creative': ['Creative'],
+    'Creative Strategy': ['Creative Strategy'],
+    'Instructional Design': [
+        'Instructional Design',
+        'Instructional Design Department',
+        'InstructionalDesign',
+        'Instructional_Design',
+        'ID',
+        'ID Department'
+    ]
+}
+
+def resolve_dashboard_departments(departments, department_names):
+    """
+    Map dashboard department names to hr.department ids from a list of {'id', 'name'} records.
+    Returns {department_name: [department ids]} (empty list when not found).
+    """
+    ids_by_name = defaultdict(list)
+    for dept in departments:
+        ids_by_name[dept['name']].append(dept['id'])
+
+    result = {}
+    for name in department_names:
+        result[name] = []
+        for candidate in DEPARTMENT_NAME_CANDIDATES.get(name, [name]):
+            if ids_by_name.get(candidate):
+                result[name] = ids_by_name[candidate]
+                break
+        if not result[name] and name == 'Instructional Design':
+            # Same partial-match fallback as find_department_flexible()
+            result[name] = [dept['id'] for dept in departments if 'instructional' in (dept['name'] or '').lower()]
+    return result
+
+# Reference data: the dashboard departments, their employees, employee tags and resource calendars
+# (with attendances), loaded with a handful of bulk search_reads and shared by all requests in the
+# process. Reloaded every REFERENCE_DATA_REFRESH_SECONDS, or sooner when change detection sees an edit.
+REFERENCE_DATA_REFRESH_SECONDS = int(os.environ.get('REFERENCE_DATA_REFRESH_SECONDS', '900'))
+REFERENCE_DATA_MODELS = ('hr.department', 'hr.employee', 'resource.calendar')
+_reference_data = {'lock': threading.Lock(), 'current': None, 'stale': False, 'loads': 0, 'errors': 0}
+
+class ReferenceData:
+    """Read-only lookup tables for the dashboard departments; built once, never mutated."""
+    EMPLOYEE_FIELDS = ['name', 'job_title', 'work_email', 'category_ids', 'active',
+                       'work_permit_expiration_date', 'employee_type', 'department_id',
+                       'company_id', 'resource_id', 'resource_calendar_id']
+    ATTENDANCE_FIELDS = ['calendar_id', 'dayofweek', 'hour_from', 'hour_to']
+
+    def __init__(self, models, uid, department_names=DASHBOARD_DEPARTMENTS):
+        candidates = sorted({c for name in department_names for c in DEPARTMENT_NAME_CANDIDATES.get(name, [name])})
+        departments = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search_read',
+                                        [['|', ('name', 'in', candidates), ('name', 'ilike', 'Instructional')]],
+                                        {'fields': ['id', 'name']})
+        self.department_ids = resolve_dashboard_departments(departments, department_names)
+        all_department_ids = sorted({d for ids in self.department_ids.values() for d in ids})
+
+        employees = []
+        if all_department_ids:
+            employees = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search_read',
+                                          [[('department_id', 'in', all_department_ids)]],
+                                          {'fields': self.EMPLOYEE_FIELDS})
+        self.employees_by_id = {emp['id']: emp for emp in employees}
+        self.employees_by_department = {name: [] for name in self.department_ids}
+        for emp in employees:
+            dept_id = _many2one_id(emp.get('department_id'))
+            for name, ids in self.department_ids.items():
+                if dept_id in ids:
+                    self.employees_by_department[name].append(emp)
+
+        categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'search_read',
+                                       [[]], {'fields': ['name']})
+        self.categories = {cat['id']: cat['name'] for cat in categories}
+
+        calendar_ids = sorted({_many2one_id(emp.get('resource_calendar_id')) for emp in employees
+                               if _many2one_id(emp.get('resource_calendar_id'))})
+        self.calendars = {}
+        if calendar_ids:
+            calendars = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'resource.calendar', 'search_read',
+                                          [[('id', 'in', calendar_ids)]], {'fields': ['name', 'hours_per_day']})
+            attendances = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'resource.calendar.attendance', 'search_read',
+                                            [[('calendar_id', 'in', calendar_ids)]], {'fields': self.ATTENDANCE_FIELDS})
+            self.calendars = {cal['id']: dict(cal, attendances=[]) for cal in calendars}
+            for att in attendances:
+                calendar = self.calendars.get(_many2one_id(att.get('calendar_id')))
+                if calendar is not None:
+                    calendar['attendances'].append(att)
+        self.loaded_at = time.time()
+        print(f"Loaded reference data: {len(employees)} employees, {len(self.categories)} categories, "
+              f"{len(self.calendars)} calendars")
+
+    def employee_calendar(self, employee_id):
+        """The employee's resource calendar (with 'attendances'), or None when unknown."""
+        employee = self.employees_by_id.get(employee_id)
+        if employee is None:
+            return None
+        return self.calendars.get(_many2one_id(employee.get('resource_calendar_id')))
+
+def get_reference_data(models, uid):
+    """
+    Current ReferenceData, reloading it when older than REFERENCE_DATA_REFRESH_SECONDS or
+    invalidated. If a reload fails the previous data keeps being served; None if nothing loaded yet.
+    """
+    with _reference_data['lock']:
+        current = _reference_data['current']
+        if current is not None and not _reference_data['stale'] and \
+                time.time() - current.loaded_at < REFERENCE_DATA_REFRESH_SECONDS:
+            return current
+
+    def load():
+        reference = ReferenceData(models, uid)
+        with _reference_data['lock']:
+            _reference_data['current'] = reference
+            _reference_data['stale'] = False
+            _reference_data['loads'] += 1
+        return reference
+
+    try:
+        # Waiters get a copy of the leader's result; the shared instance is what we keep
+        single_flight(('reference_data',), load)
+    except Exception as e:
+        with _reference_data['lock']:
+            _reference_data['errors'] += 1
+        print(f"Reference data reload failed: {e}")
+    with _reference_data['lock']:
+        return _reference_data['current']
+
+def invalidate_reference_data():
+    with _reference_data['lock']:
+        _reference_data['stale'] = True
+    cache_store.clear('calendar_schedules')
+    invalidate_hours_cubes()
+
+def get_reference_data_status():
+    with _reference_data['lock']:
+        current = _reference_data['current']
+        return {
+            'refresh_seconds': REFERENCE_DATA_REFRESH_SECONDS,
+            'loaded_at': current.loaded_at if current else None,
+            'employees': len(current.employees_by_id) if current else 0,
+            'calendars': len(current.calendars) if current else 0,
+            'stale': _reference_data['stale'],
+            'loads': _reference_data['loads'],
+            'errors': _reference_data['errors']
+        }
+
+class DepartmentSnapshot:
+    """
+    Odoo data for one period, fetched once for a set of departments and split per
+    department in memory so every dashboard section can be computed from it.
+
+    Departments, employees and categories come from the shared ReferenceData; timesheets, hour totals,
+    planning slots, projects and holidays are loaded on first use (once, for all
+    departments together) so lean requests only pay for what they read.
+    """
+    EMPLOYEE_FIELDS = ReferenceData.EMPLOYEE_FIELDS
+    TIMESHEET_FIELDS = ['employee_id', 'unit_amount', 'task_id', 'date', 'project_id']
+    PLANNING_FIELDS = ['resource_id', 'employee_id', 'start_datetime', 'end_datetime',
+                       'allocated_hours', 'allocated_percentage']
+
+    def __init__(self, models, uid, period=None, view_type='monthly', department_names=DASHBOARD_DEPARTMENTS):
+        self.models = models
+        self.uid = uid
+        self.period = period
+        self.view_type = view_type
+        self.start_date, self.end_date = get_date_range(view_type, period)
+        self._lock = threading.Lock()
+        self._sections = {}
+        self._section_locks = defaultdict(threading.Lock)
+
+        reference = get_reference_data(models, uid)
+        if reference is None:
+            raise Exception("Reference data could not be loaded from Odoo")
+        self.reference = reference
+        self.department_ids = {name: reference.department_ids.get(name, []) for name in department_names}
+        self._employees = {name: reference.employees_by_department.get(name, []) for name in department_names}
+        employees = [emp for name in department_names for emp in self._employees[name]]
+        self.categories = reference.categories
+        self.all_employee_ids = sorted({emp['id'] for emp in employees})
+        print(f"Department snapshot for {view_type} {period}: {len(employees)} employees across {list(self.department_ids)}")
+
+    def section(self, key, loader):
+        """Compute a value once per snapshot; concurrent callers wait for the first computation."""
+        with self._lock:
+            if key in self._sections:
+                return self._sections[key]
+            section_lock = self._section_locks[key]
+        with section_lock:
+            with self._lock:
+                if key in self._sections:
+                    return self._sections[key]
+            value = loader()
+            with self._lock:
+                self._sections[key] = value
+            return value
+
+    def has_department(self, department_name):
+        return bool(self.department_ids.get(department_name))
+
+    def employees(self, department_name):
+        """Raw hr.employee records (EMPLOYEE_FIELDS) of a department."""
+        return self._employees.get(department_name, [])
+
+    def employee_ids(self, department_name):
+        return [emp['id'] for emp in self.employees(department_name)]
+
+    def employee_tags(self, employee):
+        return [self.categories.get(cat_id) for cat_id in (employee.get('category_ids') or []) if self.categories.get(cat_id)]
+
+    def employee_company_id(self, employee):
+        return _many2one_id(employee.get('company_id'))
+
+    def hours_cubes(self):
+        """Month HoursCubes covering the period, or None when disabled, unavailable or missing employees."""
+        def load():
+            try:
+                cubes = get_hours_cubes(self.models, self.uid, self.start_date, self.end_date)
+            except Exception as e:
+                print(f"Hours cube unavailable, querying Odoo for the period: {e}")
+                return None
+            if cubes and all(emp_id in cube.rows for cube in cubes for emp_id in self.all_employee_ids):
+                return cubes
+            return None
+        return self.section('hours_cubes', load)
+
+    def work_and_time_off_hours(self):
+        """({employee_id: worked hours}, {employee_id: Time Off hours}) for all snapshot employees."""
+        def load():
+            cubes = self.hours_cubes()
+            if cubes:
+                return (hours_cube_totals(cubes, 'logged', self.all_employee_ids, self.start_date, self.end_date),
+                        hours_cube_totals(cubes, 'time_off', self.all_employee_ids, self.start_date, self.end_date))
+            return get_work_and_time_off_hours(self.models, self.uid, self.all_employee_ids, self.start_date, self.end_date)
+        return self.section('hours', load)
+
+    def planned_hours(self):
+        """
+        {employee_id: planned hours} prorated into the period (zero-length slots ignored), sliced
+        from the hours cubes; None when the cubes are unavailable and the caller must prorate slots.
+        """
+        def load():
+            cubes = self.hours_cubes()
+            if cubes:
+                return hours_cube_totals(cubes, 'planned', self.all_employee_ids, self.start_date, self.end_date)
+            return None
+        return self.section('planned_hours', load)
+
+    def timesheet_lines(self, department_name):
+        """Non-Time-Off timesheet lines (TIMESHEET_FIELDS) of a department's employees."""
+        def load():
+            if not self.all_employee_ids:
+                return []
+            if timesheet_mirror_covers(self.start_date):
+                try:
+                    return mirror_timesheet_lines(self.all_employee_ids, self.start_date, self.end_date, time_off=False,
+                                                  time_off_task_ids=get_time_off_task_ids(self.models, self.uid))
+                except Exception as e:
+                    print(f"Timesheet mirror query failed, using Odoo: {e}")
+            return self.models.execute_kw(
+                ODOO_DB, self.uid, ODOO_PASSWORD,
+                'account.analytic.line', 'search_read',
+                [analytic_line_domain(self.models, self.uid, self.all_employee_ids, self.start_date, self.end_date, time_off=False)],
+                {'fields': self.TIMESHEET_FIELDS}
+            )
+        lines = self.section('timesheet_lines', load)
+        department_employee_ids = set(self.employee_ids(department_name))
+        return [line for line in lines if _many2one_id(line.get('employee_id')) in department_employee_ids]
+
+    def unbilled_project_ids(self):
+        """Projects whose Agreement Type (x_studio_agreement_type_1) is missing or "Internal"."""
+        def load():
+            project_ids = set()
+            for name in self.department_ids:
+                for line in self.timesheet_lines(name):
+                    if _many2one_id(line.get('project_id')):
+                        project_ids.add(_many2one_id(line.get('project_id')))
+            unbilled_project_ids = set()
+            if not project_ids:
+                return unbilled_project_ids
+            try:
+                projects = self.models.execute_kw(
+                    ODOO_DB, self.uid, ODOO_PASSWORD,
+                    'project.project', 'read',
+                    [sorted(project_ids)],
+                    {'fields': ['display_name', 'x_studio_agreement_type_1']}
+                )
+                for proj in projects:
+                    agreement = proj.get('x_studio_agreement_type_1')
+                    is_unbilled = False
+                    if not agreement:
+                        is_unbilled = True
+                    elif isinstance(agreement, str):
+                        is_unbilled = agreement.strip().lower() == 'internal'
+                    elif isinstance(agreement, (list, tuple)) and len(agreement) > 1:
+                        is_unbilled = str(agreement[1]).strip().lower() == 'internal'
+                    if is_unbilled and proj.get('id') is not None:
+                        unbilled_project_ids.add(proj['id'])
+            except Exception as e:
+                # If project lookup fails, treat all as billed (safe)
+                print(f"Error reading projects for unbilled hours: {e}")
+            return unbilled_project_ids
+        return self.section('unbilled_project_ids', load)
+
+    def planning_slots(self):
+        """
+        Planning slots (PLANNING_FIELDS) overlapping the period for all snapshot employees.
+        Matches slots by resource or employee; each section applies its own matching rule.
+        """
+        def load():
+            if not self.all_employee_ids:
+                return []
+            resource_ids = sorted({_many2one_id(emp.get('resource_id')) for name in self.department_ids
+                                   for emp in self.employees(name) if _many2one_id(emp.get('resource_id'))})
+            start_str = self.start_date.strftime('%Y-%m-%d 00:00:00')
+            end_str = self.end_date.strftime('%Y-%m-%d 23:59:59')
+            cubes = self.hours_cubes()
+            if cubes:
+                # The month cubes hold every dashboard slot; keep the ones this domain would match
+                matching_resources = set(resource_ids) | set(self.all_employee_ids)
+                employee_ids = set(self.all_employee_ids)
+                slots = {}
+                for cube in cubes:
+                    for slot in cube.slots:
+                        if slot['start_datetime'] <= end_str and slot['end_datetime'] >= start_str and \
+                                (_many2one_id(slot.get('resource_id')) in matching_resources or
+                                 _many2one_id(slot.get('employee_id')) in employee_ids):
+                            slots[slot['id']] = slot
+                return list(slots.values())
+            domain = ['|', '|',
+                      ('resource_id', 'in', resource_ids),
+                      ('employee_id', 'in', self.all_employee_ids),
+                      ('resource_id', 'in', self.all_employee_ids),
+                      ('start_datetime', '<=', end_str),
+                      ('end_datetime', '>=', start_str)]
+            slots = []
+            offset = 0
+            page_limit = 1000
+            while True:
+                page = self.models.execute_kw(ODOO_DB, self.uid, ODOO_PASSWORD, 'planning.slot', 'search_read',
+                                              [domain], {'fields': self.PLANNING_FIELDS, 'limit': page_limit, 'offset': offset})
+                slots.extend(page or [])
+                if not page or len(page) < page_limit:
+                    break
+                offset += page_limit
+            print(f"Department snapshot: {len(slots)} planning slots from {start_str} to {end_str}")
+            return slots
+        return self.section('planning_slots', load)
+
+    def public_holidays(self, company_id=None):
+        """Public holidays in the period for a company (None = all companies)."""
+        return self.section(('holidays', company_id), lambda: get_public_holidays(
+            self.models, self.uid, self.start_date, self.end_date, company_id=company_id))
+
+def build_department_snapshot(period=None, view_type='monthly', department_names=DASHBOARD_DEPARTMENTS):
+    """Connect to Odoo and build a DepartmentSnapshot; returns None if Odoo is unreachable."""
+    models, uid = connect_to_odoo()
+    if not models or not uid:
+        return None
+    return DepartmentSnapshot(models, uid, period, view_type, department_names)
+
+class _TimeoutConnectionMixin:
+    """Apply the connect timeout during connect(), then switch the socket to the read timeout."""
+    read_timeout = None
+
+    def connect(self):
+        super().connect()
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except OSError:
+            pass
+        if self.read_timeout is not None:
+            self.sock.settimeout(self.read_timeout)
+
+class _TimeoutHTTPConnection(_TimeoutConnectionMixin, http.client.HTTPConnection):
+    pass
+
+class _TimeoutHTTPSConnection(_TimeoutConnectionMixin, http.client.HTTPSConnection):
+    pass
+
+class KeepAliveTransport(xmlrpc.client.Transport):
+    """
+    XML-RPC transport that keeps one persistent HTTP(S) connection open across calls,
+    accepts gzip-encoded responses and enforces connect/read timeouts on the socket.
+    Not thread-safe: use one instance per ServerProxy (the connection pool does this).
+    """
+    accept_gzip_encoding = True
+
+    def __init__(self, use_https=True, connect_timeout=None, read_timeout=None):
+        super().__init__()
+        self.use_https = use_https
+        self.connect_timeout = ODOO_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+        self.read_timeout = ODOO_READ_TIMEOUT if read_timeout is None else read_timeout
+
+    def make_connection(self, host):
+        # Reuse the existing connection when possible (HTTP/1.1 keep-alive)
+        if self._connection and host == self._connection[0]:
+            return self._connection[1]
+        chost, self._extra_headers, x509 = self.get_host_info(host)
+        if self.use_https:
+            conn = _TimeoutHTTPSConnection(chost, timeout=self.connect_timeout, **(x509 or {}))
+        else:
+            conn = _TimeoutHTTPConnection(chost, timeout=self.connect_timeout)
+        conn.read_timeout = self.read_timeout
+        self._connection = host, conn
+        return conn
+
+def make_odoo_server_proxy(endpoint):
+    """Create a ServerProxy for an Odoo XML-RPC endpoint ('common' or 'object') using KeepAliveTransport."""
+    transport = KeepAliveTransport(use_https=ODOO_URL.lower().startswith('https'))
+    return xmlrpc.client.ServerProxy(f'{ODOO_URL}/xmlrpc/2/{endpoint}', transport=transport,
+                                     allow_none=True, verbose=False)
+
+def _new_odoo_models_proxy():
+    """Create a fresh XML-RPC proxy for the Odoo object endpoint."""
+    return make_odoo_server_proxy('object')
+
+def _close_odoo_proxy(proxy):
+    """Close the underlying HTTP connection of a ServerProxy, ignoring errors."""
+    try:
+        proxy('close')()
+    except Exception:
+        pass
+
+def _evict_idle_odoo_connections_locked(now):
+    """Drop idle connections older than ODOO_POOL_IDLE_TIMEOUT. Caller holds pool['available']."""
+    pool = _odoo_connection_pool
+    fresh = []
+    for proxy, returned_at in pool['idle']:
+        if now - returned_at > ODOO_POOL_IDLE_TIMEOUT:
+            _close_odoo_proxy(proxy)
+            pool['evicted'] += 1
+        else:
+            fresh.append((proxy, returned_at))
+    pool['idle'] = fresh
+
+def checkout_odoo_connection(timeout=None):
+    """
+    Borrow a ServerProxy from the pool, creating one if the pool is below ODOO_POOL_SIZE.
+    Blocks up to `timeout` seconds when every connection is in use.
+    """
+    pool = _odoo_connection_pool
+    timeout = ODOO_POOL_CHECKOUT_TIMEOUT if timeout is None else timeout
+    deadline = time.time() + timeout
+    with pool['available']:
+        pool['waiting'] += 1
+        try:
+            while True:
+                now = time.time()
+                _evict_idle_odoo_connections_locked(now)
+                if pool['idle']:
+                    proxy, _ = pool['idle'].pop()
+                    pool['in_use'] += 1
+                    return proxy
+                if pool['in_use'] < ODOO_POOL_SIZE:
+                    # Reserve a slot; the proxy itself is created outside the lock
+                    pool['in_use'] += 1
+                    pool['created'] += 1
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise Exception(f"Timed out waiting for a free Odoo connection ({ODOO_POOL_SIZE} in use)")
+                pool['available'].wait(remaining)
+        finally:
+            pool['waiting'] -= 1
+    try:
+        return _new_odoo_models_proxy()
+    except Exception:
+        with pool['available']:
+            pool['in_use'] -= 1
+            pool['available'].notify()
+        raise
+
+def release_odoo_connection(proxy, discard=False):
+    """Return a borrowed ServerProxy to the pool; discard it if the last call failed."""
+    pool = _odoo_connection_pool
+    with pool['available']:
+        pool['in_use'] = max(0, pool['in_use'] - 1)
+        if discard:
+            _close_odoo_proxy(proxy)
+        else:
+            pool['idle'].append((proxy, time.time()))
+        pool['available'].notify()
+
+def drain_odoo_connection_pool():
+    """Close all idle pooled connections (e.g. after a connection error)."""
+    pool = _odoo_connection_pool
+    with pool['available']:
+        for proxy, _ in pool['idle']:
+            _close_odoo_proxy(proxy)
+        pool['idle'] = []
+
+def get_odoo_pool_stats():
+    """Return current pool occupancy counters."""
+    pool = _odoo_connection_pool
+    with pool['available']:
+        return {
+            'size': ODOO_POOL_SIZE,
+            'in_use': pool['in_use'],
+            'idle': len(pool['idle']),
+            'waiting': pool['waiting'],
+            'created': pool['created'],
+            'evicted': pool['evicted']
+        }
+
+class OdooDeadlineExceeded(Exception):
+    """Raised when an Odoo call cannot complete before its timeout or the caller's deadline."""
+
+# Absolute time.time() deadline for Odoo I/O in the current request / warmer run (None = no deadline)
+_odoo_deadline = contextvars.ContextVar('odoo_deadline', default=None)
+
+# Shared, bounded executor for all Odoo I/O. One worker per pooled connection; at most
+# ODOO_IO_MAX_QUEUE further calls may wait for a worker.
+_odoo_io = {
+    'executor': ThreadPoolExecutor(max_workers=ODOO_POOL_SIZE, thread_name_prefix='odoo-io'),
+    'slots': threading.BoundedSemaphore(ODOO_POOL_SIZE + ODOO_IO_MAX_QUEUE),
+    'lock': threading.Lock(),
+    'queued': 0,
+    'active': 0,
+    'completed': 0,
+    'abandoned': 0,  # Timed out while running; the result is discarded when it arrives
+    'cancelled': 0,  # Timed out before a worker picked it up
+    'rejected': 0    # Deadline already passed or queue full
+}
+
+def get_odoo_time_remaining():
+    """Seconds left before the current Odoo deadline, or None when no deadline is set."""
+    deadline = _odoo_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+@contextlib.contextmanager
+def odoo_deadline(seconds):
+    """Limit Odoo I/O inside the block to `seconds`, keeping any tighter outer deadline."""
+    new_deadline = time.time() + seconds
+    current = _odoo_deadline.get()
+    if current is not None:
+        new_deadline = min(new_deadline, current)
+    token = _odoo_deadline.set(new_deadline)
+    try:
+        yield
+    finally:
+        _odoo_deadline.reset(token)
+
+class OdooCallBudgetExceeded(OdooDeadlineExceeded):
+    """Raised when a block limited by odoo_call_budget() tries to send more Odoo calls than it is allowed."""
+
+# Odoo calls allowed in the current warmer run (None = unlimited); shared with worker threads
+# through submit_with_odoo_context() like the deadline
+_odoo_call_budget = contextvars.ContextVar('odoo_call_budget', default=None)
+
+@contextlib.contextmanager
+def odoo_call_budget(calls):
+    """Let at most `calls` Odoo calls through run_odoo_io() inside the block; later ones raise OdooCallBudgetExceeded."""
+    budget = {'lock': threading.Lock(), 'limit': calls, 'used': 0, 'rejected': 0}
+    token = _odoo_call_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _odoo_call_budget.reset(token)
+
+def odoo_call_budget_exhausted():
+    """True when the current call budget has turned away at least one call (results may be partial)."""
+    budget = _odoo_call_budget.get()
+    return budget is not None and budget['rejected'] > 0
+
+# Request-scoped memo of Odoo reads: identical (model, method, domain, fields/options) reads within
+# one HTTP request or warmer run are served from memory. Shared by reference with worker threads
+# through submit_with_odoo_context().
+_odoo_read_memo = contextvars.ContextVar('odoo_read_memo', default=None)
+ODOO_MEMOIZED_METHODS = ('search', 'search_read', 'search_count', 'read', 'read_group', 'fields_get')
+_odoo_read_memo_totals = {'lock': threading.Lock(), 'hits': 0, 'misses': 0}
+
+def _new_odoo_read_memo():
+    return {'lock': threading.Lock(), 'entries': {}, 'hits': 0, 'misses': 0}
+
+@contextlib.contextmanager
+def odoo_read_memo():
+    """Memoize identical Odoo reads inside the block (reuses an enclosing memo if one is active)."""
+    if _odoo_read_memo.get() is not None:
+        yield _odoo_read_memo.get()
+        return
+    token = _odoo_read_memo.set(_new_odoo_read_memo())
+    try:
+        yield _odoo_read_memo.get()
+    finally:
+        _odoo_read_memo.reset(token)
+
+def _odoo_read_memo_key(model_name, method, args, kwargs):
+    return (model_name, method,
+            json.dumps(args, sort_keys=True, default=str),
+            json.dumps(kwargs or {}, sort_keys=True, default=str))
+
+def _memoized_odoo_read(key, call):
+    """Run `call()` unless the read with this memo key already succeeded in the current memo scope."""
+    memo = _odoo_read_memo.get()
+    if memo is None:
+        return call()
+    with memo['lock']:
+        found = key in memo['entries']
+        if found:
+            memo['hits'] += 1
+            hit = memo['entries'][key]
+    if found:
+        with _odoo_read_memo_totals['lock']:
+            _odoo_read_memo_totals['hits'] += 1
+        # Callers may mutate the records they get back, so every caller gets its own copy
+        return copy.deepcopy(hit)
+    result = call()
+    with memo['lock']:
+        memo['entries'][key] = copy.deepcopy(result)
+        memo['misses'] += 1
+    with _odoo_read_memo_totals['lock']:
+        _odoo_read_memo_totals['misses'] += 1
+    return result
+
+def get_odoo_read_memo_stats():
+    """Memo hits (Odoo reads saved) and misses (reads sent) for the current scope, or None outside one."""
+    memo = _odoo_read_memo.get()
+    if memo is None:
+        return None
+    with memo['lock']:
+        return {'hits': memo['hits'], 'misses': memo['misses']}
+
+def get_odoo_read_memo_totals():
+    """Process-wide memo hit/miss counters since start-up."""
+    with _odoo_read_memo_totals['lock']:
+        return {'hits': _odoo_read_memo_totals['hits'], 'misses': _odoo_read_memo_totals['misses']}
+
+# Single-flight: concurrent callers with the same key share one computation instead of each
+# sending the same query to Odoo (e.g. several users opening a month right after cache expiry)
+_single_flight = {'lock': threading.Lock(), 'calls': {}, 'leaders': 0, 'followers': 0, 'timeouts': 0}
+
+def single_flight(key, fn):
+    """
+    Run fn() once for all concurrent callers with the same key. The first caller computes;
+    the others wait (within their Odoo deadline) and get a copy of its result, or its exception.
+    """
+    with _single_flight['lock']:
+        call = _single_flight['calls'].get(key)
+        leader = call is None
+        if leader:
+            call = {'event': threading.Event(), 'result': None, 'error': None, 'waiters': 0}
+            _single_flight['calls'][key] = call
+            _single_flight['leaders'] += 1
+        else:
+            call['waiters'] += 1
+            _single_flight['followers'] += 1
+
+    if leader:
+        try:
+            result = fn()
+        except BaseException as e:
+            with _single_flight['lock']:
+                _single_flight['calls'].pop(key, None)
+            call['error'] = e
+            call['event'].set()
+            raise
+        with _single_flight['lock']:
+            _single_flight['calls'].pop(key, None)
+            waiters = call['waiters']
+        if waiters:
+            # Keep a private copy so the leader's caller can mutate its result freely
+            call['result'] = copy.deepcopy(result)
+        call['event'].set()
+        return result
+
+    remaining = get_odoo_time_remaining()
+    if not call['event'].wait(timeout=None if remaining is None else max(remaining, 0)):
+        with _single_flight['lock']:
+            _single_flight['timeouts'] += 1
+        raise OdooDeadlineExceeded(f"Request deadline exceeded waiting for in-flight {key[0]}")
+    if call['error'] is not None:
+        remaining = get_odoo_time_remaining()
+        if isinstance(call['error'], OdooDeadlineExceeded) and (remaining is None or remaining > 0):
+            # The leader ran out of its own time budget; this caller still has time to try
+            return single_flight(key, fn)
+        raise call['error']
+    return copy.deepcopy(call['result'])
+
+def get_single_flight_stats():
+    """Computations started (leaders), callers that joined one in flight (followers) and waits that timed out."""
+    with _single_flight['lock']:
+        return {
+            'in_flight': len(_single_flight['calls']),
+            'leaders': _single_flight['leaders'],
+            'followers': _single_flight['followers'],
+            'timeouts': _single_flight['timeouts']
+        }
+
+def submit_with_odoo_context(executor, fn, *args, **kwargs):
+    """executor.submit() that carries the caller's Odoo deadline and read memo into the worker thread."""
+    ctx = contextvars.copy_context()
+    return executor.submit(ctx.run, fn, *args, **kwargs)
+
+def _bump_odoo_io_stat(name, delta=1):
+    with _odoo_io['lock']:
+        _odoo_io[name] += delta
+
+def run_odoo_io(fn, *args, timeout=None):
+    """
+    Run a blocking Odoo call on the shared I/O executor, waiting at most the smaller of
+    `timeout` (default ODOO_CALL_TIMEOUT) and the time left before the current deadline.
+    Calls still queued at timeout are cancelled; calls already running are abandoned and
+    bounded by the socket read timeout.
+    """
+    timeout = ODOO_CALL_TIMEOUT if timeout is None else timeout
+    budget = _odoo_call_budget.get()
+    if budget is not None:
+        with budget['lock']:
+            if budget['used'] >= budget['limit']:
+                budget['rejected'] += 1
+                _bump_odoo_io_stat('rejected')
+                raise OdooCallBudgetExceeded(f"Odoo call budget of {budget['limit']} calls used up")
+            budget['used'] += 1
+    remaining = get_odoo_time_remaining()
+    if remaining is not None:
+        if remaining <= 0:
+            _bump_odoo_io_stat('rejected')
+            raise OdooDeadlineExceeded("Request deadline exceeded before Odoo call was issued")
+        timeout = min(timeout, remaining)
+    call_deadline = time.time() + timeout
+
+    io = _odoo_io
+    if not io['slots'].acquire(timeout=timeout):
+        _bump_odoo_io_stat('rejected')
+        raise OdooDeadlineExceeded(f"Odoo I/O queue full; call timeout after {timeout:.1f}s")
+
+    def task():
+        with io['lock']:
+            io['queued'] -= 1
+            io['active'] += 1
+        try:
+            return fn(*args)
+        finally:
+            with io['lock']:
+                io['active'] -= 1
+                io['completed'] += 1
+
+    _bump_odoo_io_stat('queued')
+    try:
+        future = io['executor'].submit(task)
+    except Exception:
+        _bump_odoo_io_stat('queued', -1)
+        io['slots'].release()
+        raise
+    future.add_done_callback(lambda _f: io['slots'].release())
+
+    try:
+        return future.result(timeout=max(call_deadline - time.time(), 0))
+    except FutureTimeoutError:
+        if future.cancel():
+            with io['lock']:
+                io['queued'] -= 1
+                io['cancelled'] += 1
+        else:
+            _bump_odoo_io_stat('abandoned')
+        raise OdooDeadlineExceeded(f"Odoo call timeout after {timeout:.1f}s")
+
+def get_odoo_executor_stats():
+    """Return queue depth, active workers and abandoned/cancelled/rejected call counts."""
+    with _odoo_io['lock']:
+        return {
+            'max_workers': ODOO_POOL_SIZE,
+            'max_queue': ODOO_IO_MAX_QUEUE,
+            'queued': _odoo_io['queued'],
+            'active': _odoo_io['active'],
+            'completed': _odoo_io['completed'],
+            'abandoned': _odoo_io['abandoned'],
+            'cancelled': _odoo_io['cancelled'],
+            'rejected': _odoo_io['rejected']
+        }
+
+@app.before_request
+def _start_odoo_request_deadline():
+    """Give every HTTP request an Odoo time budget of ODOO_REQUEST_DEADLINE_SECONDS and its own read memo."""
+    _odoo_deadline.set(time.time() + ODOO_REQUEST_DEADLINE_SECONDS)
+    _odoo_read_memo.set(_new_odoo_read_memo())
+
+@app.teardown_request
+def _clear_odoo_request_deadline(exc=None):
+    _odoo_deadline.set(None)
+    _odoo_read_memo.set(None)
+
+class PooledOdooModels:
+    """
+    Stand-in for the `models` ServerProxy returned by connect_to_odoo().
+    Each execute_kw call runs on the shared Odoo I/O executor and checks out its
+    own pooled connection, so the object can be shared freely between threads.
+    Reads repeated within one request / warmer run are served from the read memo, and
+    identical reads issued concurrently by different requests share one Odoo round trip.
+    """
+
+    def execute_kw(self, *args):
+        model_name, method = args[3], args[4]
+        if method not in ODOO_MEMOIZED_METHODS:
+            return run_odoo_io(self._execute_kw_pooled, *args)
+        key = _odoo_read_memo_key(model_name, method,
+                                  args[5] if len(args) > 5 else [],
+                                  args[6] if len(args) > 6 else {})
+        return _memoized_odoo_read(key, lambda: single_flight(
+            ('odoo_read',) + key, lambda: run_odoo_io(self._execute_kw_pooled, *args)))
+
+    def _execute_kw_pooled(self, *args):
+        proxy = checkout_odoo_connection()
+        discard = True
+        try:
+            result = proxy.execute_kw(*args)
+            discard = False
+            return result
+        except xmlrpc.client.Fault:
+            # Odoo answered with an application error; the connection itself is fine
+            discard = False
+            raise
+        finally:
+            release_odoo_connection(proxy, discard=discard)
+
 def check_connection_health(models, uid):
     """Check if the current connection is healthy by making a simple test call"""
     try:
@@ -1219,7 +2756,8 @@ def connect_to_odoo():
                 _odoo_connection_pool['last_used'] = None
                 _odoo_connection_pool['connection_health'] = 'unknown'
                 _odoo_connection_pool['consecutive_failures'] = 0
-        
+                drain_odoo_connection_pool()
+
         # Retry logic for connection - reduced to 2 attempts for faster failure detection
         max_retries = 2
         for attempt in range(max_retries):
@@ -1229,47 +2767,18 @@ def connect_to_odoo():
                 _odoo_connection_pool['uid'] = None
                 _odoo_connection_pool['last_used'] = None
                 
-                # Create XML-RPC proxies with timeout and better connection handling
-                import http.client
-                # Configure longer timeout and disable connection reuse for stability
-                timeout = 30  # 30 second timeout
-                common = xmlrpc.client.ServerProxy(f'{ODOO_URL}/xmlrpc/2/common', 
-                                                 allow_none=True, verbose=False)
-                models = xmlrpc.client.ServerProxy(f'{ODOO_URL}/xmlrpc/2/object', 
-                                                 allow_none=True, verbose=False)
-                
-                # Cross-platform timeout implementation
-                import threading
-                import queue
-                
-                def authenticate_with_timeout():
-                    """Authenticate with timeout using threading"""
-                    result_queue = queue.Queue()
-                    
-                    def auth_worker():
-                        try:
-                            uid = common.authenticate(ODOO_DB, ODOO_USERNAME, ODOO_PASSWORD, {})
-                            result_queue.put(('success', uid))
-                        except Exception as e:
-                            result_queue.put(('error', str(e)))
-                    
-                    # Start authentication in a separate thread
-                    auth_thread = threading.Thread(target=auth_worker)
-                    auth_thread.daemon = True
-                    auth_thread.start()
-                    
-                    # Wait for result with timeout
-                    try:
-                        result_type, result_data = result_queue.get(timeout=15)  # Increased timeout to 15 seconds
-                        if result_type == 'success':
-                            return result_data
-                        else:
-                            raise Exception(f"Authentication failed: {result_data}")
-                    except queue.Empty:
-                        raise Exception("Connection timeout during authentication")
+                # The common endpoint is only used here for authentication; object calls
+                # go through the thread-safe connection pool
+                common = make_odoo_server_proxy('common')
+                models = PooledOdooModels()
                 
-                # Authenticate with timeout
-                uid = authenticate_with_timeout()
+                # Authenticate on the shared Odoo I/O executor with a 15 second timeout
+                try:
+                    uid = run_odoo_io(common.authenticate, ODOO_DB, ODOO_USERNAME, ODOO_PASSWORD, {}, timeout=15)
+                except OdooDeadlineExceeded:
+                    raise Exception("Connection timeout during authentication")
+                except Exception as auth_error:
+                    raise Exception(f"Authentication failed: {auth_error}")
                 
                 if not uid:
                     raise Exception("Authentication failed")
@@ -1310,6 +2819,7 @@ def connect_to_odoo():
                 _odoo_connection_pool['uid'] = None
                 _odoo_connection_pool['last_used'] = None
                 _odoo_connection_pool['connection_health'] = 'unhealthy'
+                drain_odoo_connection_pool()
                 
                 # Wait before retry with exponential backoff for connection errors
                 if attempt < max_retries - 1:
@@ -1352,48 +2862,25 @@ def execute_odoo_call_with_retry(models, uid, model_name, method, args, kwargs=N
     
     for attempt in range(max_retries):
         try:
-            # Add timeout wrapper for the call
-            import threading
-            import queue
-            
-            result_queue = queue.Queue()
-            
-            def call_worker():
-                try:
-                    if method == 'search_read':
-                        result = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, model_name, method, args, kwargs)
-                    elif method == 'read':
-                        result = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, model_name, method, args, kwargs)
-                    elif method == 'search':
-                        result = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, model_name, method, args, kwargs)
-                    elif method == 'search_count':
-                        result = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, model_name, method, args, kwargs)
-                    else:
-                        result = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, model_name, method, args, kwargs)
-                    result_queue.put(('success', result))
-                except Exception as e:
-                    result_queue.put(('error', str(e)))
-            
-            # Start call in a separate thread
-            call_thread = threading.Thread(target=call_worker)
-            call_thread.daemon = True
-            call_thread.start()
-            
-            # Wait for result with timeout
+            # Runs on the shared Odoo I/O executor; times out at ODOO_CALL_TIMEOUT or the request deadline
             try:
-                result_type, result_data = result_queue.get(timeout=60)  # Increased timeout to 60 seconds
-                if result_type == 'success':
-                    update_connection_health(True)  # Mark as successful
-                    return result_data
-                else:
-                    update_connection_health(False)  # Mark as failed
-                    raise Exception(f"Odoo call failed: {result_data}")
-            except queue.Empty:
+                result = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, model_name, method, args, kwargs)
+            except OdooDeadlineExceeded:
+                update_connection_health(False)  # Mark as failed
+                raise
+            except Exception as call_error:
                 update_connection_health(False)  # Mark as failed
-                raise Exception("Odoo call timeout")
+                raise Exception(f"Odoo call failed: {call_error}")
+            update_connection_health(True)  # Mark as successful
+            return result
                 
         except Exception as e:
             print(f"Error in Odoo call (attempt {attempt + 1}/{max_retries}): {e}")
+
+            # Retrying cannot help once the request deadline has passed
+            remaining = get_odoo_time_remaining()
+            if isinstance(e, OdooDeadlineExceeded) and remaining is not None and remaining <= 1:
+                raise e
             
             # If it's a connection error, try to reconnect
             if any(error_type in str(e).lower() for error_type in ['timeout', 'connection', 'request-sent', 'idle']):
@@ -1403,7 +2890,8 @@ def execute_odoo_call_with_retry(models, uid, model_name, method, args, kwargs=N
                     _odoo_connection_pool['models'] = None
                     _odoo_connection_pool['uid'] = None
                     _odoo_connection_pool['last_used'] = None
-                
+                drain_odoo_connection_pool()
+
                 # Wait before retry (reduced backoff for faster recovery)
                 if attempt < max_retries - 1:
                     wait_time = 1  # Fixed 1 second wait instead of exponential backoff
@@ -1579,21 +3067,7 @@ def remove_shareholder_email(email):
 
 def _get_last_week_period():
     # Determine last week based on Sunday-Saturday weeks to match get_date_range
-    today = datetime.date.today()
-    last_week_day = today - datetime.timedelta(days=7)
-    # Find first Sunday of the year for that date's year
-    start_of_year = datetime.date(last_week_day.year, 1, 1)
-    days_until_sunday = (6 - start_of_year.weekday()) % 7
-    first_sunday = start_of_year + datetime.timedelta(days=days_until_sunday)
-    # Compute the Sunday of last_week_day's week
-    days_since_sunday = (last_week_day.weekday() - 6) % 7
-    week_start = last_week_day - datetime.timedelta(days=days_since_sunday)
-    # Week number offset from first_sunday
-    delta_days = (week_start - first_sunday).days
-    week_number = (delta_days // 7) + 1
-    if week_number < 1:
-        week_number = 1
-    return f"{week_start.year}-{week_number:02d}"
+    return _week_period_for_date(datetime.date.today() - datetime.timedelta(days=7))
 
 def _get_last_month_period():
     """Get the previous month's period in YYYY-MM format"""
@@ -1639,7 +3113,6 @@ def get_dashboard_data(period=None, view_type='monthly'):
         if cached_creative is None:
             creative_data = fetch_department_data_sequential('Creative', period, view_type)
             if creative_data:
-                set_cached_data('creative', creative_data, period, view_type)
                 result['creative'] = creative_data
             else:
                 # Fallback to original methods
@@ -1658,7 +3131,6 @@ def get_dashboard_data(period=None, view_type='monthly'):
         if cached_creative_strategy is None:
             creative_strategy_data = fetch_department_data_sequential('Creative Strategy', period, view_type)
             if creative_strategy_data:
-                set_cached_data('creative_strategy', creative_strategy_data, period, view_type)
                 result['creative_strategy'] = creative_strategy_data
             else:
                 # Fallback to original methods
@@ -1677,7 +3149,6 @@ def get_dashboard_data(period=None, view_type='monthly'):
         if cached_instructional_design is None:
             instructional_design_data = fetch_department_data_sequential('Instructional Design', period, view_type)
             if instructional_design_data:
-                set_cached_data('instructional_design', instructional_design_data, period, view_type)
                 result['instructional_design'] = instructional_design_data
             else:
                 # Fallback to original methods
@@ -2169,6 +3640,141 @@ def send_html_email_via_smtp(to_email, subject, html):
     except Exception as e:
         print(f"Error sending email to {to_email}: {e}")
         return False
+# Capacity engine: working days, base hours and public holiday hours for many employees and periods
+# at once. A resource calendar becomes a weekmask and a holiday the range of days it fully covers, so
+# every figure is a business-day count (numpy.busday_count when available) instead of a walk over
+# the days. The results are the same as the original day-by-day rules.
+WORKING_HOURS_PER_DAY = 8
+HOLIDAY_FULL_DAY_HOURS = WORKING_HOURS_PER_DAY - 0.1  # A holiday day counts when it covers ~the whole day
+HOLIDAY_MAX_DAYS_PER_HOLIDAY = 62  # Days of one holiday evaluated per period (safety for two-month spans)
+HOLIDAY_HOURS_CAP = {'daily': 8, 'weekly': 40, 'monthly': 200}
+
+def _weekmask(weekdays):
+    return ''.join('1' if weekday in weekdays else '0' for weekday in range(7))
+
+def _busday_count(weekdays, start_date, end_date):
+    """Days in [start_date, end_date] whose weekday is in weekdays (0 when the range is empty)."""
+    if end_date < start_date:
+        return 0
+    full_weeks, rest = divmod((end_date - start_date).days + 1, 7)
+    first = start_date.weekday()
+    return full_weeks * len(weekdays) + sum(1 for i in range(rest) if (first + i) % 7 in weekdays)
+
+def _parse_holiday_bound(value, is_end=False):
+    if isinstance(value, str):
+        s = value.replace('Z', '+00:00').replace(' ', 'T')
+        if 'T' not in s:
+            s += 'T23:59:59' if is_end else 'T00:00:00'
+        return datetime.datetime.fromisoformat(s)
+    if isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.combine(value, datetime.time(23, 59, 59) if is_end else datetime.time(0, 0, 0))
+
+def holiday_day_spans(holidays):
+    """
+    (first day, first fully covered day, last fully covered day, last day) of each holiday.
+    Days between the first and last day are always covered in full; the edge days only
+    when the holiday covers at least HOLIDAY_FULL_DAY_HOURS of them.
+    """
+    spans = []
+    for holiday in holidays:
+        try:
+            start = _parse_holiday_bound(holiday['date_from'])
+            end = _parse_holiday_bound(holiday['date_to'], is_end=True)
+            if end < start:
+                continue
+            first_day, last_day = start.date(), end.date()
+            day_end = datetime.datetime.combine(first_day, datetime.time(23, 59, 59))
+            first_hours = (min(end, day_end) - start).total_seconds() / 3600.0
+            first_full = first_day if first_hours >= HOLIDAY_FULL_DAY_HOURS else first_day + datetime.timedelta(days=1)
+            last_hours = (end - datetime.datetime.combine(last_day, datetime.time(0, 0, 0))).total_seconds() / 3600.0
+            if last_day == first_day:
+                last_full = last_day if first_hours >= HOLIDAY_FULL_DAY_HOURS else last_day - datetime.timedelta(days=1)
+            else:
+                last_full = last_day if last_hours >= HOLIDAY_FULL_DAY_HOURS else last_day - datetime.timedelta(days=1)
+            spans.append((first_day, first_full, last_full, last_day))
+        except Exception as e:
+            print(f"Error processing holiday '{holiday.get('name', 'Unknown')}': {e}")
+    return spans
+
+def count_working_days(weekdays, periods):
+    """Working days of a weekday set in each (start_date, end_date) period."""
+    if not periods:
+        return []
+    if np is not None and weekdays:
+        starts = np.array([start for start, _ in periods], dtype='datetime64[D]')
+        ends = np.array([end for _, end in periods], dtype='datetime64[D]') + 1
+        counts = np.busday_count(starts, np.maximum(starts, ends), weekmask=_weekmask(weekdays))
+        return [int(count) for count in counts]
+    return [_busday_count(weekdays, start, end) for start, end in periods]
+
+def count_holiday_days(spans, weekdays, periods, view_type='monthly'):
+    """
+    Holiday working days in each period, counted once per holiday (overlapping holidays add up).
+    Monthly/weekly: fully covered days. Daily: the single-day period is touched by the holiday.
+    """
+    if not spans or not periods or not weekdays:
+        return [0] * len(periods)
+    if view_type == 'daily':
+        return [sum(1 for first_day, _, _, last_day in spans if first_day <= start <= last_day)
+                if start == end and start.weekday() in weekdays else 0
+                for start, end in periods]
+    if np is not None:
+        first_day = np.array([span[0] for span in spans], dtype='datetime64[D]')[:, None]
+        first_full = np.array([span[1] for span in spans], dtype='datetime64[D]')[:, None]
+        last_full = np.array([span[2] for span in spans], dtype='datetime64[D]')[:, None]
+        last_day = np.array([span[3] for span in spans], dtype='datetime64[D]')[:, None]
+        starts = np.array([start for start, _ in periods], dtype='datetime64[D]')[None, :]
+        ends = np.array([end for _, end in periods], dtype='datetime64[D]')[None, :]
+        overlap_start = np.maximum(first_day, starts)
+        begin = np.maximum(first_full, starts)
+        stop = np.minimum(np.minimum(last_full, ends), overlap_start + (HOLIDAY_MAX_DAYS_PER_HOLIDAY - 1)) + 1
+        counts = np.busday_count(begin, np.maximum(begin, stop), weekmask=_weekmask(weekdays))
+        counts = np.where((first_day <= ends) & (last_day >= starts), counts, 0)
+        return [int(count) for count in counts.sum(axis=0)]
+    result = []
+    for start, end in periods:
+        days = 0
+        for first_day, first_full, last_full, last_day in spans:
+            if first_day > end or last_day < start:
+                continue
+            cap = max(first_day, start) + datetime.timedelta(days=HOLIDAY_MAX_DAYS_PER_HOLIDAY - 1)
+            days += _busday_count(weekdays, max(first_full, start), min(last_full, end, cap))
+        result.append(days)
+    return result
+
+def holiday_hours_from_days(days, view_type='monthly'):
+    return min(days * WORKING_HOURS_PER_DAY, HOLIDAY_HOURS_CAP.get(view_type, 200))
+
+def compute_capacity(employee_weekdays, employee_holidays, periods, view_type='monthly'):
+    """
+    Capacity of many employees over many (start_date, end_date) periods in one pass.
+
+    employee_weekdays: {employee_id: working weekdays}; employee_holidays: {employee_id: public
+    holidays}. Employees sharing a calendar and holiday list are computed together.
+    Returns {employee_id: [{'working_days', 'base_hours', 'holiday_hours', 'available_hours'}, ...]}
+    with one entry per period; available_hours is base minus holiday hours (Time Off not included).
+    """
+    groups = defaultdict(list)
+    holiday_lists = {}
+    for emp_id, weekdays in employee_weekdays.items():
+        holidays = employee_holidays.get(emp_id) or []
+        holiday_lists[id(holidays)] = holidays
+        groups[(frozenset(weekdays), id(holidays))].append(emp_id)
+    result = {}
+    for (weekdays, holidays_key), emp_ids in groups.items():
+        working_days = count_working_days(weekdays, periods)
+        holiday_days = count_holiday_days(holiday_day_spans(holiday_lists[holidays_key]), weekdays, periods, view_type)
+        capacity = []
+        for days, off_days in zip(working_days, holiday_days):
+            base_hours = days * WORKING_HOURS_PER_DAY
+            holiday_hours = holiday_hours_from_days(off_days, view_type)
+            capacity.append({'working_days': days, 'base_hours': base_hours, 'holiday_hours': holiday_hours,
+                             'available_hours': base_hours - holiday_hours})
+        for emp_id in emp_ids:
+            result[emp_id] = capacity
+    return result
+
 def calculate_working_days_and_hours(start_date, end_date):
     """
     Calculate the number of working days and base available hours for a given period.
@@ -2181,84 +3787,165 @@ def calculate_working_days_and_hours(start_date, end_date):
     Returns:
         tuple: (working_days, base_available_hours)
     """
-    working_days = 0
-    current_date = start_date
-    
-    while current_date <= end_date:
-        # In Python: Monday=0, Tuesday=1, Wednesday=2, Thursday=3, Friday=4, Saturday=5, Sunday=6
-        # Working days: Sunday(6), Monday(0), Tuesday(1), Wednesday(2), Thursday(3)
-        if current_date.weekday() in [6, 0, 1, 2, 3]:  # Sunday to Thursday
-            working_days += 1
-        current_date += datetime.timedelta(days=1)
+    # Working days: Sunday(6), Monday(0), Tuesday(1), Wednesday(2), Thursday(3)
+    working_days = count_working_days(DEFAULT_WORKING_WEEKDAYS, [(start_date, end_date)])[0]
     
     # 8 hours per working day
-    base_available_hours = working_days * 8
+    base_available_hours = working_days * WORKING_HOURS_PER_DAY
     
     print(f"Period {start_date} to {end_date}: {working_days} working days = {base_available_hours} base hours")
     return working_days, base_available_hours
 
+DEFAULT_WORKING_WEEKDAYS = frozenset({6, 0, 1, 2, 3})  # Sun-Thu
+DEFAULT_CALENDAR_SCHEDULE = {'weekdays': DEFAULT_WORKING_WEEKDAYS,
+                             'hours_per_day': {weekday: 8.0 for weekday in DEFAULT_WORKING_WEEKDAYS}}
+_calendar_schedule_locks = defaultdict(threading.Lock)
+_calendar_schedule_locks_guard = threading.Lock()
+
+def _calendar_schedule_from_attendances(attendances):
+    """Working weekdays and hours per weekday from resource.calendar.attendance records."""
+    hours_per_day = defaultdict(float)
+    for att in attendances:
+        # Odoo stores dayofweek as string '0'..'6' with Mon=0
+        try:
+            weekday = int(att.get('dayofweek'))
+        except Exception:
+            continue
+        if 0 <= weekday <= 6:
+            hours_per_day[weekday] += max(float(att.get('hour_to') or 0) - float(att.get('hour_from') or 0), 0.0)
+    if not hours_per_day:
+        return DEFAULT_CALENDAR_SCHEDULE
+    return {'weekdays': frozenset(hours_per_day), 'hours_per_day': dict(hours_per_day)}
+
+def get_calendar_schedules(models, uid, calendar_ids):
+    """
+    Return {calendar_id: schedule} for several resource calendars (see DEFAULT_CALENDAR_SCHEDULE).
+    Cached per calendar; misses are loaded together with one attendance search_read (or taken
+    from the reference data), holding each missing calendar's lock so concurrent callers
+    don't load the same calendar twice.
+    """
+    calendar_ids = sorted({cal_id for cal_id in calendar_ids if cal_id})
+    result = {}
+    missing = []
+    for cal_id in calendar_ids:
+        schedule = cache_store.get('calendar_schedules', cal_id)
+        if schedule is not None:
+            result[cal_id] = schedule
+        else:
+            missing.append(cal_id)
+    if not missing:
+        return result
+
+    with _calendar_schedule_locks_guard:
+        locks = [_calendar_schedule_locks[cal_id] for cal_id in missing]
+    with contextlib.ExitStack() as stack:
+        # Sorted order, so callers with overlapping calendar lists can't deadlock
+        for lock in locks:
+            stack.enter_context(lock)
+        to_load = []
+        for cal_id in missing:
+            schedule = cache_store.get('calendar_schedules', cal_id)
+            if schedule is not None:
+                result[cal_id] = schedule
+            else:
+                to_load.append(cal_id)
+        if to_load:
+            reference = get_reference_data(models, uid)
+            attendances_by_calendar = {cal_id: reference.calendars[cal_id]['attendances'] for cal_id in to_load
+                                       if reference and cal_id in reference.calendars}
+            unknown = [cal_id for cal_id in to_load if cal_id not in attendances_by_calendar]
+            if unknown:
+                attendances = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'resource.calendar.attendance', 'search_read',
+                                                [[('calendar_id', 'in', unknown)]], {'fields': ReferenceData.ATTENDANCE_FIELDS})
+                for cal_id in unknown:
+                    attendances_by_calendar[cal_id] = []
+                for att in attendances:
+                    attendances_by_calendar.setdefault(_many2one_id(att.get('calendar_id')), []).append(att)
+            for cal_id in to_load:
+                schedule = _calendar_schedule_from_attendances(attendances_by_calendar.get(cal_id) or [])
+                cache_store.set('calendar_schedules', cal_id, schedule)
+                result[cal_id] = schedule
+    return result
+
+def get_employee_calendar_schedules(models, uid, employee_ids):
+    """
+    Return {employee_id: schedule} for a list of employees based on hr.employee.resource_calendar_id,
+    in at most two Odoo calls. Employees without a calendar (or on error) get DEFAULT_CALENDAR_SCHEDULE.
+    """
+    employee_ids = list(employee_ids)
+    try:
+        reference = get_reference_data(models, uid)
+        calendar_by_employee = {}
+        unknown = []
+        for emp_id in employee_ids:
+            emp = reference.employees_by_id.get(emp_id) if reference else None
+            if emp is None:
+                unknown.append(emp_id)
+            else:
+                calendar_by_employee[emp_id] = _many2one_id(emp.get('resource_calendar_id'))
+        if unknown:
+            for emp in models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read',
+                                         [unknown], {'fields': ['resource_calendar_id']}):
+                calendar_by_employee[emp['id']] = _many2one_id(emp.get('resource_calendar_id'))
+        schedules = get_calendar_schedules(models, uid, calendar_by_employee.values())
+        return {emp_id: schedules.get(calendar_by_employee.get(emp_id), DEFAULT_CALENDAR_SCHEDULE)
+                for emp_id in employee_ids}
+    except Exception as e:
+        print(f"Error fetching calendar schedules for {len(employee_ids)} employees: {e}")
+        return {emp_id: DEFAULT_CALENDAR_SCHEDULE for emp_id in employee_ids}
+
 def get_employee_working_weekdays(models, uid, employee_id):
     """
     Return a set of Python weekday integers (Mon=0..Sun=6) that the employee
     is scheduled to work based on hr.employee.resource_calendar_id.
     Falls back to Sunday-Thursday if calendar or attendances are missing.
     """
-    try:
-        emp = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read',
-                                [[employee_id]], {'fields': ['resource_calendar_id']})
-        if not emp:
-            return {6, 0, 1, 2, 3}  # Sun-Thu fallback
-        emp = emp[0]
-        cal_field = emp.get('resource_calendar_id')
-        if not cal_field:
-            return {6, 0, 1, 2, 3}
-        cal_id = cal_field[0] if isinstance(cal_field, (list, tuple)) else cal_field
-        # Use cache for calendar weekdays to avoid repeated reads
-        if cal_id in calendar_weekdays_cache:
-            return calendar_weekdays_cache[cal_id]
-        calendars = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'resource.calendar', 'read',
-                                      [[cal_id]], {'fields': ['attendance_ids', 'name']})
-        if not calendars:
-            return {6, 0, 1, 2, 3}
-        calendar = calendars[0]
-        attendance_ids = calendar.get('attendance_ids') or []
-        if not attendance_ids:
-            return {6, 0, 1, 2, 3}
-        attendances = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'resource.calendar.attendance', 'read',
-                                        [attendance_ids], {'fields': ['dayofweek']})
-        weekdays = set()
-        for att in attendances:
-            # Odoo stores dayofweek as string '0'..'6' with Mon=0
-            d = att.get('dayofweek')
-            try:
-                d_int = int(d)
-            except Exception:
-                continue
-            if 0 <= d_int <= 6:
-                weekdays.add(d_int)
-        if not weekdays:
-            weekdays = {6, 0, 1, 2, 3}
-        # Cache and return
-        calendar_weekdays_cache[cal_id] = weekdays
-        return weekdays
-    except Exception as e:
-        print(f"Error fetching working weekdays for employee {employee_id}: {e}")
-        return {6, 0, 1, 2, 3}
+    return get_employee_calendar_schedules(models, uid, [employee_id])[employee_id]['weekdays']
 
-def calculate_employee_working_days_and_hours(models, uid, employee_id, start_date, end_date):
+def calculate_employee_working_days_and_hours(models, uid, employee_id, start_date, end_date, weekdays=None):
     """
     Calculate working days and base hours for one employee using their resource calendar.
+    Pass weekdays (from get_employee_calendar_schedules) to skip the calendar lookup.
     """
-    weekdays = get_employee_working_weekdays(models, uid, employee_id)
-    working_days = 0
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date.weekday() in weekdays:
-            working_days += 1
-        current_date += datetime.timedelta(days=1)
-    base_hours = working_days * 8
+    if weekdays is None:
+        weekdays = get_employee_working_weekdays(models, uid, employee_id)
+    working_days = count_working_days(weekdays, [(start_date, end_date)])[0]
+    base_hours = working_days * WORKING_HOURS_PER_DAY
     return working_days, base_hours
 
+def get_holiday_index(models, uid, company_id, year):
+    """
+    All public holidays (resource_id=False) of a company overlapping a calendar year, loaded with
+    one search_read and kept sorted by start: {'starts': [date_from, ...], 'holidays': [...]}.
+    Cached per (company, year) so every period, view and calendar is answered from it.
+    """
+    cache_key = (company_id, year)
+    index = cache_store.get('holidays', cache_key)
+    if index is not None:
+        return index
+
+    def load():
+        domain = [
+            ('date_from', '<=', f"{year}-12-31 23:59:59"),
+            ('date_to', '>=', f"{year}-01-01 00:00:00"),
+            ('resource_id', '=', False)  # Only company-wide holidays, not individual employee time-offs
+        ]
+        if company_id:
+            domain.append(('company_id', '=', company_id))
+        holidays = models.execute_kw(
+            ODOO_DB, uid, ODOO_PASSWORD,
+            'resource.calendar.leaves', 'search_read',
+            [domain],
+            {'fields': ['name', 'date_from', 'date_to', 'company_id'], 'order': 'date_from asc, id asc'}
+        )
+        holidays = sorted(holidays, key=lambda h: (str(h['date_from']), h['id']))
+        index = {'starts': [str(h['date_from']) for h in holidays], 'holidays': holidays}
+        cache_store.set('holidays', cache_key, index)
+        print(f"Indexed {len(holidays)} public holidays for {year} (company: {company_id})")
+        return index
+
+    return single_flight(('holiday_index', company_id, year), load)
+
 def get_public_holidays(models, uid, start_date, end_date, company_id=None):
     """
     Fetch public holidays from Odoo resource.calendar.leaves within the date range.
@@ -2275,13 +3962,6 @@ def get_public_holidays(models, uid, start_date, end_date, company_id=None):
         list: List of public holiday dictionaries with name, date_from, date_to
         Note: Individual employee time-offs are excluded (employee_id=False filter)
     """
-    # Check cache first
-    cache_key = get_cache_key("holidays", company_id, start_date, end_date)
-    cached_holidays = get_from_cache(holiday_cache, cache_key)
-    if cached_holidays is not None:
-        print(f"Using cached holiday data for {start_date} to {end_date} (company: {company_id})")
-        return cached_holidays
-    
     try:
         print(f"Fetching public holidays from {start_date} to {end_date}")
         
@@ -2347,51 +4027,23 @@ def get_public_holidays(models, uid, start_date, end_date, company_id=None):
             for h in sample_individual_leaves:
                 print(f"  - {h.get('name')}: {h.get('date_from')} to {h.get('date_to')} (company: {h.get('company_id')}, resource: {h.get('resource_id')})")
 
-        # Convert dates to datetime strings for Odoo query
+        # Answer from the per-year holiday indexes: holidays starting before the period end
+        # (bisect on the sorted starts) that also end after the period start
         start_datetime = f"{start_date} 00:00:00"
         end_datetime = f"{end_date} 23:59:59"
-        
-        # Search for PUBLIC holidays that overlap with our date range
-        # Key distinction: Public holidays have resource_id = False (not tied to specific employees)
-        # Individual employee time-offs have resource_id pointing to specific employees
-        domain = [
-            ('date_from', '<=', end_datetime),
-            ('date_to', '>=', start_datetime),
-            ('resource_id', '=', False)  # Critical: Only company-wide holidays, not individual employee time-offs
-        ]
-        if company_id:
-            # Limit to company-specific holidays if specified
-            domain.append(('company_id', '=', company_id))
-
-        if debug_holidays:
-            print(f"Public holiday search domain (resource_id=False for company-wide holidays): {domain}")
+        holidays = []
+        seen_ids = set()
+        for year in range(start_date.year, end_date.year + 1):
+            index = get_holiday_index(models, uid, company_id, year)
+            for holiday in index['holidays'][:bisect.bisect_right(index['starts'], end_datetime)]:
+                if str(holiday['date_to']) >= start_datetime and holiday['id'] not in seen_ids:
+                    seen_ids.add(holiday['id'])
+                    holidays.append(holiday)
 
-        holiday_ids = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'resource.calendar.leaves', 'search',
-            [domain]
-        )
-        
-        if not holiday_ids:
-            print("No public holidays found in the specified date range")
-            return []
-        
-        # Fetch holiday details
-        holidays = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'resource.calendar.leaves', 'read',
-            [holiday_ids],
-            {'fields': ['name', 'date_from', 'date_to', 'company_id']}
-        )
-        
         print(f"Found {len(holidays)} public holidays for {start_date} to {end_date}")
         if debug_holidays:
             for holiday in holidays:
                 print(f"  - {holiday['name']}: {holiday['date_from']} to {holiday['date_to']}")
-        
-        # Cache the result before returning
-        set_cache(holiday_cache, cache_key, holidays)
-        
         return holidays
         
     except Exception as e:
@@ -2410,11 +4062,6 @@ def calculate_holiday_hours_in_period(holidays, start_date, end_date, view_type=
     Returns:
         float: Total holiday hours in the period (per employee)
     """
-    total_holiday_hours = 0
-    
-    # Standard working hours per day (8 hours)
-    WORKING_HOURS_PER_DAY = 8
-    
     print(f"Calculating holiday hours for {view_type} view from {start_date} to {end_date}")
     
     # Safety check - if no holidays, return 0
@@ -2422,109 +4069,13 @@ def calculate_holiday_hours_in_period(holidays, start_date, end_date, view_type=
         print("No holidays found for this period")
         return 0
     
-    for holiday in holidays:
-        try:
-            # Parse holiday dates (they come as datetime strings from Odoo)
-            if isinstance(holiday['date_from'], str):
-                # Handle different datetime formats
-                date_str = holiday['date_from'].replace('Z', '+00:00').replace(' ', 'T')
-                if 'T' not in date_str:
-                    date_str += 'T00:00:00'
-                holiday_start = datetime.datetime.fromisoformat(date_str).date()
-            else:
-                holiday_start = holiday['date_from'].date() if hasattr(holiday['date_from'], 'date') else holiday['date_from']
-                
-            if isinstance(holiday['date_to'], str):
-                # Handle different datetime formats
-                date_str = holiday['date_to'].replace('Z', '+00:00').replace(' ', 'T')
-                if 'T' not in date_str:
-                    date_str += 'T23:59:59'
-                holiday_end = datetime.datetime.fromisoformat(date_str).date()
-            else:
-                holiday_end = holiday['date_to'].date() if hasattr(holiday['date_to'], 'date') else holiday['date_to']
-            
-            # Work with datetimes for precise partial-day handling
-            holiday_start_dt = None
-            holiday_end_dt = None
-            # Parse full datetime strings from original fields for precision
-            # Safe parsing: support 'Z' and space
-            def _parse_dt(value, is_end=False):
-                if isinstance(value, str):
-                    s = value.replace('Z', '+00:00').replace(' ', 'T')
-                    if 'T' not in s:
-                        s += 'T23:59:59' if is_end else 'T00:00:00'
-                    return datetime.datetime.fromisoformat(s)
-                return value if isinstance(value, datetime.datetime) else (
-                    datetime.datetime.combine(value, datetime.time(23, 59, 59)) if is_end else datetime.datetime.combine(value, datetime.time(0, 0, 0))
-                )
-
-            holiday_start_dt = _parse_dt(holiday['date_from'], is_end=False)
-            holiday_end_dt = _parse_dt(holiday['date_to'], is_end=True)
-
-            # Period boundaries as datetimes
-            period_start_dt = datetime.datetime.combine(start_date, datetime.time(0, 0, 0))
-            period_end_dt = datetime.datetime.combine(end_date, datetime.time(23, 59, 59))
-
-            # Overlap between holiday and period
-            overlap_start_dt = max(holiday_start_dt, period_start_dt)
-            overlap_end_dt = min(holiday_end_dt, period_end_dt)
-            
-            # If there's an overlap, calculate effective holiday days considering working days and partial coverage
-            if overlap_start_dt <= overlap_end_dt:
-                # For daily view, we only count if the overlap includes the specific day
-                if view_type == 'daily':
-                    if start_date == end_date and overlap_start_dt.date() <= start_date <= overlap_end_dt.date():
-                        # Check if this specific day is a working day
-                        allowed_weekdays = working_weekdays if working_weekdays is not None else {6, 0, 1, 2, 3}
-                        if start_date.weekday() in allowed_weekdays:
-                            holiday_hours = WORKING_HOURS_PER_DAY
-                            total_holiday_hours += holiday_hours
-                            print(f"  Holiday '{holiday['name']}' covers the working day: {holiday_hours}h")
-                        else:
-                            print(f"  Holiday '{holiday['name']}' falls on non-working day, no hours deducted")
-                else:
-                    # For monthly and weekly views, evaluate per-day overlap and only count full-day equivalents (>=8h)
-                    holiday_hours = 0
-                    allowed_weekdays = working_weekdays if working_weekdays is not None else {6, 0, 1, 2, 3}
-
-                    day_cursor = overlap_start_dt.date()
-                    last_day = overlap_end_dt.date()
-                    max_iterations = 62  # safety for two months span
-                    iter_count = 0
-                    while day_cursor <= last_day and iter_count < max_iterations:
-                        if day_cursor.weekday() in allowed_weekdays:
-                            day_start_dt = datetime.datetime.combine(day_cursor, datetime.time(0, 0, 0))
-                            day_end_dt = datetime.datetime.combine(day_cursor, datetime.time(23, 59, 59))
-                            seg_start = max(overlap_start_dt, day_start_dt)
-                            seg_end = min(overlap_end_dt, day_end_dt)
-                            if seg_end > seg_start:
-                                seg_hours = (seg_end - seg_start).total_seconds() / 3600.0
-                                if seg_hours >= WORKING_HOURS_PER_DAY - 0.1:  # count only if ~full-day coverage
-                                    holiday_hours += WORKING_HOURS_PER_DAY
-                        day_cursor += datetime.timedelta(days=1)
-                        iter_count += 1
-                    
-                    total_holiday_hours += holiday_hours
-                    print(f"  Holiday '{holiday['name']}' ({overlap_start_dt} to {overlap_end_dt}): {holiday_hours}h (full-day equivalents)")
-                    
-                    # Safety check - warn if holiday hours seem too high
-                    if holiday_hours > 200:  # More than 25 working days
-                        print(f"  WARNING: Holiday hours seem very high ({holiday_hours}h) - please check holiday dates")
-            
-        except Exception as e:
-            print(f"Error processing holiday '{holiday.get('name', 'Unknown')}': {e}")
-            import traceback
-            traceback.print_exc()
-            continue
+    # Monthly/weekly: full-day equivalents (>= ~8h coverage) on working days; daily: the day is touched
+    allowed_weekdays = working_weekdays if working_weekdays is not None else DEFAULT_WORKING_WEEKDAYS
+    holiday_days = count_holiday_days(holiday_day_spans(holidays), allowed_weekdays, [(start_date, end_date)], view_type)[0]
+    total_holiday_hours = holiday_days * WORKING_HOURS_PER_DAY
     
     # Final safety check - cap holiday hours to reasonable limits
-    max_reasonable_hours = {
-        'daily': 8,      # Max 1 day
-        'weekly': 40,    # Max 1 week
-        'monthly': 200   # Max ~25 working days
-    }
-    
-    max_hours = max_reasonable_hours.get(view_type, 200)
+    max_hours = HOLIDAY_HOURS_CAP.get(view_type, 200)
     if total_holiday_hours > max_hours:
         print(f"WARNING: Holiday hours ({total_holiday_hours}h) exceed reasonable limit for {view_type} view ({max_hours}h). Capping to {max_hours}h")
         total_holiday_hours = max_hours
@@ -2566,36 +4117,704 @@ def read_employee_info(models, uid, employee_ids):
         {'fields': ['id', 'name', 'job_title', 'user_id']}
     )
 
+# Supported read_group groupings for account.analytic.line -> (Odoo groupby spec, output key)
+TIMESHEET_GROUPBY_FIELDS = {
+    'employee': ('employee_id', 'employee_id'),
+    'day': ('date:day', 'date'),
+    'project': ('project_id', 'project_id'),
+    'task': ('task_id', 'task_id')
+}
+
+def analytic_line_domain(models, uid, employee_ids, start_date, end_date, time_off=None):
+    """
+    Build the account.analytic.line domain used by the dashboard.
+    time_off: None = all lines, True = only Time Off lines, False = exclude Time Off lines.
+    """
+    domain = [('employee_id', 'in', list(employee_ids)),
+              ('date', '>=', start_date.strftime('%Y-%m-%d')),
+              ('date', '<=', end_date.strftime('%Y-%m-%d'))]
+    if time_off is not None:
+        domain.append(time_off_task_domain(models, uid, time_off))
+    return domain
+
+def _many2one_id(value):
+    """Return the id of a many2one value ([id, name], id or False)."""
+    if not value:
+        return None
+    return value[0] if isinstance(value, (list, tuple)) else value
+
+def _read_group_day(row):
+    """Extract the 'YYYY-MM-DD' day of a read_group row grouped by date:day."""
+    day_range = (row.get('__range') or {}).get('date:day')
+    if day_range and day_range.get('from'):
+        return str(day_range['from'])[:10]
+    for term in row.get('__domain') or []:
+        if isinstance(term, (list, tuple)) and len(term) == 3 and term[0] == 'date' and term[1] == '>=':
+            return str(term[2])[:10]
+    label = row.get('date:day')
+    try:
+        return datetime.datetime.strptime(label, '%d %b %Y').date().isoformat()
+    except Exception:
+        return label
+
+def _aggregate_analytic_lines_locally(lines, groupby):
+    """Python fallback for read_group: sum unit_amount of search_read rows by the given groupings."""
+    totals = {}
+    for line in lines:
+        key_values = []
+        for name in groupby:
+            _, out_key = TIMESHEET_GROUPBY_FIELDS[name]
+            if name == 'day':
+                key_values.append((out_key, line.get('date')))
+            else:
+                key_values.append((out_key, _many2one_id(line.get(out_key))))
+        key = tuple(key_values)
+        bucket = totals.setdefault(key, {'hours': 0.0, 'count': 0})
+        bucket['hours'] += float(line.get('unit_amount', 0) or 0)
+        bucket['count'] += 1
+    return [dict(key, hours=bucket['hours'], count=bucket['count']) for key, bucket in totals.items()]
+
+# Local SQLite mirror of the account.analytic.line (timesheet) fields the dashboard uses, indexed
+# by (employee_id, date). The warmer leader syncs it incrementally by write_date and reconciles
+# ids periodically to drop deleted lines; timesheet aggregation reads from it once the first
+# sync has completed, for periods inside the mirrored history. Set TIMESHEET_MIRROR_PATH='' to disable.
+TIMESHEET_MIRROR_PATH = os.environ.get('TIMESHEET_MIRROR_PATH',
+                                       os.path.join(os.path.dirname(os.path.abspath(__file__)), 'timesheet_mirror.sqlite3'))
+TIMESHEET_MIRROR_SYNC_SECONDS = int(os.environ.get('TIMESHEET_MIRROR_SYNC_SECONDS', '60'))
+TIMESHEET_MIRROR_RECONCILE_SECONDS = int(os.environ.get('TIMESHEET_MIRROR_RECONCILE_SECONDS', '900'))
+TIMESHEET_MIRROR_HISTORY_DAYS = int(os.environ.get('TIMESHEET_MIRROR_HISTORY_DAYS', '730'))
+TIMESHEET_MIRROR_PAGE_SIZE = 2000
+# Readers fall back to Odoo when the mirror has not been synced for this long (leader gone, warmer off)
+TIMESHEET_MIRROR_MAX_LAG_SECONDS = 2 * TIMESHEET_MIRROR_SYNC_SECONDS
+TIMESHEET_MIRROR_FIELDS = ['employee_id', 'date', 'unit_amount', 'task_id', 'project_id', 'write_date']
+_timesheet_mirror = {'lock': threading.Lock(), 'initialized': False, 'synced_rows': 0, 'deleted_rows': 0,
+                     'syncs': 0, 'last_sync': None, 'last_reconcile': 0, 'errors': 0}
+
+def _open_timesheet_mirror():
+    conn = sqlite3.connect(TIMESHEET_MIRROR_PATH, timeout=30)
+    if not _timesheet_mirror['initialized']:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS analytic_lines (
+                id INTEGER PRIMARY KEY,
+                employee_id INTEGER NOT NULL,
+                employee_name TEXT,
+                date TEXT NOT NULL,
+                unit_amount REAL NOT NULL,
+                task_id INTEGER,
+                task_name TEXT,
+                project_id INTEGER,
+                project_name TEXT,
+                write_date TEXT
+            )""")
+        conn.execute('CREATE INDEX IF NOT EXISTS analytic_lines_employee_date ON analytic_lines (employee_id, date)')
+        conn.execute('CREATE TABLE IF NOT EXISTS mirror_state (key TEXT PRIMARY KEY, value TEXT)')
+        conn.commit()
+        _timesheet_mirror['initialized'] = True
+    return conn
+
+def _mirror_state(conn):
+    return dict(conn.execute('SELECT key, value FROM mirror_state').fetchall())
+
+def _set_mirror_state(conn, **values):
+    conn.executemany('INSERT OR REPLACE INTO mirror_state (key, value) VALUES (?, ?)',
+                     [(key, str(value)) for key, value in values.items()])
+
+def timesheet_mirror_covers(start_date):
+    """True when the mirror has completed its first sync, was synced recently and holds history back to start_date."""
+    if not TIMESHEET_MIRROR_PATH or not os.path.exists(TIMESHEET_MIRROR_PATH):
+        return False
+    try:
+        with contextlib.closing(_open_timesheet_mirror()) as conn:
+            state = _mirror_state(conn)
+    except Exception as e:
+        print(f"Timesheet mirror unavailable: {e}")
+        return False
+    if time.time() - float(state.get('last_sync') or 0) > TIMESHEET_MIRROR_MAX_LAG_SECONDS:
+        return False
+    return state.get('initial_sync_done') == '1' and start_date.isoformat() >= state.get('history_from', '9999')
+
+def timesheet_mirror_syncing():
+    """True when this process keeps the mirror (and the change detector can skip timesheets)."""
+    return bool(TIMESHEET_MIRROR_PATH) and _cache_warmer_state['is_leader']
+
+def _mirror_where(employee_ids, start_date, end_date, time_off, time_off_task_ids):
+    employee_ids = list(employee_ids)
+    clauses = [f"employee_id IN ({','.join('?' * len(employee_ids))})", 'date >= ?', 'date <= ?']
+    params = employee_ids + [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
+    task_ids = sorted(time_off_task_ids)
+    if time_off is True:
+        clauses.append(f"task_id IN ({','.join('?' * len(task_ids))})" if task_ids else '0')
+        params += task_ids
+    elif time_off is False and task_ids:
+        # Same as Odoo's "not in" on a many2one: lines without a task are kept
+        clauses.append(f"(task_id IS NULL OR task_id NOT IN ({','.join('?' * len(task_ids))}))")
+        params += task_ids
+    return ' AND '.join(clauses), params
+
+def mirror_timesheet_hours(employee_ids, start_date, end_date, groupby, time_off=None, time_off_task_ids=()):
+    """read_group_timesheet_hours() answered from the mirror (same result format)."""
+    columns = {'employee': 'employee_id', 'day': 'date', 'project': 'project_id', 'task': 'task_id'}
+    where, params = _mirror_where(employee_ids, start_date, end_date, time_off, time_off_task_ids)
+    group_columns = [columns[name] for name in groupby]
+    select = ', '.join(group_columns + ['SUM(unit_amount)', 'COUNT(*)'])
+    with contextlib.closing(_open_timesheet_mirror()) as conn:
+        rows = conn.execute(f"SELECT {select} FROM analytic_lines WHERE {where} GROUP BY {', '.join(group_columns)}",
+                            params).fetchall()
+    result = []
+    for row in rows:
+        group = {TIMESHEET_GROUPBY_FIELDS[name][1]: row[i] for i, name in enumerate(groupby)}
+        group['hours'] = float(row[-2] or 0)
+        group['count'] = int(row[-1] or 0)
+        result.append(group)
+    return result
+
+def mirror_timesheet_lines(employee_ids, start_date, end_date, time_off=None, time_off_task_ids=()):
+    """Timesheet lines from the mirror, shaped like search_read rows (many2ones as [id, name])."""
+    where, params = _mirror_where(employee_ids, start_date, end_date, time_off, time_off_task_ids)
+    with contextlib.closing(_open_timesheet_mirror()) as conn:
+        rows = conn.execute('SELECT id, employee_id, employee_name, date, unit_amount, task_id, task_name, '
+                            f'project_id, project_name FROM analytic_lines WHERE {where}', params).fetchall()
+    return [{
+        'id': row[0],
+        'employee_id': [row[1], row[2]],
+        'date': row[3],
+        'unit_amount': row[4],
+        'task_id': [row[5], row[6]] if row[5] else False,
+        'project_id': [row[7], row[8]] if row[7] else False
+    } for row in rows]
+
+def _mirror_row(line):
+    task, project, employee = line.get('task_id'), line.get('project_id'), line.get('employee_id')
+    return (line['id'], _many2one_id(employee), employee[1] if isinstance(employee, (list, tuple)) else None,
+            line.get('date'), float(line.get('unit_amount') or 0),
+            _many2one_id(task), task[1] if isinstance(task, (list, tuple)) else None,
+            _many2one_id(project), project[1] if isinstance(project, (list, tuple)) else None,
+            line.get('write_date'))
+
+def sync_timesheet_mirror(models, uid):
+    """
+    Pull lines written since the last sync (everything in the history window on the first run),
+    then every TIMESHEET_MIRROR_RECONCILE_SECONDS drop local lines whose ids no longer exist in Odoo.
+    Returns the dates touched by changes, or None on the first sync.
+    """
+    with contextlib.closing(_open_timesheet_mirror()) as conn:
+        state = _mirror_state(conn)
+        history_from = state.get('history_from') or (datetime.date.today() - datetime.timedelta(days=TIMESHEET_MIRROR_HISTORY_DAYS)).isoformat()
+        initial = state.get('initial_sync_done') != '1'
+        base_domain = [('employee_id', '!=', False), ('date', '>=', history_from)]
+        last_write_date = state.get('last_write_date')
+        # >= so lines written within the same second as the last sync are not missed; unchanged ones are skipped below
+        domain = base_domain + ([('write_date', '>=', last_write_date)] if last_write_date and not initial else [])
+        touched = set()
+        cursor = None
+        while True:
+            # Keyset pagination: a line edited mid-sync moves past the cursor instead of shifting later pages
+            page_domain = domain + (['|', ('write_date', '>', cursor[0]), '&', ('write_date', '=', cursor[0]), ('id', '>', cursor[1])]
+                                    if cursor else [])
+            page = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'account.analytic.line', 'search_read', [page_domain],
+                                     {'fields': TIMESHEET_MIRROR_FIELDS, 'order': 'write_date asc, id asc',
+                                      'limit': TIMESHEET_MIRROR_PAGE_SIZE})
+            if not page:
+                break
+            ids = [line['id'] for line in page]
+            known = {row[0]: row[1:] for row in conn.execute(
+                f"SELECT id, date, write_date FROM analytic_lines WHERE id IN ({','.join('?' * len(ids))})", ids)}
+            changed = [line for line in page if line['id'] not in known or known[line['id']][1] != line.get('write_date')]
+            # Old dates too, so a line moved to another day invalidates both periods
+            touched.update(known[line['id']][0] for line in changed if line['id'] in known)
+            touched.update(line.get('date') for line in changed if line.get('date'))
+            conn.executemany('INSERT OR REPLACE INTO analytic_lines VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                             [_mirror_row(line) for line in changed])
+            newest = max((line.get('write_date') or '') for line in page)
+            if newest > (last_write_date or ''):
+                last_write_date = newest
+            _set_mirror_state(conn, history_from=history_from, last_write_date=last_write_date or '')
+            conn.commit()
+            with _timesheet_mirror['lock']:
+                _timesheet_mirror['synced_rows'] += len(changed)
+            if len(page) < TIMESHEET_MIRROR_PAGE_SIZE:
+                break
+            cursor = (page[-1].get('write_date'), page[-1]['id'])
+
+        if initial or time.time() - _timesheet_mirror['last_reconcile'] >= TIMESHEET_MIRROR_RECONCILE_SECONDS:
+            remote_ids = set(models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'account.analytic.line', 'search', [base_domain]))
+            stale = [(line_id, day) for line_id, day in conn.execute('SELECT id, date FROM analytic_lines')
+                     if line_id not in remote_ids or day < history_from]
+            if stale:
+                conn.executemany('DELETE FROM analytic_lines WHERE id = ?', [(line_id,) for line_id, _ in stale])
+                touched.update(day for _, day in stale)
+                print(f"Timesheet mirror removed {len(stale)} deleted line(s)")
+            _timesheet_mirror['last_reconcile'] = time.time()
+            with _timesheet_mirror['lock']:
+                _timesheet_mirror['deleted_rows'] += len(stale)
+        synced_at = time.time()
+        _set_mirror_state(conn, initial_sync_done=1, history_from=history_from, last_write_date=last_write_date or '',
+                          last_sync=synced_at)
+        conn.commit()
+    with _timesheet_mirror['lock']:
+        _timesheet_mirror['syncs'] += 1
+        _timesheet_mirror['last_sync'] = synced_at
+    return None if initial else touched
+
+_timesheet_mirror_stop = threading.Event()
+
+def _timesheet_mirror_loop():
+    while not _timesheet_mirror_stop.wait(TIMESHEET_MIRROR_SYNC_SECONDS):
+        if not timesheet_mirror_syncing() or get_connection_status()['connection_health'] == 'unhealthy':
+            continue
+        try:
+            models, uid = connect_to_odoo()
+            if not models or not uid:
+                continue
+            touched = sync_timesheet_mirror(models, uid)
+            if touched:
+                dates = [_odoo_date(day) for day in touched]
+                publish_changes([(day, day) for day in dates if day])
+        except Exception as e:
+            with _timesheet_mirror['lock']:
+                _timesheet_mirror['errors'] += 1
+            print(f"Timesheet mirror sync failed: {e}")
+
+def get_timesheet_mirror_status():
+    with _timesheet_mirror['lock']:
+        status = {key: value for key, value in _timesheet_mirror.items() if key != 'lock'}
+    status['path'] = TIMESHEET_MIRROR_PATH or None
+    status['syncing'] = timesheet_mirror_syncing()
+    return status
+
+
+def read_group_timesheet_hours(models, uid, employee_ids, start_date, end_date, groupby=('employee',), time_off=None):
+    """
+    Sum account.analytic.line hours on the Odoo side with read_group instead of
+    downloading every line.
+
+    Args:
+        groupby (tuple): any of 'employee', 'day', 'project', 'task'
+        time_off (bool|None): see analytic_line_domain()
+
+    Returns:
+        list: one dict per group with the requested keys ('employee_id', 'date',
+              'project_id', 'task_id' as plain ids / 'YYYY-MM-DD'), plus 'hours' and 'count'
+    """
+    if not employee_ids:
+        return []
+    if timesheet_mirror_covers(start_date):
+        try:
+            return mirror_timesheet_hours(employee_ids, start_date, end_date, groupby, time_off,
+                                          get_time_off_task_ids(models, uid) if time_off is not None else ())
+        except Exception as e:
+            print(f"Timesheet mirror query failed, using Odoo: {e}")
+    domain = analytic_line_domain(models, uid, employee_ids, start_date, end_date, time_off)
+    odoo_groupby = [TIMESHEET_GROUPBY_FIELDS[name][0] for name in groupby]
+    try:
+        rows = models.execute_kw(
+            ODOO_DB, uid, ODOO_PASSWORD,
+            'account.analytic.line', 'read_group',
+            [domain, ['unit_amount:sum'], odoo_groupby],
+            {'lazy': False}
+        )
+    except Exception as e:
+        # Fall back to row-level fetch if read_group is unavailable
+        print(f"read_group on account.analytic.line failed, falling back to search_read: {e}")
+        fields = ['unit_amount', 'date'] + [TIMESHEET_GROUPBY_FIELDS[name][1] for name in groupby if name != 'day']
+        lines = models.execute_kw(
+            ODOO_DB, uid, ODOO_PASSWORD,
+            'account.analytic.line', 'search_read',
+            [domain], {'fields': list(set(fields))}
+        )
+        return _aggregate_analytic_lines_locally(lines, groupby)
+
+    result = []
+    for row in rows:
+        group = {}
+        for name in groupby:
+            odoo_field, out_key = TIMESHEET_GROUPBY_FIELDS[name]
+            group[out_key] = _read_group_day(row) if name == 'day' else _many2one_id(row.get(odoo_field))
+        group['hours'] = float(row.get('unit_amount') or 0)
+        group['count'] = int(row.get('__count') or 0)
+        result.append(group)
+    return result
+
+def get_timesheet_hours_by_employee(models, uid, employee_ids, start_date, end_date, time_off=None):
+    """Return {employee_id: total hours} for the period, aggregated by Odoo (see read_group_timesheet_hours)."""
+    totals = defaultdict(float)
+    for group in read_group_timesheet_hours(models, uid, employee_ids, start_date, end_date, ('employee',), time_off):
+        if group.get('employee_id'):
+            totals[group['employee_id']] += group['hours']
+    return dict(totals)
+
+def get_work_and_time_off_hours(models, uid, employee_ids, start_date, end_date):
+    """
+    Return ({employee_id: worked hours}, {employee_id: Time Off hours}) from a single
+    read_group grouped by employee and task, split locally on the Time Off task ids.
+    """
+    time_off_task_ids = get_time_off_task_ids(models, uid)
+    worked = defaultdict(float)
+    time_off = defaultdict(float)
+    for group in read_group_timesheet_hours(models, uid, employee_ids, start_date, end_date, ('employee', 'task')):
+        emp_id = group.get('employee_id')
+        if not emp_id:
+            continue
+        if group.get('task_id') in time_off_task_ids:
+            time_off[emp_id] += group['hours']
+        else:
+            worked[emp_id] += group['hours']
+    return dict(worked), dict(time_off)
+
+def prorate_slot_hours(slot, filter_start, filter_end):
+    """
+    Hours of a planning slot that fall inside [filter_start, filter_end], prorated by
+    the share of the slot's duration that overlaps the window.
+    """
+    return _prorate_parsed_slot(dict(slot, start_datetime=datetime.datetime.strptime(slot['start_datetime'], '%Y-%m-%d %H:%M:%S'),
+                                     end_datetime=datetime.datetime.strptime(slot['end_datetime'], '%Y-%m-%d %H:%M:%S')),
+                                filter_start, filter_end)
+
+def _prorate_parsed_slot(slot, filter_start, filter_end):
+    allocated_hours = float(slot.get('allocated_hours', 0) or 0)
+    task_start = slot['start_datetime']
+    task_end = slot['end_datetime']
+    if task_start >= filter_start and task_end <= filter_end:
+        return allocated_hours
+    overlap_start = max(task_start, filter_start)
+    overlap_end = min(task_end, filter_end)
+    if overlap_start >= overlap_end:
+        return 0.0
+    total_task_duration = (task_end - task_start).total_seconds()
+    if total_task_duration <= 0:
+        return 0.0
+    return allocated_hours * (overlap_end - overlap_start).total_seconds() / total_task_duration
+
+ODOO_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def prorate_planning_slots(slots, windows, group_keys, count_instant=True):
+    """
+    Prorate many planning slots against one or many [start, end] datetime windows at once.
+
+    Each slot contributes allocated_hours times the share of its duration that overlaps a
+    window to the group named by group_keys[i]; slots whose key is None are skipped.
+    A zero-length slot starting inside a window counts in full (as in prorate_slot_hours),
+    or is ignored - no hours, not counted - with count_instant=False.
+    Returns ({key: [hours per window]}, {key: [overlapping slots per window]}).
+    Uses NumPy (add.at over a slots x windows overlap matrix) when it is installed.
+    """
+    keys = sorted({key for key in group_keys if key is not None})
+    if not keys or not windows:
+        return ({key: [0.0] * len(windows) for key in keys}, {key: [0] * len(windows) for key in keys})
+    index = {key: i for i, key in enumerate(keys)}
+    rows = [(index[key], slot) for key, slot in zip(group_keys, slots) if key is not None]
+
+    if np is not None:
+        group = np.array([row for row, _ in rows], dtype=np.int64)
+        starts = np.array([slot['start_datetime'] for _, slot in rows], dtype='datetime64[s]').astype(np.int64)
+        ends = np.array([slot['end_datetime'] for _, slot in rows], dtype='datetime64[s]').astype(np.int64)
+        allocated = np.array([float(slot.get('allocated_hours') or 0) for _, slot in rows])
+        window_starts = np.array([start for start, _ in windows], dtype='datetime64[s]').astype(np.int64)
+        window_ends = np.array([end for _, end in windows], dtype='datetime64[s]').astype(np.int64)
+        overlap = (np.minimum(ends[:, None], window_ends[None, :]) -
+                   np.maximum(starts[:, None], window_starts[None, :])).clip(min=0)
+        duration = (ends - starts).astype(float)
+        share = np.divide(overlap, duration[:, None], out=np.zeros(overlap.shape), where=duration[:, None] > 0)
+        instant = (duration[:, None] == 0) & (starts[:, None] >= window_starts[None, :]) & (starts[:, None] <= window_ends[None, :])
+        if not count_instant:
+            instant[:] = False
+        share[instant] = 1.0
+        hours = np.zeros((len(keys), len(windows)))
+        counts = np.zeros((len(keys), len(windows)), dtype=np.int64)
+        np.add.at(hours, group, allocated[:, None] * share)
+        np.add.at(counts, group, (overlap > 0) | instant)
+        return ({key: hours[i].tolist() for i, key in enumerate(keys)},
+                {key: counts[i].tolist() for i, key in enumerate(keys)})
+
+    hours = [[0.0] * len(windows) for _ in keys]
+    counts = [[0] * len(windows) for _ in keys]
+    for row, slot in rows:
+        parsed = dict(slot, start_datetime=datetime.datetime.strptime(slot['start_datetime'], ODOO_DATETIME_FORMAT),
+                      end_datetime=datetime.datetime.strptime(slot['end_datetime'], ODOO_DATETIME_FORMAT))
+        instant = count_instant and parsed['start_datetime'] == parsed['end_datetime']
+        for w, (window_start, window_end) in enumerate(windows):
+            if min(parsed['end_datetime'], window_end) > max(parsed['start_datetime'], window_start) or \
+                    (instant and window_start <= parsed['start_datetime'] <= window_end):
+                counts[row][w] += 1
+                hours[row][w] += _prorate_parsed_slot(parsed, window_start, window_end)
+    return ({key: hours[i] for i, key in enumerate(keys)}, {key: counts[i] for i, key in enumerate(keys)})
+
+def get_planned_hours_by_resource(models, uid, resource_ids, start_date, end_date):
+    """
+    Return {resource_id: planned hours} for planning slots overlapping the period.
+    Slots fully inside the period are summed by Odoo with read_group; only the few
+    slots crossing a period boundary are downloaded and prorated locally.
+    """
+    if not resource_ids:
+        return {}
+    start_planning_str = start_date.strftime('%Y-%m-%d 00:00:00')
+    end_planning_str = end_date.strftime('%Y-%m-%d 23:59:59')
+    totals = defaultdict(float)
+
+    inside_domain = [('resource_id', 'in', list(resource_ids)),
+                     ('start_datetime', '>=', start_planning_str),
+                     ('end_datetime', '<=', end_planning_str)]
+    spanning_domain = [('resource_id', 'in', list(resource_ids)),
+                       ('start_datetime', '<=', end_planning_str),
+                       ('end_datetime', '>=', start_planning_str),
+                       '|', ('start_datetime', '<', start_planning_str), ('end_datetime', '>', end_planning_str)]
+    try:
+        groups = models.execute_kw(
+            ODOO_DB, uid, ODOO_PASSWORD,
+            'planning.slot', 'read_group',
+            [inside_domain, ['allocated_hours:sum'], ['resource_id']],
+            {'lazy': False}
+        )
+        for row in groups:
+            res_id = _many2one_id(row.get('resource_id'))
+            if res_id:
+                totals[res_id] += float(row.get('allocated_hours') or 0)
+    except Exception as e:
+        print(f"read_group on planning.slot failed, falling back to search_read: {e}")
+        spanning_domain = spanning_domain[:3]  # Fetch every overlapping slot and prorate all of them
+
+    slots = models.execute_kw(
+        ODOO_DB, uid, ODOO_PASSWORD,
+        'planning.slot', 'search_read',
+        [spanning_domain],
+        {'fields': ['resource_id', 'allocated_hours', 'start_datetime', 'end_datetime']}
+    )
+    filter_start = datetime.datetime.combine(start_date, datetime.time(0, 0, 0))
+    filter_end = datetime.datetime.combine(end_date, datetime.time(23, 59, 59))
+    spanning, _ = prorate_planning_slots(slots, [(filter_start, filter_end)],
+                                         [_many2one_id(slot.get('resource_id')) or None for slot in slots])
+    for res_id, hours in spanning.items():
+        totals[res_id] += hours[0]
+    return dict(totals)
+
+# Hours cube: logged, Time Off and planned hours per employee per calendar day, plus the month's planning
+# slots, built per month for all reference-data employees (consecutive missing months share one fetch).
+# Any period (monthly, weekly, daily or a custom range) is then a slice-and-sum over month cubes.
+# Cubes live in the 'hours_cubes' cache namespace: they expire after HOURS_CUBE_TTL_SECONDS and are
+# dropped when change detection touches their month.
+HOURS_CUBE_TTL_SECONDS = int(os.environ.get('HOURS_CUBE_TTL_SECONDS', '900'))  # 0 disables the cube
+cache_store.namespace('hours_cubes', HOURS_CUBE_TTL_SECONDS)
+_hours_cubes = {'lock': threading.Lock(), 'generation': 0, 'builds': 0}
+
+class HoursCube:
+    """
+    One month of hours per (employee, day), stored as flat arrays of doubles indexed by
+    row * days + day offset. Built once and never mutated afterwards.
+    Planned hours are prorated into days at build time the way get_available_creative_resources
+    prorates them into a period, so any period's planned hours are also a slice-and-sum.
+    """
+    METRICS = ('logged', 'time_off', 'planned')
+
+    def __init__(self, models, uid, month_start, reference, timesheet_groups, slots):
+        """timesheet_groups and slots are the month's rows from build_hours_cubes()."""
+        self.start_date = month_start
+        self.end_date = _month_end(month_start)
+        self.days = (self.end_date - self.start_date).days + 1
+        self.employee_ids = sorted(reference.employees_by_id)
+        self.rows = {emp_id: row for row, emp_id in enumerate(self.employee_ids)}
+        size = len(self.employee_ids) * self.days
+        self.values = {metric: array.array('d', bytes(8 * size)) for metric in self.METRICS}
+        # Planned hours in the second between day d at 23:59:59 and day d + 1, which a period
+        # [start 00:00:00, end 23:59:59] includes for every day but its last
+        self.planned_gaps = array.array('d', bytes(8 * size))
+        self.slots = slots
+        if self.employee_ids:
+            self._load_timesheets(models, uid, timesheet_groups)
+            self._load_planning(reference)
+
+    @property
+    def nbytes(self):
+        """Approximate footprint, for the cache's size accounting."""
+        return (sum(values.itemsize * len(values) for values in self.values.values()) +
+                self.planned_gaps.itemsize * len(self.planned_gaps) + _approx_size(self.slots))
+
+    def _add(self, metric, emp_id, day, hours):
+        row = self.rows.get(emp_id)
+        offset = (day - self.start_date).days
+        if row is not None and 0 <= offset < self.days:
+            self.values[metric][row * self.days + offset] += hours
+
+    def _load_timesheets(self, models, uid, timesheet_groups):
+        time_off_task_ids = get_time_off_task_ids(models, uid)
+        for group in timesheet_groups:
+            day = _odoo_date(group.get('date'))
+            if not group.get('employee_id') or day is None:
+                continue
+            metric = 'time_off' if group.get('task_id') in time_off_task_ids else 'logged'
+            self._add(metric, group['employee_id'], day, group['hours'])
+
+    def _load_planning(self, reference):
+        # planning.slot.employee_id is the slot resource's employee, so resource-first matching
+        # attributes each slot to the same employee as the per-department loops
+        resource_to_employee = _resource_to_employee(reference)
+        slot_employees = []
+        for slot in self.slots:
+            emp_id = resource_to_employee.get(_many2one_id(slot.get('resource_id')))
+            if emp_id is None and _many2one_id(slot.get('employee_id')) in self.rows:
+                emp_id = _many2one_id(slot.get('employee_id'))
+            slot_employees.append(emp_id)
+        windows = []
+        for offset in range(self.days):
+            day_start = datetime.datetime.combine(self.start_date + datetime.timedelta(days=offset), datetime.time(0, 0, 0))
+            day_end = day_start + datetime.timedelta(hours=23, minutes=59, seconds=59)
+            windows.extend([(day_start, day_end), (day_end, day_start + datetime.timedelta(days=1))])
+        planned, _ = prorate_planning_slots(self.slots, windows, slot_employees, count_instant=False)
+        for emp_id, hours in planned.items():
+            base = self.rows[emp_id] * self.days
+            for offset in range(self.days):
+                self.values['planned'][base + offset] = hours[2 * offset]
+                self.planned_gaps[base + offset] = hours[2 * offset + 1]
+
+    def totals(self, metric, employee_ids, start_date, end_date):
+        """{employee_id: hours} of one metric over [start_date, end_date] clipped to this month (non-zero only)."""
+        first = max((start_date - self.start_date).days, 0)
+        last = min((end_date - self.start_date).days, self.days - 1)
+        last_gap = min(last, (end_date - self.start_date).days - 1) if metric == 'planned' else first - 1
+        values = self.values[metric]
+        result = {}
+        if first > last:
+            return result
+        for emp_id in employee_ids:
+            row = self.rows.get(emp_id)
+            if row is None:
+                continue
+            hours = sum(values[row * self.days + first:row * self.days + last + 1])
+            hours += sum(self.planned_gaps[row * self.days + first:row * self.days + last_gap + 1])
+            if hours:
+                result[emp_id] = hours
+        return result
+
+def _month_end(month_start):
+    return (month_start.replace(day=28) + datetime.timedelta(days=4)).replace(day=1) - datetime.timedelta(days=1)
+
+def _month_starts(start_date, end_date):
+    month = start_date.replace(day=1)
+    while month <= end_date:
+        yield month
+        month = _month_end(month) + datetime.timedelta(days=1)
+
+def _resource_to_employee(reference):
+    return {_many2one_id(emp.get('resource_id')): emp['id']
+            for emp in reference.employees_by_id.values() if _many2one_id(emp.get('resource_id'))}
+
+def fetch_dashboard_planning_slots(models, uid, reference, start_date, end_date):
+    """Planning slots overlapping [start_date, end_date] for all reference-data employees (DepartmentSnapshot domain)."""
+    employee_ids = sorted(reference.employees_by_id)
+    start_str = start_date.strftime('%Y-%m-%d 00:00:00')
+    end_str = end_date.strftime('%Y-%m-%d 23:59:59')
+    domain = ['|', '|',
+              ('resource_id', 'in', sorted(_resource_to_employee(reference))),
+              ('employee_id', 'in', employee_ids),
+              ('resource_id', 'in', employee_ids),
+              ('start_datetime', '<=', end_str),
+              ('end_datetime', '>=', start_str)]
+    slots = []
+    offset = 0
+    page_limit = 1000
+    while True:
+        page = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'planning.slot', 'search_read',
+                                 [domain], {'fields': DepartmentSnapshot.PLANNING_FIELDS,
+                                            'limit': page_limit, 'offset': offset})
+        slots.extend(page or [])
+        if not page or len(page) < page_limit:
+            break
+        offset += page_limit
+    return slots
+
+def build_hours_cubes(models, uid, month_starts):
+    """
+    Build the HoursCubes of consecutive months with one timesheet read_group and one planning.slot
+    fetch for the whole range; the rows are bucketed into months in memory.
+    """
+    reference = get_reference_data(models, uid)
+    if reference is None:
+        raise Exception("Reference data could not be loaded from Odoo")
+    employee_ids = sorted(reference.employees_by_id)
+    range_start, range_end = month_starts[0], _month_end(month_starts[-1])
+    groups_by_month = defaultdict(list)
+    slots = []
+    if employee_ids:
+        for group in read_group_timesheet_hours(models, uid, employee_ids, range_start, range_end, ('employee', 'day', 'task')):
+            groups_by_month[str(group.get('date') or '')[:7]].append(group)
+        slots = fetch_dashboard_planning_slots(models, uid, reference, range_start, range_end)
+    cubes = []
+    for month_start in month_starts:
+        start_str = month_start.strftime('%Y-%m-%d 00:00:00')
+        end_str = _month_end(month_start).strftime('%Y-%m-%d 23:59:59')
+        month_slots = [slot for slot in slots if slot['start_datetime'] <= end_str and slot['end_datetime'] >= start_str]
+        cubes.append(HoursCube(models, uid, month_start, reference, groups_by_month[month_start.strftime('%Y-%m')], month_slots))
+    print(f"Built hours cubes for {range_start:%Y-%m}..{range_end:%Y-%m}: {len(employee_ids)} employees, {len(slots)} planning slots")
+    return cubes
+
+def get_hours_cubes(models, uid, start_date, end_date):
+    """The month HoursCubes covering [start_date, end_date], building stale or missing ones; None when disabled."""
+    if HOURS_CUBE_TTL_SECONDS <= 0:
+        return None
+    cubes = {}
+    runs = []  # Consecutive missing months, each built with one fetch
+    with _hours_cubes['lock']:
+        generation = _hours_cubes['generation']
+    for month_start in _month_starts(start_date, end_date):
+        cube = cache_store.get('hours_cubes', month_start)
+        if cube is not None:
+            cubes[month_start] = cube
+        elif runs and runs[-1][-1] == (month_start - datetime.timedelta(days=1)).replace(day=1):
+            runs[-1].append(month_start)
+        else:
+            runs.append([month_start])
+
+    for run in runs:
+        def build_run(run=run):
+            built = build_hours_cubes(models, uid, run)
+            with _hours_cubes['lock']:
+                _hours_cubes['builds'] += len(built)
+                # Cubes built from data that changed meanwhile are used once but not kept
+                if _hours_cubes['generation'] == generation:
+                    for cube in built:
+                        cache_store.set('hours_cubes', cube.start_date, cube)
+            return built
+
+        for cube in single_flight(('hours_cubes', tuple(run)), build_run):
+            cubes[cube.start_date] = cube
+    return [cubes[month_start] for month_start in sorted(cubes)]
+
+def hours_cube_totals(cubes, metric, employee_ids, start_date, end_date):
+    """{employee_id: hours} of one metric over a period spanning one or more month cubes."""
+    totals = defaultdict(float)
+    for cube in cubes:
+        for emp_id, hours in cube.totals(metric, employee_ids, start_date, end_date).items():
+            totals[emp_id] += hours
+    return dict(totals)
+
+def invalidate_hours_cubes(ranges=None):
+    """Drop month cubes overlapping any (start_date, end_date) range; None = all."""
+    with _hours_cubes['lock']:
+        _hours_cubes['generation'] += 1
+        for month_start in cache_store.keys('hours_cubes'):
+            if ranges is None or any(start <= _month_end(month_start) and end >= month_start for start, end in ranges):
+                cache_store.delete('hours_cubes', month_start)
+
+def get_hours_cube_status():
+    with _hours_cubes['lock']:
+        return {
+            'ttl_seconds': HOURS_CUBE_TTL_SECONDS,
+            'months': [month.strftime('%Y-%m') for month in sorted(cache_store.keys('hours_cubes'))],
+            'builds': _hours_cubes['builds']
+        }
+
 def get_all_timesheet_hours(models, uid, designer_ids, start_date, end_date):
     """Retrieves timesheet hours for the given designer IDs."""
     if not designer_ids:
         return {}
     
-    # Convert dates to string format for Odoo
-    start_str = start_date.strftime('%Y-%m-%d')
-    end_str = end_date.strftime('%Y-%m-%d')
-    
-    print(f"Searching timesheets from {start_str} to {end_str}")
+    print(f"Summing timesheets from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
     
-    timesheets = models.execute_kw(
-        ODOO_DB, uid, ODOO_PASSWORD,
-        'account.analytic.line', 'search_read',
-        [[('employee_id', 'in', designer_ids),
-          ('date', '>=', start_str),
-          ('date', '<=', end_str)]],
-        {'fields': ['employee_id', 'unit_amount']}
-    )
+    timesheet_dict = get_timesheet_hours_by_employee(models, uid, designer_ids, start_date, end_date)
     
-    print(f"Found {len(timesheets)} timesheet entries")
+    print(f"Found timesheet hours for {len(timesheet_dict)} employees")
     
-    timesheet_dict = defaultdict(float)
-    for ts in timesheets:
-        emp_field = ts.get('employee_id')
-        if emp_field:
-            emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-            timesheet_dict[emp_id] += float(ts.get('unit_amount', 0))
-    
-    return dict(timesheet_dict)
+    return timesheet_dict
 
 def get_all_scheduled_data(models, uid, designer_ids, start_date, end_date):
     """Retrieves scheduling data (hours and projects) from planning.slot."""
@@ -2698,93 +4917,30 @@ def get_subtask_service_categories(models, uid, designer_ids, start_date, end_da
             categories_dict[emp_id].add(cat_name)
     return categories_dict
 
-def get_creative_employees():
-    """Fetch employees from creative department"""
+def get_creative_employees(snapshot=None):
+    """Fetch employees from creative department (from a DepartmentSnapshot when given)"""
     try:
-        models, uid = connect_to_odoo()
+        snapshot = snapshot or build_department_snapshot(department_names=['Creative'])
         
-        if not models or not uid:
+        if snapshot is None:
             return []
         
-        # First, let's see what departments exist with "creative" in the name
-        all_departments = execute_odoo_call_with_retry(models, uid, 'hr.department', 'search_read', 
-                                          [[('name', 'ilike', 'creative')]], {'fields': ['name', 'id']})
-        
-        print(f"Found departments with 'creative' in name: {[dept['name'] for dept in all_departments]}")
-        
-        # Find the exact "Creative" department
-        department_ids = execute_odoo_call_with_retry(models, uid, 'hr.department', 'search', 
-                                         [[('name', '=', 'Creative')]])
-        
-        if not department_ids:
+        if not snapshot.has_department('Creative'):
             print("No exact 'Creative' department found")
             return []
         
-        print(f"Found Creative department with ID: {department_ids}")
+        print(f"Found Creative department with ID: {snapshot.department_ids['Creative']}")
         
-        # Get employees in the creative department
-        employee_ids = execute_odoo_call_with_retry(models, uid, 'hr.employee', 'search', 
-                                       [[('department_id', 'in', department_ids)]])
+        # Employees of the creative department with categories/tags
+        employees = snapshot.employees('Creative')
         
-        if not employee_ids:
+        if not employees:
             print("No employees found in creative department")
             return []
         
-        print(f"Found {len(employee_ids)} employees in Creative department")
-        
-        # First, let's get the fields available for hr.employee model
-        try:
-            fields_info = execute_odoo_call_with_retry(models, uid, 'hr.employee', 'fields_get', [])
-            print("Available fields in hr.employee:")
-            for field_name, field_info in fields_info.items():
-                if field_name.startswith('x_') or 'tag' in field_name.lower() or 'location' in field_name.lower():
-                    print(f"  - {field_name}: {field_info.get('string', 'No description')}")
-        except Exception as e:
-            print(f"Could not get fields info: {e}")
-        
-        # Get employee data with categories/tags
-        employees = execute_odoo_call_with_retry(models, uid, 'hr.employee', 'read', 
-                                    [employee_ids], {
-                                        'fields': [
-                                            'name', 
-                                            'job_title', 
-                                            'work_email',
-                                            'category_ids',  # This is the many2many field for categories/tags
-                                            'active',  # Employee active status
-                                            'work_permit_expiration_date',  # Could indicate availability
-                                            'employee_type'  # Could indicate availability status
-                                        ]
-                                    })
-        
-        # Batch fetch all unique category IDs
-        all_category_ids = set()
-        for emp in employees:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
+        print(f"Found {len(employees)} employees in Creative department")
         
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = execute_odoo_call_with_retry(models, uid, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                
-                # Create a dictionary for fast lookup
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-                print(f"Fetched {len(categories_dict)} unique categories in batch")
-                
-            except Exception as e:
-                print(f"Error fetching categories in batch: {e}")
-                # Fallback to individual calls if batch fails
-                print("Falling back to individual category fetching...")
-                for emp in employees:
-                    if emp.get('category_ids'):
-                        try:
-                            categories = execute_odoo_call_with_retry(models, uid, 'hr.employee.category', 'read', 
-                                                         [emp['category_ids']], {'fields': ['name']})
-                            categories_dict.update({cat['id']: cat['name'] for cat in categories if cat.get('name')})
-                        except Exception as e2:
-                            print(f"Error fetching categories for employee {emp.get('name')}: {e2}")
+        categories_dict = snapshot.categories
         
         # Process employees using the cached categories
         processed_employees = []
@@ -2832,7 +4988,7 @@ def get_creative_employees():
         print(f"Error fetching employees: {e}")
         return []
 
-def get_team_utilization_data(period=None, view_type='monthly'):
+def get_team_utilization_data(period=None, view_type='monthly', snapshot=None):
     """
     Fetch team utilization data for KSA, UAE, and Nightshift teams.
     
@@ -2844,105 +5000,41 @@ def get_team_utilization_data(period=None, view_type='monthly'):
         dict: Team utilization data with stats for each team
     """
     try:
-        models, uid = connect_to_odoo()
+        snapshot = snapshot or build_department_snapshot(period, view_type, ['Creative'])
         
-        if not models or not uid:
+        if snapshot is None:
             return {}
         
-        # Get date range for the selected period and view type
-        start_date, end_date = get_date_range(view_type, period)
+        # Date range for the selected period and view type
+        start_date, end_date = snapshot.start_date, snapshot.end_date
         print(f"Fetching team utilization data for {view_type} view: {start_date} to {end_date}")
         
-        # Find the Creative department first
-        department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                         [[('name', '=', 'Creative')]])
-        
-        if not department_ids:
+        if not snapshot.has_department('Creative'):
             print("No Creative department found")
             return {}
         
-        # Get all creative department employees with their tags
-        creative_employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                                [[('department_id', 'in', department_ids)]])
+        # Creative department employees with their tags
+        employees_data = snapshot.employees('Creative')
+        creative_employee_ids = snapshot.employee_ids('Creative')
         
         if not creative_employee_ids:
-            print("No creative employees found")
+            print("No Creative employees found")
             return {}
         
-        # Fetch employee company and compute per-employee holidays for utilization stats
-        employee_company = {}
-        try:
-            emp_company_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                              [creative_employee_ids], {'fields': ['company_id']})
-            for emp in emp_company_data:
-                cid = None
-                if emp.get('company_id'):
-                    cid = emp['company_id'][0] if isinstance(emp['company_id'], (list, tuple)) else emp['company_id']
-                employee_company[emp['id']] = cid
-        except Exception as _e:
-            pass
-
-        company_holidays_cache = {}
+        # Compute per-employee holiday hours (once per company) for utilization stats
         company_holiday_hours_cache = {}
         employee_holiday_hours = {}
-        for emp_id in creative_employee_ids:
-            cid = employee_company.get(emp_id)
-            if cid not in company_holidays_cache:
-                holidays = get_public_holidays(models, uid, start_date, end_date, company_id=cid)
-                company_holidays_cache[cid] = holidays
-                # Calculate holiday hours once per company and cache it
-                company_holiday_hours_cache[cid] = calculate_holiday_hours_in_period(holidays, start_date, end_date, view_type)
-            employee_holiday_hours[emp_id] = company_holiday_hours_cache[cid]
-        
-        # Get employee details with tags
-        employees_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                         [creative_employee_ids], {
-                                             'fields': ['id', 'name', 'job_title', 'category_ids']
-                                         })
-        
-        # Batch fetch all unique category IDs
-        all_category_ids = set()
         for emp in employees_data:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
-        
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-            except Exception as e:
-                print(f"Error fetching categories: {e}")
-        
-        # Convert dates to string format for Odoo
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        
-        # Fetch timesheet data for creative employees
-        timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', creative_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '!=', 'Time Off')]],
-            {'fields': ['employee_id', 'unit_amount']}
-        )
+            cid = snapshot.employee_company_id(emp)
+            if cid not in company_holiday_hours_cache:
+                holidays = snapshot.public_holidays(cid)
+                company_holiday_hours_cache[cid] = calculate_holiday_hours_in_period(holidays, start_date, end_date, view_type)
+            employee_holiday_hours[emp['id']] = company_holiday_hours_cache[cid]
         
-        # Fetch planning data for creative employees
-        start_planning_str = start_date.strftime('%Y-%m-%d 00:00:00')
-        end_planning_str = end_date.strftime('%Y-%m-%d 23:59:59')
+        categories_dict = snapshot.categories
         
-        planning_slots = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'planning.slot', 'search_read',
-            [[('resource_id', 'in', creative_employee_ids),
-              ('start_datetime', '<=', end_planning_str),
-              ('end_datetime', '>=', start_planning_str)]],
-            {'fields': ['resource_id', 'allocated_hours', 'start_datetime', 'end_datetime']}
-        )
+        # Worked and Time Off hours per employee (one read_group for the whole snapshot)
+        logged_by_employee, employee_time_off = snapshot.work_and_time_off_hours()
         
         # Group timesheet and planning data by employee
         employee_data = {}
@@ -2964,28 +5056,7 @@ def get_team_utilization_data(period=None, view_type='monthly'):
         # Calculate Time Off hours for each employee
         print("Calculating Time Off hours for utilization data...")
         
-        # Fetch timesheet entries for Time Off tasks
-        time_off_timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', creative_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '=', 'Time Off')]],
-            {'fields': ['employee_id', 'unit_amount']}
-        )
-        
-        print(f"Found {len(time_off_timesheets)} Time Off timesheet entries for utilization data")
-        
-        # Calculate total Time Off hours per employee
-        employee_time_off = {}
-        for ts in time_off_timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id not in employee_time_off:
-                    employee_time_off[emp_id] = 0
-                employee_time_off[emp_id] += float(ts.get('unit_amount', 0))
+        print(f"Found Time Off hours for {len(employee_time_off)} employees for utilization data")
         
         # Add Time Off hours to employee data
         for emp_id in employee_data:
@@ -2994,17 +5065,13 @@ def get_team_utilization_data(period=None, view_type='monthly'):
             if time_off_hours > 0:
                 print(f"Employee {employee_data[emp_id]['name']}: {time_off_hours:.1f}h Time Off")
         
-        # Calculate logged hours
-        for ts in timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id in employee_data:
-                    employee_data[emp_id]['logged_hours'] += float(ts.get('unit_amount', 0))
+        # Add logged hours
+        for emp_id in employee_data:
+            employee_data[emp_id]['logged_hours'] = logged_by_employee.get(emp_id, 0)
         
         # Get planned hours from available resources (same source as Available Creatives tab)
         print("Getting planned hours from available resources...")
-        available_resources = get_available_creative_resources(view_type, period)
+        available_resources = department_section_functions('Creative', snapshot)['available_resources']()
         
         # Create a mapping of employee names to planned hours from available resources (numeric)
         resource_planned_hours = {}
@@ -3101,21 +5168,21 @@ def get_team_utilization_data(period=None, view_type='monthly'):
         # Fallback: if no stats were produced, return a simple tag-based aggregation so UI isn't empty
         if not team_stats:
             print("No team utilization stats produced; using simple tag-based fallback")
-            return _compute_simple_team_utilization(period, view_type)
+            return _compute_simple_team_utilization(period, view_type, snapshot)
         return team_stats
         
     except Exception as e:
         print(f"Error fetching team utilization data: {e}")
         # Last-resort fallback
-        return _compute_simple_team_utilization(period, view_type)
+        return _compute_simple_team_utilization(period, view_type, snapshot)
 
-def _compute_simple_team_utilization(period=None, view_type='monthly'):
+def _compute_simple_team_utilization(period=None, view_type='monthly', snapshot=None):
     """Lightweight fallback that aggregates by tags without timesheets/planning.
     Provides non-empty structure for UI even when detailed queries fail or no data.
     """
     try:
         start_date, end_date = get_date_range(view_type, period)
-        employees = get_creative_employees() or []
+        employees = get_creative_employees(snapshot) or []
         teams = {
             'KSA': ['KSA'],
             'UAE': ['UAE'],
@@ -3158,7 +5225,7 @@ def _compute_simple_team_utilization(period=None, view_type='monthly'):
     except Exception as _e:
         print(f"Error in simple utilization fallback: {_e}")
         return {}
-def get_creative_timesheet_data(period=None, view_type='monthly'):
+def get_creative_timesheet_data(period=None, view_type='monthly', snapshot=None):
     """
     Fetch timesheet data for creative employees for a specific period.
     
@@ -3173,109 +5240,35 @@ def get_creative_timesheet_data(period=None, view_type='monthly'):
         list: List of creative employees with their timesheet hours
     """
     try:
-        models, uid = connect_to_odoo()
+        snapshot = snapshot or build_department_snapshot(period, view_type, ['Creative'])
         
-        if not models or not uid:
+        if snapshot is None:
             return []
         
-        # Get date range for the selected period and view type
-        start_date, end_date = get_date_range(view_type, period)
+        # Date range for the selected period and view type
+        start_date, end_date = snapshot.start_date, snapshot.end_date
         print(f"Fetching timesheet data for {view_type} view: {start_date} to {end_date}")
         
-        # Find the Creative department
-        department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                         [[('name', '=', 'Creative')]])
-        
-        if not department_ids:
+        if not snapshot.has_department('Creative'):
             print("No Creative department found")
             return []
         
-        # Get all creative department employees
-        creative_employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                                [[('department_id', 'in', department_ids)]])
-        
-        if not creative_employee_ids:
-            print("No creative employees found")
-            return []
-        
-        # Get employee details with tags
-        employees_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                         [creative_employee_ids], {
-                                             'fields': ['id', 'name', 'job_title', 'category_ids']
-                                         })
-        
-        # Batch fetch all unique category IDs for tags
-        all_category_ids = set()
-        for emp in employees_data:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
-        
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-                print(f"Fetched {len(categories_dict)} unique categories for timesheet data")
-            except Exception as e:
-                print(f"Error fetching categories for timesheet data: {e}")
-        
-        # Convert dates to string format for Odoo
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        
-        print(f"Searching timesheets from {start_str} to {end_str}")
-        
-        # Fetch timesheet data for creative employees
-        timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', creative_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '!=', 'Time Off')]],  # Exclude "Time Off" tasks
-            {'fields': ['employee_id', 'unit_amount', 'task_id', 'date', 'project_id']}
-        )
-        
-        print(f"Found {len(timesheets)} timesheet entries for creative employees")
+        # Creative department employees with their tags
+        employees_data = snapshot.employees('Creative')
         
-        # Compute set of unbilled project IDs based on Agreement Type on project.project
-        # Unbilled criteria: Agreement Type (x_studio_agreement_type_1) is missing/False or equals "Internal"
-        project_ids = set()
-        for ts in timesheets:
-            proj = ts.get('project_id')
-            if proj:
-                try:
-                    project_ids.add(proj[0] if isinstance(proj, (list, tuple)) else int(proj))
-                except Exception:
-                    pass
-        unbilled_project_ids = set()
-        if project_ids:
-            try:
-                projects = models.execute_kw(
-                    ODOO_DB, uid, ODOO_PASSWORD,
-                    'project.project', 'read',
-                    [list(project_ids)],
-                    {'fields': ['display_name', 'x_studio_agreement_type_1']}
-                )
-                for proj in projects:
-                    agreement = proj.get('x_studio_agreement_type_1')
-                    is_unbilled = False
-                    if not agreement:
-                        is_unbilled = True
-                    elif isinstance(agreement, str):
-                        is_unbilled = agreement.strip().lower() == 'internal'
-                    elif isinstance(agreement, (list, tuple)) and len(agreement) > 1:
-                        try:
-                            is_unbilled = str(agreement[1]).strip().lower() == 'internal'
-                        except Exception:
-                            is_unbilled = False
-                    if is_unbilled and proj.get('id') is not None:
-                        unbilled_project_ids.add(proj['id'])
-            except Exception as _e:
-                # If project lookup fails, treat all as billed (safe)
-                unbilled_project_ids = set()
+        if not employees_data:
+            print("No Creative employees found")
+            return []
+        
+        categories_dict = snapshot.categories
+        
+        # Timesheet lines excluding "Time Off" tasks, fetched once for the whole snapshot
+        timesheets = snapshot.timesheet_lines('Creative')
+        
+        print(f"Found {len(timesheets)} timesheet entries for creative employees")
+        
+        # Unbilled projects: Agreement Type (x_studio_agreement_type_1) is missing/False or equals "Internal"
+        unbilled_project_ids = snapshot.unbilled_project_ids()
         
         # Group timesheet data by employee
         employee_timesheets = {}
@@ -3359,7 +5352,7 @@ def get_creative_timesheet_data(period=None, view_type='monthly'):
         print(f"Error fetching timesheet data: {e}")
         return []
 
-def get_available_creative_resources(view_type='monthly', period=None):
+def get_available_creative_resources(view_type='monthly', period=None, snapshot=None):
     """
     Fetch available creative resources from Planning > Resources with accurate utilization
     
@@ -3369,28 +5362,26 @@ def get_available_creative_resources(view_type='monthly', period=None):
                      For weekly: 'YYYY-WW' format (e.g., '2025-01' for week 1)
     """
     try:
-        models, uid = connect_to_odoo()
+        snapshot = snapshot or build_department_snapshot(period, view_type, ['Creative'])
         
-        if not models or not uid:
+        if snapshot is None:
             return []
         
-        # Get date range for the selected view type and period
-        start_date, end_date = get_date_range(view_type, period)
-        print(f"Analyzing utilization for {view_type} view: {start_date} to {end_date}")
+        models, uid = snapshot.models, snapshot.uid
         
-        # Find the Creative department
-        department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                         [[('name', '=', 'Creative')]])
+        # Date range for the selected view type and period
+        start_date, end_date = snapshot.start_date, snapshot.end_date
+        print(f"Analyzing utilization for {view_type} view: {start_date} to {end_date}")
         
-        if not department_ids:
+        if not snapshot.has_department('Creative'):
             print("No Creative department found for resources")
             return []
         
-        print(f"Creative department IDs: {department_ids}")
+        print(f"Creative department IDs: {snapshot.department_ids['Creative']}")
         
-        # Get all creative department employees
-        creative_employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                                [[('department_id', 'in', department_ids)]])
+        # Creative department employees (including resource_id and resource_calendar_id)
+        employees_data = snapshot.employees('Creative')
+        creative_employee_ids = snapshot.employee_ids('Creative')
         
         print(f"Found {len(creative_employee_ids)} creative employees")
         
@@ -3398,36 +5389,25 @@ def get_available_creative_resources(view_type='monthly', period=None):
             print("No creative employees found")
             return []
         
-        # Get employee details for all creative employees (include resource_id and resource_calendar_id)
-        employees_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                         [creative_employee_ids], {
-                                             'fields': ['name', 'job_title', 'category_ids', 'resource_id', 'resource_calendar_id']
-                                         })
-        
         print(f"Processing {len(employees_data)} employees...")
         
-        # Batch fetch all unique category IDs for tags
-        all_category_ids = set()
-        for emp in employees_data:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
-        
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-                print(f"Fetched {len(categories_dict)} unique categories for available resources")
-            except Exception as e:
-                print(f"Error fetching categories for available resources: {e}")
+        categories_dict = snapshot.categories
         
         # Build mapping between hr.employee and planning/resource IDs
         employee_availability = {}
         employee_to_resource_id = {}
         resource_id_to_employee = {}
         
+        # Working weekdays of every employee's resource calendar, resolved in bulk, and the public
+        # holidays of their company; base and holiday hours for all of them come from one capacity call
+        employee_schedules = get_employee_calendar_schedules(models, uid, creative_employee_ids)
+        employee_company = {emp['id']: snapshot.employee_company_id(emp) for emp in employees_data}
+        company_holidays = {cid: snapshot.public_holidays(cid) or [] for cid in set(employee_company.values())}
+        employee_capacity = compute_capacity(
+            {emp_id: employee_schedules[emp_id]['weekdays'] for emp_id in creative_employee_ids},
+            {emp_id: company_holidays[employee_company[emp_id]] for emp_id in creative_employee_ids},
+            [(start_date, end_date)], view_type)
+
         # Calculate base available hours PER EMPLOYEE using their resource calendars
         # We initialize with placeholders; will compute per-employee below
         _, default_base_available_hours = calculate_working_days_and_hours(start_date, end_date)
@@ -3449,8 +5429,8 @@ def get_available_creative_resources(view_type='monthly', period=None):
                     resource_id_to_employee[res_id] = employee['id']
 
             emp_id = employee['id']
-            # Compute per-employee working days from calendar
-            emp_working_days, emp_base_hours = calculate_employee_working_days_and_hours(models, uid, emp_id, start_date, end_date)
+            # Per-employee base hours from their calendar
+            emp_base_hours = employee_capacity[emp_id][0]['base_hours']
             employee_availability[emp_id] = {
                 'name': employee.get('name', ''),
                 'job_title': employee.get('job_title', ''),
@@ -3467,68 +5447,13 @@ def get_available_creative_resources(view_type='monthly', period=None):
         # Calculate Time Off hours for each employee
         print("Calculating Time Off hours...")
         
-        # Convert dates to string format for Odoo timesheet queries
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        
-        # Fetch timesheet entries for Time Off tasks
-        time_off_timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', creative_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '=', 'Time Off')]],
-            {'fields': ['employee_id', 'unit_amount']}
-        )
-        
-        print(f"Found {len(time_off_timesheets)} Time Off timesheet entries")
+        # Time Off hours per employee (one read_group for the whole snapshot)
+        _, employee_time_off = snapshot.work_and_time_off_hours()
         
-        # Calculate total Time Off hours per employee
-        employee_time_off = {}
-        for ts in time_off_timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id not in employee_time_off:
-                    employee_time_off[emp_id] = 0
-                employee_time_off[emp_id] += float(ts.get('unit_amount', 0))
+        print(f"Found Time Off hours for {len(employee_time_off)} employees")
         
-        # Fetch public holidays for each employee's company and compute per-employee holiday hours
-        # Build employee -> company_id mapping
-        employee_company = {}
-        try:
-            emp_company_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                              [creative_employee_ids], {'fields': ['company_id']})
-            for emp in emp_company_data:
-                cid = None
-                if emp.get('company_id'):
-                    cid = emp['company_id'][0] if isinstance(emp['company_id'], (list, tuple)) else emp['company_id']
-                employee_company[emp['id']] = cid
-        except Exception as _e:
-            pass
-
-        # Cache holidays per company to avoid repeated reads
-        company_holidays_cache = {}
-        # Cache holiday hours by (company_id, weekdays_tuple) to avoid recalculating for employees with same company and weekdays
-        holiday_hours_cache = {}
-        employee_holiday_hours = {}
-        for emp_id in creative_employee_ids:
-            cid = employee_company.get(emp_id)
-            if cid not in company_holidays_cache:
-                holidays = get_public_holidays(models, uid, start_date, end_date, company_id=cid)
-                company_holidays_cache[cid] = holidays
-            holidays = company_holidays_cache.get(cid) or []
-            
-            # Use employee-specific working weekdays for accuracy
-            emp_weekdays = get_employee_working_weekdays(models, uid, emp_id)
-            weekdays_key = tuple(sorted(emp_weekdays)) if emp_weekdays else None
-            cache_key = (cid, weekdays_key)
-            
-            if cache_key not in holiday_hours_cache:
-                holiday_hours_cache[cache_key] = calculate_holiday_hours_in_period(holidays, start_date, end_date, view_type, working_weekdays=emp_weekdays)
-            
-            employee_holiday_hours[emp_id] = holiday_hours_cache[cache_key]
+        # Per-employee public holiday hours (company holidays on the employee's working weekdays)
+        employee_holiday_hours = {emp_id: capacity[0]['holiday_hours'] for emp_id, capacity in employee_capacity.items()}
         
         # Update employee availability with Time Off hours and per-employee public holidays using per-employee base
         for emp_id, time_off_hours in employee_time_off.items():
@@ -3555,79 +5480,28 @@ def get_available_creative_resources(view_type='monthly', period=None):
         print(f"Searching planning slots from {start_str} to {end_str}")
         print(f"Looking for planning slots for {len(employee_to_resource_id)} creative employees (via resource IDs)")
         
-        # First, let's check if there are any planning slots at all for these employees
-        # Use planning.resource/resource_id values rather than hr.employee IDs
-        resource_ids_for_all = list(employee_to_resource_id.values())
-        all_slots = execute_odoo_call_with_retry(
-            models,
-            uid,
-            'planning.slot',
-            'search',
-            [['|', ('resource_id', 'in', resource_ids_for_all), ('employee_id', 'in', creative_employee_ids)]],
-            {'limit': 1000}
-        )
-        print(f"Total planning slots found for creative employees (any date) using resource or employee IDs: {len(all_slots)}")
-        
-        if all_slots:
-            pass
+        # Planned hours sliced from the hours cubes when available; otherwise the planning slots
+        # overlapping the period, fetched once for the whole snapshot (slots that do not map
+        # to a Creative employee are skipped below)
+        cube_planned_hours = snapshot.planned_hours()
+        resources = snapshot.planning_slots() if cube_planned_hours is None else []
         
-        # Search for planning slots overlapping the filter range for all Creative employees/resources
-        # Paginate to avoid the global 1000 results cap
-        resource_ids = []
-        try:
-            offset = 0
-            page_limit = 1000
-            while True:
-                ids_page = execute_odoo_call_with_retry(
-                    models,
-                    uid,
-                    'planning.slot',
-                    'search',
-                    [['&', '&',
-                      '|', ('resource_id', 'in', resource_ids_for_all), ('employee_id', 'in', creative_employee_ids),
-                      ('start_datetime', '<=', end_str),
-                      ('end_datetime', '>=', start_str)]],
-                    {'limit': page_limit, 'offset': offset}
-                )
-                if not ids_page:
-                    break
-                resource_ids.extend(ids_page)
-                if len(ids_page) < page_limit:
-                    break
-                offset += page_limit
-            print(f"Successfully found {len(resource_ids)} planning slots (paginated)")
-        except Exception as e:
-            print(f"Error fetching planning slots for Creative (paginated): {e}")
-            resource_ids = []
-        
-        if resource_ids:
-            print(f"Found {len(resource_ids)} planning slots for creative employees (resource mapped)")
-            
-            # Get resource data with employee information
-            # Read resources in chunks to avoid payload limits
-            resources = []
-            # Page in smaller chunks to reduce payload pressure
-            read_batch_size = 250
-            for i in range(0, len(resource_ids), read_batch_size):
-                batch_ids = resource_ids[i:i+read_batch_size]
-                batch = execute_odoo_call_with_retry(models, uid, 'planning.slot', 'read', 
-                                            [batch_ids], {
-                                                'fields': [
-                                                    'resource_id',
-                                                    'employee_id',
-                                                    'start_datetime',
-                                                    'end_datetime',
-                                                    'allocated_hours',
-                                                    'allocated_percentage'
-                                                ]
-                                            })
-                resources.extend(batch or [])
+        if cube_planned_hours is not None:
+            for employee_id in employee_availability:
+                allocated_hours = cube_planned_hours.get(employee_id, 0.0)
+                available_hours = employee_availability[employee_id]['available_hours']
+                allocated_percentage = min((allocated_hours / available_hours) * 100, 100) if available_hours > 0 else 0
+                employee_availability[employee_id]['allocated_percentage'] = allocated_percentage
+                employee_availability[employee_id]['planned_hours'] = allocated_hours
+                print(f"Employee {employee_availability[employee_id]['name']}: {allocated_hours:.1f}h allocated ({allocated_percentage:.1f}%) from the hours cube")
+        elif resources:
+            print(f"Found {len(resources)} planning slots for the snapshot (resource mapped)")
             
             print(f"Sample resource data: {resources[0] if resources else 'No resources'}")
             
-            # Group resources by employee and calculate allocation per-slot using proportional overlap
+            # Map slots to employees, then prorate all of them against the period at once
             # Overtime preserved by summing all slots; no artificial 8h cap
-            employee_resources = {}
+            slot_employees = []
             for resource in resources:
                 employee_id = None
                 # Prefer mapping via planning.resource/resource_id if present
@@ -3640,33 +5514,16 @@ def get_available_creative_resources(view_type='monthly', period=None):
                     possible_emp_id = resource['employee_id'][0] if isinstance(resource['employee_id'], (list, tuple)) else resource['employee_id']
                     if possible_emp_id in employee_availability:
                         employee_id = possible_emp_id
-                if employee_id is None:
-                    continue
-
-                if employee_id not in employee_resources:
-                    employee_resources[employee_id] = {
-                        'total_hours': 0.0,
-                        'slot_count': 0
-                    }
-
-                # Parse times
-                task_start = datetime.datetime.strptime(resource['start_datetime'], '%Y-%m-%d %H:%M:%S')
-                task_end = datetime.datetime.strptime(resource['end_datetime'], '%Y-%m-%d %H:%M:%S')
-                filter_start = datetime.datetime.strptime(start_str, '%Y-%m-%d %H:%M:%S')
-                filter_end = datetime.datetime.strptime(end_str, '%Y-%m-%d %H:%M:%S')
-                # Overlap
-                overlap_start = max(task_start, filter_start)
-                overlap_end = min(task_end, filter_end)
-                if overlap_end <= overlap_start:
-                    continue
-                # Count this slot
-                employee_resources[employee_id]['slot_count'] += 1
-                # Proportional hours
-                slot_total_seconds = max((task_end - task_start).total_seconds(), 0)
-                overlap_seconds = max((overlap_end - overlap_start).total_seconds(), 0)
-                slot_allocated_hours = float(resource.get('allocated_hours', 0) or 0)
-                seg_hours = (slot_allocated_hours * (overlap_seconds / slot_total_seconds)) if slot_total_seconds > 0 else 0.0
-                employee_resources[employee_id]['total_hours'] += seg_hours
+                slot_employees.append(employee_id)
+
+            period_window = (datetime.datetime.strptime(start_str, ODOO_DATETIME_FORMAT),
+                             datetime.datetime.strptime(end_str, ODOO_DATETIME_FORMAT))
+            # Zero-length slots have no overlap with the period here, so they add no hours and aren't counted
+            planned, slot_counts = prorate_planning_slots(resources, [period_window], slot_employees, count_instant=False)
+            employee_resources = {
+                employee_id: {'total_hours': hours[0], 'slot_count': slot_counts[employee_id][0]}
+                for employee_id, hours in planned.items()
+            }
 
             
             # Update employee availability with calculated data
@@ -3716,77 +5573,30 @@ def get_available_creative_resources(view_type='monthly', period=None):
         print(f"Error fetching available resources: {e}")
         return []
 
-def get_creative_strategy_employees():
-    """Fetch employees from Creative Strategy department"""
+def get_creative_strategy_employees(snapshot=None):
+    """Fetch employees from Creative Strategy department (from a DepartmentSnapshot when given)"""
     try:
-        models, uid = connect_to_odoo()
+        snapshot = snapshot or build_department_snapshot(department_names=['Creative Strategy'])
         
-        if not models or not uid:
+        if snapshot is None:
             return []
         
-        # Find the "Creative Strategy" department
-        department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                         [[('name', '=', 'Creative Strategy')]])
-        
-        if not department_ids:
+        if not snapshot.has_department('Creative Strategy'):
             print("No 'Creative Strategy' department found")
             return []
         
-        print(f"Found Creative Strategy department with ID: {department_ids}")
+        print(f"Found Creative Strategy department with ID: {snapshot.department_ids['Creative Strategy']}")
         
-        # Get employees in the Creative Strategy department
-        employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                       [[('department_id', 'in', department_ids)]])
+        # Employees of the Creative Strategy department with categories/tags
+        employees = snapshot.employees('Creative Strategy')
         
-        if not employee_ids:
+        if not employees:
             print("No employees found in Creative Strategy department")
             return []
         
-        print(f"Found {len(employee_ids)} employees in Creative Strategy department")
-        
-        # Get employee data with categories/tags
-        employees = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                    [employee_ids], {
-                                        'fields': [
-                                            'name', 
-                                            'job_title', 
-                                            'work_email',
-                                            'category_ids',  # This is the many2many field for categories/tags
-                                            'active',  # Employee active status
-                                            'work_permit_expiration_date',  # Could indicate availability
-                                            'employee_type'  # Could indicate availability status
-                                        ]
-                                    })
-        
-        # Batch fetch all unique category IDs
-        all_category_ids = set()
-        for emp in employees:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
+        print(f"Found {len(employees)} employees in Creative Strategy department")
         
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                
-                # Create a dictionary for fast lookup
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-                print(f"Fetched {len(categories_dict)} unique categories in batch for Creative Strategy")
-                
-            except Exception as e:
-                print(f"Error fetching categories in batch for Creative Strategy: {e}")
-                # Fallback to individual calls if batch fails
-                print("Falling back to individual category fetching for Creative Strategy...")
-                for emp in employees:
-                    if emp.get('category_ids'):
-                        try:
-                            categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                                         [emp['category_ids']], {'fields': ['name']})
-                            categories_dict.update({cat['id']: cat['name'] for cat in categories if cat.get('name')})
-                        except Exception as e2:
-                            print(f"Error fetching categories for Creative Strategy employee {emp.get('name')}: {e2}")
+        categories_dict = snapshot.categories
         
         # Process employees using the cached categories
         processed_employees = []
@@ -3833,7 +5643,7 @@ def get_creative_strategy_employees():
     except Exception as e:
         print(f"Error fetching Creative Strategy employees: {e}")
         return []
-def get_creative_strategy_team_utilization_data(period=None, view_type='monthly'):
+def get_creative_strategy_team_utilization_data(period=None, view_type='monthly', snapshot=None):
     """
     Fetch team utilization data for Creative Strategy department teams (KSA, UAE, and Nightshift).
     
@@ -3845,105 +5655,41 @@ def get_creative_strategy_team_utilization_data(period=None, view_type='monthly'
         dict: Team utilization data with stats for each team
     """
     try:
-        models, uid = connect_to_odoo()
+        snapshot = snapshot or build_department_snapshot(period, view_type, ['Creative Strategy'])
         
-        if not models or not uid:
+        if snapshot is None:
             return {}
         
-        # Get date range for the selected period and view type
-        start_date, end_date = get_date_range(view_type, period)
+        # Date range for the selected period and view type
+        start_date, end_date = snapshot.start_date, snapshot.end_date
         print(f"Fetching Creative Strategy team utilization data for {view_type} view: {start_date} to {end_date}")
         
-        # Fetch per-employee company and compute individual holiday hours
-        employee_company = {}
-        try:
-            emp_company_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                              [creative_employee_ids], {'fields': ['company_id']})
-            for emp in emp_company_data:
-                cid = None
-                if emp.get('company_id'):
-                    cid = emp['company_id'][0] if isinstance(emp['company_id'], (list, tuple)) else emp['company_id']
-                employee_company[emp['id']] = cid
-        except Exception as _e:
-            pass
-
-        company_holidays_cache = {}
-        company_holiday_hours_cache = {}
-        employee_holiday_hours = {}
-        for emp_id in creative_employee_ids:
-            cid = employee_company.get(emp_id)
-            if cid not in company_holidays_cache:
-                holidays = get_public_holidays(models, uid, start_date, end_date, company_id=cid)
-                company_holidays_cache[cid] = holidays
-                # Calculate holiday hours once per company and cache it
-                company_holiday_hours_cache[cid] = calculate_holiday_hours_in_period(holidays, start_date, end_date, view_type)
-            employee_holiday_hours[emp_id] = company_holiday_hours_cache[cid]
-        
-        # Find the Creative Strategy department
-        department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                         [[('name', '=', 'Creative Strategy')]])
-        
-        if not department_ids:
+        if not snapshot.has_department('Creative Strategy'):
             print("No Creative Strategy department found")
             return {}
         
-        # Get all Creative Strategy department employees with their tags
-        creative_strategy_employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                                        [[('department_id', 'in', department_ids)]])
+        # Creative Strategy department employees with their tags
+        employees_data = snapshot.employees('Creative Strategy')
+        creative_strategy_employee_ids = snapshot.employee_ids('Creative Strategy')
         
         if not creative_strategy_employee_ids:
             print("No Creative Strategy employees found")
             return {}
         
-        # Get employee details with tags
-        employees_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                         [creative_strategy_employee_ids], {
-                                             'fields': ['id', 'name', 'job_title', 'category_ids']
-                                         })
-        
-        # Batch fetch all unique category IDs
-        all_category_ids = set()
+        # Compute per-employee holiday hours (once per company) for utilization stats
+        company_holiday_hours_cache = {}
+        employee_holiday_hours = {}
         for emp in employees_data:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
-        
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-            except Exception as e:
-                print(f"Error fetching categories for Creative Strategy: {e}")
-        
-        # Convert dates to string format for Odoo
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        
-        # Fetch timesheet data for Creative Strategy employees
-        timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', creative_strategy_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '!=', 'Time Off')]],
-            {'fields': ['employee_id', 'unit_amount']}
-        )
+            cid = snapshot.employee_company_id(emp)
+            if cid not in company_holiday_hours_cache:
+                holidays = snapshot.public_holidays(cid)
+                company_holiday_hours_cache[cid] = calculate_holiday_hours_in_period(holidays, start_date, end_date, view_type)
+            employee_holiday_hours[emp['id']] = company_holiday_hours_cache[cid]
         
-        # Fetch planning data for Creative Strategy employees
-        start_planning_str = start_date.strftime('%Y-%m-%d 00:00:00')
-        end_planning_str = end_date.strftime('%Y-%m-%d 23:59:59')
+        categories_dict = snapshot.categories
         
-        planning_slots = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'planning.slot', 'search_read',
-            [[('resource_id', 'in', creative_strategy_employee_ids),
-              ('start_datetime', '<=', end_planning_str),
-              ('end_datetime', '>=', start_planning_str)]],
-            {'fields': ['resource_id', 'allocated_hours', 'start_datetime', 'end_datetime']}
-        )
+        # Worked and Time Off hours per employee (one read_group for the whole snapshot)
+        logged_by_employee, employee_time_off = snapshot.work_and_time_off_hours()
         
         # Group timesheet and planning data by employee
         employee_data = {}
@@ -3965,28 +5711,7 @@ def get_creative_strategy_team_utilization_data(period=None, view_type='monthly'
         # Calculate Time Off hours for each employee
         print("Calculating Time Off hours for Creative Strategy utilization data...")
         
-        # Fetch timesheet entries for Time Off tasks
-        time_off_timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', creative_strategy_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '=', 'Time Off')]],
-            {'fields': ['employee_id', 'unit_amount']}
-        )
-        
-        print(f"Found {len(time_off_timesheets)} Time Off timesheet entries for Creative Strategy utilization data")
-        
-        # Calculate total Time Off hours per employee
-        employee_time_off = {}
-        for ts in time_off_timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id not in employee_time_off:
-                    employee_time_off[emp_id] = 0
-                employee_time_off[emp_id] += float(ts.get('unit_amount', 0))
+        print(f"Found Time Off hours for {len(employee_time_off)} employees for utilization data")
         
         # Add Time Off hours to employee data
         for emp_id in employee_data:
@@ -3995,17 +5720,13 @@ def get_creative_strategy_team_utilization_data(period=None, view_type='monthly'
             if time_off_hours > 0:
                 print(f"Creative Strategy employee {employee_data[emp_id]['name']}: {time_off_hours:.1f}h Time Off")
         
-        # Calculate logged hours
-        for ts in timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id in employee_data:
-                    employee_data[emp_id]['logged_hours'] += float(ts.get('unit_amount', 0))
+        # Add logged hours
+        for emp_id in employee_data:
+            employee_data[emp_id]['logged_hours'] = logged_by_employee.get(emp_id, 0)
         
         # Get planned hours from available resources (same source as Available Creatives tab)
         print("Getting planned hours from available resources for Creative Strategy...")
-        available_resources = get_available_creative_strategy_resources(view_type, period)
+        available_resources = department_section_functions('Creative Strategy', snapshot)['available_resources']()
         
         # Create a mapping of employee names to planned hours from available resources (numeric)
         resource_planned_hours = {}
@@ -4079,7 +5800,7 @@ def get_creative_strategy_team_utilization_data(period=None, view_type='monthly'
         print(f"Error fetching Creative Strategy team utilization data: {e}")
         return {}
 
-def get_creative_strategy_timesheet_data(period=None, view_type='monthly'):
+def get_creative_strategy_timesheet_data(period=None, view_type='monthly', snapshot=None):
     """
     Fetch timesheet data for Creative Strategy employees for a specific period.
     
@@ -4094,109 +5815,35 @@ def get_creative_strategy_timesheet_data(period=None, view_type='monthly'):
         list: List of Creative Strategy employees with their timesheet hours
     """
     try:
-        models, uid = connect_to_odoo()
+        snapshot = snapshot or build_department_snapshot(period, view_type, ['Creative Strategy'])
         
-        if not models or not uid:
+        if snapshot is None:
             return []
         
-        # Get date range for the selected period and view type
-        start_date, end_date = get_date_range(view_type, period)
+        # Date range for the selected period and view type
+        start_date, end_date = snapshot.start_date, snapshot.end_date
         print(f"Fetching Creative Strategy timesheet data for {view_type} view: {start_date} to {end_date}")
         
-        # Find the Creative Strategy department
-        department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                         [[('name', '=', 'Creative Strategy')]])
-        
-        if not department_ids:
+        if not snapshot.has_department('Creative Strategy'):
             print("No Creative Strategy department found")
             return []
         
-        # Get all Creative Strategy department employees
-        creative_strategy_employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                                        [[('department_id', 'in', department_ids)]])
+        # Creative Strategy department employees with their tags
+        employees_data = snapshot.employees('Creative Strategy')
         
-        if not creative_strategy_employee_ids:
+        if not employees_data:
             print("No Creative Strategy employees found")
             return []
         
-        # Get employee details with tags
-        employees_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                         [creative_strategy_employee_ids], {
-                                             'fields': ['id', 'name', 'job_title', 'category_ids']
-                                         })
-        
-        # Batch fetch all unique category IDs for tags
-        all_category_ids = set()
-        for emp in employees_data:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
-        
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-                print(f"Fetched {len(categories_dict)} unique categories for Creative Strategy timesheet data")
-            except Exception as e:
-                print(f"Error fetching categories for Creative Strategy timesheet data: {e}")
-        
-        # Convert dates to string format for Odoo
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        
-        print(f"Searching Creative Strategy timesheets from {start_str} to {end_str}")
+        categories_dict = snapshot.categories
         
-        # Fetch timesheet data for Creative Strategy employees
-        timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', creative_strategy_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '!=', 'Time Off')]],  # Exclude "Time Off" tasks
-            {'fields': ['employee_id', 'unit_amount', 'task_id', 'date', 'project_id']}
-        )
+        # Timesheet lines excluding "Time Off" tasks, fetched once for the whole snapshot
+        timesheets = snapshot.timesheet_lines('Creative Strategy')
         
         print(f"Found {len(timesheets)} timesheet entries for Creative Strategy employees")
         
-        # Compute set of unbilled project IDs based on Agreement Type on project.project
-        # Unbilled criteria: Agreement Type (x_studio_agreement_type_1) is missing/False or equals "Internal"
-        project_ids = set()
-        for ts in timesheets:
-            proj = ts.get('project_id')
-            if proj:
-                try:
-                    project_ids.add(proj[0] if isinstance(proj, (list, tuple)) else int(proj))
-                except Exception:
-                    pass
-        unbilled_project_ids = set()
-        if project_ids:
-            try:
-                projects = models.execute_kw(
-                    ODOO_DB, uid, ODOO_PASSWORD,
-                    'project.project', 'read',
-                    [list(project_ids)],
-                    {'fields': ['display_name', 'x_studio_agreement_type_1']}
-                )
-                for proj in projects:
-                    agreement = proj.get('x_studio_agreement_type_1')
-                    is_unbilled = False
-                    if not agreement:
-                        is_unbilled = True
-                    elif isinstance(agreement, str):
-                        is_unbilled = agreement.strip().lower() == 'internal'
-                    elif isinstance(agreement, (list, tuple)) and len(agreement) > 1:
-                        try:
-                            is_unbilled = str(agreement[1]).strip().lower() == 'internal'
-                        except Exception:
-                            is_unbilled = False
-                    if is_unbilled and proj.get('id') is not None:
-                        unbilled_project_ids.add(proj['id'])
-            except Exception as _e:
-                # If project lookup fails, treat all as billed (safe)
-                unbilled_project_ids = set()
+        # Unbilled projects: Agreement Type (x_studio_agreement_type_1) is missing/False or equals "Internal"
+        unbilled_project_ids = snapshot.unbilled_project_ids()
         
         # Group timesheet data by employee
         employee_timesheets = {}
@@ -4280,7 +5927,7 @@ def get_creative_strategy_timesheet_data(period=None, view_type='monthly'):
         print(f"Error fetching Creative Strategy timesheet data: {e}")
         return []
 
-def get_available_creative_strategy_resources(view_type='monthly', period=None):
+def get_available_creative_strategy_resources(view_type='monthly', period=None, snapshot=None):
     """
     Fetch available Creative Strategy resources from Planning > Resources with accurate utilization
     
@@ -4290,32 +5937,24 @@ def get_available_creative_strategy_resources(view_type='monthly', period=None):
                      For weekly: 'YYYY-WW' format (e.g., '2025-01' for week 1)
     """
     try:
-        models, uid = connect_to_odoo()
+        snapshot = snapshot or build_department_snapshot(period, view_type, ['Creative Strategy'])
         
-        if not models or not uid:
+        if snapshot is None:
             return []
         
-        # Get date range for the selected view type and period
-        start_date, end_date = get_date_range(view_type, period)
+        # Date range for the selected view type and period
+        start_date, end_date = snapshot.start_date, snapshot.end_date
         print(f"Analyzing Creative Strategy utilization for {view_type} view: {start_date} to {end_date}")
         
-        # Fetch public holidays for the period (needed for available hours calculation)
-        public_holidays = get_public_holidays(models, uid, start_date, end_date)
-        total_holiday_hours = calculate_holiday_hours_in_period(public_holidays, start_date, end_date, view_type)
-        
-        # Find the Creative Strategy department
-        department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                         [[('name', '=', 'Creative Strategy')]])
-        
-        if not department_ids:
+        if not snapshot.has_department('Creative Strategy'):
             print("No Creative Strategy department found for resources")
             return []
         
-        print(f"Creative Strategy department IDs: {department_ids}")
+        print(f"Creative Strategy department IDs: {snapshot.department_ids['Creative Strategy']}")
         
-        # Get all Creative Strategy department employees
-        creative_strategy_employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                                        [[('department_id', 'in', department_ids)]])
+        # Creative Strategy department employees with their tags
+        employees_data = snapshot.employees('Creative Strategy')
+        creative_strategy_employee_ids = snapshot.employee_ids('Creative Strategy')
         
         print(f"Found {len(creative_strategy_employee_ids)} Creative Strategy employees")
         
@@ -4323,30 +5962,7 @@ def get_available_creative_strategy_resources(view_type='monthly', period=None):
             print("No Creative Strategy employees found")
             return []
         
-        # Get employee details for all Creative Strategy employees
-        employees_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                         [creative_strategy_employee_ids], {
-                                             'fields': ['name', 'job_title', 'category_ids']
-                                         })
-        
-        print(f"Processing {len(employees_data)} Creative Strategy employees...")
-        
-        # Batch fetch all unique category IDs for tags
-        all_category_ids = set()
-        for emp in employees_data:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
-        
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-                print(f"Fetched {len(categories_dict)} unique categories for Creative Strategy available resources")
-            except Exception as e:
-                print(f"Error fetching categories for Creative Strategy available resources: {e}")
+        categories_dict = snapshot.categories
         
         # Create a dictionary to store employee availability data
         employee_availability = {}
@@ -4378,45 +5994,13 @@ def get_available_creative_strategy_resources(view_type='monthly', period=None):
         # Calculate Time Off hours for each employee
         print("Calculating Time Off hours for Creative Strategy...")
         
-        # Convert dates to string format for Odoo timesheet queries
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        
-        # Fetch timesheet entries for Time Off tasks
-        time_off_timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', creative_strategy_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '=', 'Time Off')]],
-            {'fields': ['employee_id', 'unit_amount']}
-        )
-        
-        print(f"Found {len(time_off_timesheets)} Time Off timesheet entries for Creative Strategy")
+        # Time Off hours per employee (one read_group for the whole snapshot)
+        _, employee_time_off = snapshot.work_and_time_off_hours()
         
-        # Calculate total Time Off hours per employee
-        employee_time_off = {}
-        for ts in time_off_timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id not in employee_time_off:
-                    employee_time_off[emp_id] = 0
-                employee_time_off[emp_id] += float(ts.get('unit_amount', 0))
+        print(f"Found Time Off hours for {len(employee_time_off)} employees for Creative Strategy")
         
         # Fetch employee company and calculate individual holiday hours
-        employee_company = {}
-        try:
-            emp_company_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                              [creative_strategy_employee_ids], {'fields': ['company_id']})
-            for emp in emp_company_data:
-                cid = None
-                if emp.get('company_id'):
-                    cid = emp['company_id'][0] if isinstance(emp['company_id'], (list, tuple)) else emp['company_id']
-                employee_company[emp['id']] = cid
-        except Exception as _e:
-            pass
+        employee_company = {emp['id']: snapshot.employee_company_id(emp) for emp in employees_data}
 
         company_holidays_cache = {}
         company_holiday_hours_cache = {}
@@ -4424,7 +6008,7 @@ def get_available_creative_strategy_resources(view_type='monthly', period=None):
         for emp_id in creative_strategy_employee_ids:
             cid = employee_company.get(emp_id)
             if cid not in company_holidays_cache:
-                holidays = get_public_holidays(models, uid, start_date, end_date, company_id=cid)
+                holidays = snapshot.public_holidays(cid)
                 company_holidays_cache[cid] = holidays
                 # Calculate holiday hours once per company and cache it
                 company_holiday_hours_cache[cid] = calculate_holiday_hours_in_period(holidays, start_date, end_date, view_type)
@@ -4453,52 +6037,18 @@ def get_available_creative_strategy_resources(view_type='monthly', period=None):
         print(f"Searching Creative Strategy planning slots from {start_str} to {end_str}")
         print(f"Looking for planning slots for {len(creative_strategy_employee_ids)} Creative Strategy employees")
         
-        # First, let's check if there are any planning slots at all for these employees
-        all_slots = execute_odoo_call_with_retry(models, uid, 'planning.slot', 'search', 
-                                       [[('resource_id', 'in', creative_strategy_employee_ids)]], 
-                                       {'limit': 1000})
-        print(f"Total planning slots found for Creative Strategy employees (any date): {len(all_slots)}")
+        # Planning slots overlapping the period, fetched once for the whole snapshot;
+        # only slots whose resource_id is a Creative Strategy employee are counted below
+        resources = snapshot.planning_slots()
         
-        if all_slots:
-            # Get a sample of slots to see what dates they have
-            sample_slots = execute_odoo_call_with_retry(models, uid, 'planning.slot', 'read', 
-                                          [all_slots[:5]], {
-                                              'fields': [
-                                                  'resource_id',
-                                                  'start_datetime',
-                                                  'end_datetime',
-                                                  'allocated_hours'
-                                              ]
-                                          })
-            print(f"Sample Creative Strategy planning slots (first 5):")
-            for slot in sample_slots:
-                print(f"  - {slot.get('start_datetime')} to {slot.get('end_datetime')} ({slot.get('allocated_hours', 0)}h)")
-        
-        # Search for planning slots where resource_id is in Creative Strategy employees
-        # Include slots that overlap with the filter range (start before but end within, or start within but end after)
-        resource_ids = execute_odoo_call_with_retry(models, uid, 'planning.slot', 'search', 
-                                       [[('resource_id', 'in', creative_strategy_employee_ids),
-                                         ('start_datetime', '<=', end_str),
-                                         ('end_datetime', '>=', start_str)]], 
-                                       {'limit': 1000})
-        
-        if resource_ids:
-            print(f"Found {len(resource_ids)} planning slots for Creative Strategy employees")
-            
-            # Get resource data with employee information
-            resources = execute_odoo_call_with_retry(models, uid, 'planning.slot', 'read', 
-                                        [resource_ids], {
-                                            'fields': [
-                                                'resource_id',
-                                                'start_datetime',
-                                                'end_datetime',
-                                                'allocated_hours'
-                                            ]
-                                        })
+        if resources:
+            print(f"Found {len(resources)} planning slots for the snapshot")
             
             print(f"Sample Creative Strategy resource data: {resources[0] if resources else 'No resources'}")
             
             # Group resources by employee and calculate allocation based on view type
+            filter_start = datetime.datetime.strptime(start_str, ODOO_DATETIME_FORMAT)
+            filter_end = datetime.datetime.strptime(end_str, ODOO_DATETIME_FORMAT)
             employee_resources = {}
             for resource in resources:
                 if resource.get('resource_id') and resource['resource_id'][0] in employee_availability:
@@ -4513,8 +6063,6 @@ def get_available_creative_strategy_resources(view_type='monthly', period=None):
                     # Parse task start and end times
                     task_start = datetime.datetime.strptime(resource['start_datetime'], '%Y-%m-%d %H:%M:%S')
                     task_end = datetime.datetime.strptime(resource['end_datetime'], '%Y-%m-%d %H:%M:%S')
-                    filter_start = datetime.datetime.strptime(start_str, '%Y-%m-%d %H:%M:%S')
-                    filter_end = datetime.datetime.strptime(end_str, '%Y-%m-%d %H:%M:%S')
                     
                     # Calculate allocated hours based on view type
                     if view_type == 'daily':
@@ -4601,106 +6149,30 @@ def get_available_creative_strategy_resources(view_type='monthly', period=None):
     except Exception as e:
         print(f"Error fetching Creative Strategy available resources: {e}")
         return []
-def get_instructional_design_employees():
-    """Fetch employees from Instructional Design department"""
+def get_instructional_design_employees(snapshot=None):
+    """Fetch employees from Instructional Design department (from a DepartmentSnapshot when given)"""
     try:
-        models, uid = connect_to_odoo()
+        snapshot = snapshot or build_department_snapshot(department_names=['Instructional Design'])
         
-        if not models or not uid:
+        if snapshot is None:
             return []
         
-        # Find the "Instructional Design" department - try multiple possible names
-        possible_names = [
-            'Instructional Design',
-            'Instructional Design Department',
-            'InstructionalDesign',
-            'Instructional_Design',
-            'ID',
-            'ID Department'
-        ]
-        
-        department_ids = []
-        found_name = None
-        
-        for name in possible_names:
-            department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                             [[('name', '=', name)]])
-            if department_ids:
-                found_name = name
-                break
-        
-        # If exact match not found, try partial match
-        if not department_ids:
-            department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                             [[('name', 'ilike', 'Instructional')]])
-            if department_ids:
-                # Get the department names to see what we found
-                dept_details = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'read', 
-                                               [department_ids], {'fields': ['name']})
-                found_names = [dept['name'] for dept in dept_details]
-                print(f"Found departments with 'Instructional' in name: {found_names}")
-                found_name = found_names[0] if found_names else None
-        
-        if not department_ids:
-            print("No 'Instructional Design' department found with any of the possible names")
-            print(f"Tried names: {possible_names}")
+        if not snapshot.has_department('Instructional Design'):
+            print("No 'Instructional Design' department found")
             return []
         
-        print(f"Found Instructional Design department with ID: {department_ids}, name: '{found_name}'")
+        print(f"Found Instructional Design department with ID: {snapshot.department_ids['Instructional Design']}")
         
-        # Get employees in the Instructional Design department
-        employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                       [[('department_id', 'in', department_ids)]])
+        # Employees of the Instructional Design department with categories/tags
+        employees = snapshot.employees('Instructional Design')
         
-        if not employee_ids:
+        if not employees:
             print("No employees found in Instructional Design department")
             return []
         
-        print(f"Found {len(employee_ids)} employees in Instructional Design department")
-        
-        # Get employee data with categories/tags
-        employees = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                    [employee_ids], {
-                                        'fields': [
-                                            'name', 
-                                            'job_title', 
-                                            'work_email',
-                                            'category_ids',  # This is the many2many field for categories/tags
-                                            'active',  # Employee active status
-                                            'work_permit_expiration_date',  # Could indicate availability
-                                            'employee_type'  # Could indicate availability status
-                                        ]
-                                    })
-        
-        # Batch fetch all unique category IDs
-        all_category_ids = set()
-        for emp in employees:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
+        print(f"Found {len(employees)} employees in Instructional Design department")
         
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                
-                # Create a dictionary for fast lookup
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-                print(f"Fetched {len(categories_dict)} unique categories in batch for Instructional Design")
-                
-            except Exception as e:
-                print(f"Error fetching categories in batch for Instructional Design: {e}")
-                # Fallback to individual calls if batch fails
-                print("Falling back to individual category fetching for Instructional Design...")
-                for emp in employees:
-                    if emp.get('category_ids'):
-                        try:
-                            categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                                         [emp['category_ids']], {'fields': ['name']})
-                            categories_dict.update({cat['id']: cat['name'] for cat in categories if cat.get('name')})
-                        except Exception as e2:
-                            print(f"Error fetching categories for Instructional Design employee {emp.get('name')}: {e2}")
+        categories_dict = snapshot.categories
         
         # Process employees using the cached categories
         processed_employees = []
@@ -4748,153 +6220,46 @@ def get_instructional_design_employees():
         print(f"Error fetching Instructional Design employees: {e}")
         return []
 
-def get_instructional_design_team_utilization_data(period=None, view_type='monthly'):
+def get_instructional_design_team_utilization_data(period=None, view_type='monthly', snapshot=None):
     """
     Fetch team utilization data for Instructional Design department teams (KSA, UAE, and Nightshift).
     
     Args:
         period (str): Period in format based on view_type:
-                     - 'monthly': 'YYYY-MM' format (e.g., '2025-01')
-                     - 'weekly': 'YYYY-WW' format (e.g., '2025-01')
-                     - 'daily': 'YYYY-DDD' format (e.g., '2025-001')
-        view_type (str): 'monthly', 'weekly', or 'daily'
-    
-    Returns:
-        dict: Team utilization data for Instructional Design department
-    """
-    try:
-        models, uid = connect_to_odoo()
-        
-        if not models or not uid:
-            return {}
-        
-        # Get date range for the selected period and view type
-        start_date, end_date = get_date_range(view_type, period)
-        print(f"Fetching Instructional Design team utilization data for {view_type} view: {start_date} to {end_date}")
-        
-        # Fetch public holidays for the period (needed for available hours calculation)
-        public_holidays = get_public_holidays(models, uid, start_date, end_date)
-        0  # TODO: Calculate holiday hours per employee properly = calculate_holiday_hours_in_period(public_holidays, start_date, end_date, view_type)
-        
-        # Find the Instructional Design department - try multiple possible names
-        possible_names = [
-            'Instructional Design',
-            'Instructional Design Department',
-            'InstructionalDesign',
-            'Instructional_Design',
-            'ID',
-            'ID Department'
-        ]
-        
-        department_ids = []
-        found_name = None
+                     - 'monthly': 'YYYY-MM' format (e.g., '2025-01')
+                     - 'weekly': 'YYYY-WW' format (e.g., '2025-01')
+                     - 'daily': 'YYYY-DDD' format (e.g., '2025-001')
+        view_type (str): 'monthly', 'weekly', or 'daily'
+    
+    Returns:
+        dict: Team utilization data for Instructional Design department
+    """
+    try:
+        snapshot = snapshot or build_department_snapshot(period, view_type, ['Instructional Design'])
         
-        for name in possible_names:
-            department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                             [[('name', '=', name)]])
-            if department_ids:
-                found_name = name
-                break
+        if snapshot is None:
+            return {}
         
-        # If exact match not found, try partial match
-        if not department_ids:
-            department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                             [[('name', 'ilike', 'Instructional')]])
-            if department_ids:
-                # Get the department names to see what we found
-                dept_details = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'read', 
-                                               [department_ids], {'fields': ['name']})
-                found_names = [dept['name'] for dept in dept_details]
-                print(f"Found departments with 'Instructional' in name: {found_names}")
-                found_name = found_names[0] if found_names else None
+        # Date range for the selected period and view type
+        start_date, end_date = snapshot.start_date, snapshot.end_date
+        print(f"Fetching Instructional Design team utilization data for {view_type} view: {start_date} to {end_date}")
         
-        if not department_ids:
-            print("No Instructional Design department found with any of the possible names")
-            print(f"Tried names: {possible_names}")
+        if not snapshot.has_department('Instructional Design'):
+            print("No Instructional Design department found")
             return {}
         
-        print(f"Found Instructional Design department with ID: {department_ids}, name: '{found_name}'")
-        
-        # Get all Instructional Design department employees
-        instructional_design_employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                                           [[('department_id', 'in', department_ids)]])
+        # Instructional Design department employees with their tags
+        employees_data = snapshot.employees('Instructional Design')
+        instructional_design_employee_ids = snapshot.employee_ids('Instructional Design')
         
         if not instructional_design_employee_ids:
             print("No Instructional Design employees found")
             return {}
         
-        # Get employee details with tags
-        employees_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                         [instructional_design_employee_ids], {
-                                             'fields': ['id', 'name', 'job_title', 'category_ids']
-                                         })
-        
-        # Batch fetch all unique category IDs for tags
-        all_category_ids = set()
-        for emp in employees_data:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
-        
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-                print(f"Fetched {len(categories_dict)} unique categories for Instructional Design team utilization data")
-            except Exception as e:
-                print(f"Error fetching categories for Instructional Design team utilization data: {e}")
-        
-        # Convert dates to string format for Odoo
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        
-        print(f"Searching Instructional Design timesheets from {start_str} to {end_str}")
-        
-        # Fetch timesheet data for Instructional Design employees
-        timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', instructional_design_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '!=', 'Time Off')]],  # Exclude "Time Off" tasks
-            {'fields': ['employee_id', 'unit_amount', 'task_id', 'date']}
-        )
-        
-        print(f"Found {len(timesheets)} timesheet entries for Instructional Design employees")
-        
-        # Calculate total hours per employee
-        employee_hours = {}
-        for ts in timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id not in employee_hours:
-                    employee_hours[emp_id] = 0
-                employee_hours[emp_id] += float(ts.get('unit_amount', 0))
-        
-        # Fetch time off data for Instructional Design employees
-        time_off_timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', instructional_design_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '=', 'Time Off')]],
-            {'fields': ['employee_id', 'unit_amount']}
-        )
+        categories_dict = snapshot.categories
         
-        # Calculate time off hours per employee
-        employee_time_off = {}
-        for ts in time_off_timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id not in employee_time_off:
-                    employee_time_off[emp_id] = 0
-                employee_time_off[emp_id] += float(ts.get('unit_amount', 0))
+        # Worked and Time Off hours per employee (one read_group for the whole snapshot)
+        employee_hours, employee_time_off = snapshot.work_and_time_off_hours()
         
         # Create employee data structure
         employee_data = {}
@@ -4914,7 +6279,7 @@ def get_instructional_design_team_utilization_data(period=None, view_type='month
             }
         
         # Get planned hours from available resources
-        available_resources = get_available_instructional_design_resources(view_type, period)
+        available_resources = department_section_functions('Instructional Design', snapshot)['available_resources']()
         resource_planned_hours = {}
         for resource in available_resources:
             try:
@@ -5000,7 +6365,7 @@ def get_instructional_design_team_utilization_data(period=None, view_type='month
         print(f"Error fetching Instructional Design team utilization data: {e}")
         return {}
 
-def get_instructional_design_timesheet_data(period=None, view_type='monthly'):
+def get_instructional_design_timesheet_data(period=None, view_type='monthly', snapshot=None):
     """
     Fetch timesheet data for Instructional Design employees for a specific period.
     
@@ -5015,101 +6380,30 @@ def get_instructional_design_timesheet_data(period=None, view_type='monthly'):
         list: List of Instructional Design employees with their timesheet hours
     """
     try:
-        models, uid = connect_to_odoo()
+        snapshot = snapshot or build_department_snapshot(period, view_type, ['Instructional Design'])
         
-        if not models or not uid:
+        if snapshot is None:
             return []
         
-        # Get date range for the selected period and view type
-        start_date, end_date = get_date_range(view_type, period)
+        # Date range for the selected period and view type
+        start_date, end_date = snapshot.start_date, snapshot.end_date
         print(f"Fetching Instructional Design timesheet data for {view_type} view: {start_date} to {end_date}")
         
-        # Find the Instructional Design department - try multiple possible names
-        possible_names = [
-            'Instructional Design',
-            'Instructional Design Department',
-            'InstructionalDesign',
-            'Instructional_Design',
-            'ID',
-            'ID Department'
-        ]
-        
-        department_ids = []
-        found_name = None
-        
-        for name in possible_names:
-            department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                             [[('name', '=', name)]])
-            if department_ids:
-                found_name = name
-                break
-        
-        # If exact match not found, try partial match
-        if not department_ids:
-            department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                             [[('name', 'ilike', 'Instructional')]])
-            if department_ids:
-                # Get the department names to see what we found
-                dept_details = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'read', 
-                                               [department_ids], {'fields': ['name']})
-                found_names = [dept['name'] for dept in dept_details]
-                print(f"Found departments with 'Instructional' in name: {found_names}")
-                found_name = found_names[0] if found_names else None
-        
-        if not department_ids:
-            print("No Instructional Design department found with any of the possible names")
-            print(f"Tried names: {possible_names}")
+        if not snapshot.has_department('Instructional Design'):
+            print("No Instructional Design department found")
             return []
         
-        print(f"Found Instructional Design department with ID: {department_ids}, name: '{found_name}'")
+        # Instructional Design department employees with their tags
+        employees_data = snapshot.employees('Instructional Design')
         
-        # Get all Instructional Design department employees
-        instructional_design_employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                                           [[('department_id', 'in', department_ids)]])
-        
-        if not instructional_design_employee_ids:
+        if not employees_data:
             print("No Instructional Design employees found")
             return []
         
-        # Get employee details with tags
-        employees_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                         [instructional_design_employee_ids], {
-                                             'fields': ['id', 'name', 'job_title', 'category_ids']
-                                         })
-        
-        # Batch fetch all unique category IDs for tags
-        all_category_ids = set()
-        for emp in employees_data:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
-        
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-                print(f"Fetched {len(categories_dict)} unique categories for Instructional Design timesheet data")
-            except Exception as e:
-                print(f"Error fetching categories for Instructional Design timesheet data: {e}")
-        
-        # Convert dates to string format for Odoo
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
+        categories_dict = snapshot.categories
         
-        print(f"Searching Instructional Design timesheets from {start_str} to {end_str}")
-        
-        # Fetch timesheet data for Instructional Design employees
-        timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', instructional_design_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '!=', 'Time Off')]],  # Exclude "Time Off" tasks
-            {'fields': ['employee_id', 'unit_amount', 'task_id', 'date']}
-        )
+        # Timesheet lines excluding "Time Off" tasks, fetched once for the whole snapshot
+        timesheets = snapshot.timesheet_lines('Instructional Design')
         
         print(f"Found {len(timesheets)} timesheet entries for Instructional Design employees")
         
@@ -5172,7 +6466,7 @@ def get_instructional_design_timesheet_data(period=None, view_type='monthly'):
         print(f"Error fetching Instructional Design timesheet data: {e}")
         return []
 
-def get_available_instructional_design_resources(view_type='monthly', period=None):
+def get_available_instructional_design_resources(view_type='monthly', period=None, snapshot=None):
     """
     Fetch available resources data for Instructional Design department employees.
     
@@ -5187,93 +6481,36 @@ def get_available_instructional_design_resources(view_type='monthly', period=Non
         list: List of Instructional Design employees with their availability data
     """
     try:
-        models, uid = connect_to_odoo()
+        snapshot = snapshot or build_department_snapshot(period, view_type, ['Instructional Design'])
         
-        if not models or not uid:
+        if snapshot is None:
             return []
         
-        # Get date range for the selected period and view type
-        start_date, end_date = get_date_range(view_type, period)
+        # Date range for the selected view type and period
+        start_date, end_date = snapshot.start_date, snapshot.end_date
         print(f"Fetching Instructional Design available resources for {view_type} view: {start_date} to {end_date}")
         
         # Fetch public holidays for the period (needed for available hours calculation)
-        public_holidays = get_public_holidays(models, uid, start_date, end_date)
+        public_holidays = snapshot.public_holidays()
         total_holiday_hours = calculate_holiday_hours_in_period(public_holidays, start_date, end_date, view_type)
         
-        # Find the Instructional Design department - try multiple possible names
-        possible_names = [
-            'Instructional Design',
-            'Instructional Design Department',
-            'InstructionalDesign',
-            'Instructional_Design',
-            'ID',
-            'ID Department'
-        ]
-        
-        department_ids = []
-        found_name = None
-        
-        for name in possible_names:
-            department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                             [[('name', '=', name)]])
-            if department_ids:
-                found_name = name
-                break
-        
-        # If exact match not found, try partial match
-        if not department_ids:
-            department_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'search', 
-                                             [[('name', 'ilike', 'Instructional')]])
-            if department_ids:
-                # Get the department names to see what we found
-                dept_details = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.department', 'read', 
-                                               [department_ids], {'fields': ['name']})
-                found_names = [dept['name'] for dept in dept_details]
-                print(f"Found departments with 'Instructional' in name: {found_names}")
-                found_name = found_names[0] if found_names else None
-        
-        if not department_ids:
-            print("No Instructional Design department found with any of the possible names")
-            print(f"Tried names: {possible_names}")
+        if not snapshot.has_department('Instructional Design'):
+            print("No Instructional Design department found for resources")
             return []
         
-        print(f"Found Instructional Design department with ID: {department_ids}, name: '{found_name}'")
+        print(f"Instructional Design department IDs: {snapshot.department_ids['Instructional Design']}")
+        
+        # Instructional Design department employees with their tags
+        employees_data = snapshot.employees('Instructional Design')
+        instructional_design_employee_ids = snapshot.employee_ids('Instructional Design')
         
-        # Get all Instructional Design department employees
-        instructional_design_employee_ids = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'search', 
-                                                           [[('department_id', 'in', department_ids)]])
+        print(f"Found {len(instructional_design_employee_ids)} Instructional Design employees")
         
         if not instructional_design_employee_ids:
             print("No Instructional Design employees found")
             return []
         
-        # Get employee details with tags
-        employees_data = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee', 'read', 
-                                         [instructional_design_employee_ids], {
-                                             'fields': [
-                                                 'id', 
-                                                 'name', 
-                                                 'job_title', 
-                                                 'category_ids'
-                                             ]
-                                         })
-        
-        # Batch fetch all unique category IDs for tags
-        all_category_ids = set()
-        for emp in employees_data:
-            if emp.get('category_ids'):
-                all_category_ids.update(emp['category_ids'])
-        
-        # Fetch all categories in one batch call
-        categories_dict = {}
-        if all_category_ids:
-            try:
-                categories = models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, 'hr.employee.category', 'read', 
-                                             [list(all_category_ids)], {'fields': ['name']})
-                categories_dict = {cat['id']: cat['name'] for cat in categories if cat.get('name')}
-                print(f"Fetched {len(categories_dict)} unique categories for Instructional Design available resources")
-            except Exception as e:
-                print(f"Error fetching categories for Instructional Design available resources: {e}")
+        categories_dict = snapshot.categories
         
         # Create a dictionary to store employee availability data
         employee_availability = {}
@@ -5305,40 +6542,17 @@ def get_available_instructional_design_resources(view_type='monthly', period=Non
         # Calculate Time Off hours for each employee
         print("Calculating Time Off hours for Instructional Design...")
         
-        # Convert dates to string format for Odoo timesheet queries
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        
-        # Fetch timesheet entries for Time Off tasks
-        time_off_timesheets = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'account.analytic.line', 'search_read',
-            [[('employee_id', 'in', instructional_design_employee_ids),
-              ('date', '>=', start_str),
-              ('date', '<=', end_str),
-              ('task_id.name', '=', 'Time Off')]],
-            {'fields': ['employee_id', 'unit_amount']}
-        )
-        
-        print(f"Found {len(time_off_timesheets)} Time Off timesheet entries for Instructional Design")
+        # Time Off hours per employee (one read_group for the whole snapshot)
+        _, employee_time_off = snapshot.work_and_time_off_hours()
         
-        # Calculate total Time Off hours per employee
-        employee_time_off = {}
-        for ts in time_off_timesheets:
-            emp_field = ts.get('employee_id')
-            if emp_field:
-                emp_id = emp_field[0] if isinstance(emp_field, list) else emp_field
-                if emp_id not in employee_time_off:
-                    employee_time_off[emp_id] = 0
-                employee_time_off[emp_id] += float(ts.get('unit_amount', 0))
+        print(f"Found Time Off hours for {len(employee_time_off)} employees for Instructional Design")
         
         # Update employee availability with Time Off hours and per-employee public holidays
         for emp_id, time_off_hours in employee_time_off.items():
             if emp_id in employee_availability:
                 employee_availability[emp_id]['time_off_hours'] = time_off_hours
-                # Deduct both time off and per-employee public holidays from available hours
-                emp_holiday = float(employee_holiday_hours.get(emp_id) or 0.0)
-                employee_availability[emp_id]['available_hours'] = base_available_hours - time_off_hours - emp_holiday
+                # Deduct both time off and public holidays from available hours
+                employee_availability[emp_id]['available_hours'] = base_available_hours - time_off_hours - total_holiday_hours
                 print(f"Instructional Design employee {employee_availability[emp_id]['name']}: {time_off_hours:.1f}h Time Off, {total_holiday_hours:.1f}h Public Holidays, {employee_availability[emp_id]['available_hours']:.1f}h available")
         
         # For employees without time off, still deduct public holidays
@@ -5355,19 +6569,14 @@ def get_available_instructional_design_resources(view_type='monthly', period=Non
         print(f"Searching planning slots for Instructional Design from {start_str} to {end_str}")
         print(f"Looking for planning slots for {len(instructional_design_employee_ids)} Instructional Design employees")
         
-        # First, let's check if there are any planning slots at all for these employees
-        all_slots = execute_odoo_call_with_retry(models, uid, 'planning.slot', 'search', 
-                                       [[('resource_id', 'in', instructional_design_employee_ids)]], 
-                                       {'limit': 1000})
-        print(f"Total planning slots found for Instructional Design employees (any date): {len(all_slots)}")
+        # Planning slots overlapping the period, fetched once for the whole snapshot;
+        # only slots that lie fully inside the period are counted here
+        all_slots = snapshot.planning_slots()
+        print(f"Planning slots overlapping the period for the snapshot: {len(all_slots)}")
         
         if all_slots:
-            # Fetch planning slots for the specific date range
-            planning_slots = execute_odoo_call_with_retry(models, uid, 'planning.slot', 'search_read',
-                                               [[('resource_id', 'in', instructional_design_employee_ids),
-                                                 ('start_datetime', '>=', start_str),
-                                                 ('end_datetime', '<=', end_str)]],
-                                               {'fields': ['resource_id', 'allocated_hours', 'allocated_percentage']})
+            planning_slots = [slot for slot in all_slots
+                              if slot.get('start_datetime', '') >= start_str and slot.get('end_datetime', '') <= end_str]
             
             print(f"Found {len(planning_slots)} planning slots for Instructional Design in date range")
             
@@ -5938,11 +7147,72 @@ def api_sales_order_hours():
     except Exception as e:
         print(f"Error in /api/sales-order-hours: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
+
+# Serialized responses: final JSON bytes plus gzip/brotli variants and a strong ETag, cached
+# under a key describing the cached data they were built from (so a hit skips serialization)
+RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '3600'))
+cache_store.namespace('responses', RESPONSE_CACHE_TTL_SECONDS)
+
+def encode_json_response(payload):
+    """Serialize once (same format as jsonify) and pre-compress; the ETag is the body's content hash."""
+    body = app.json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    encoded = {
+        'etag': hashlib.sha256(body).hexdigest()[:32],
+        'identity': body,
+        'gzip': gzip.compress(body, compresslevel=6)
+    }
+    if brotli is not None:
+        encoded['br'] = brotli.compress(body, quality=5)
+    return encoded
+
+def send_encoded_response(encoded):
+    """
+    Serve an encode_json_response() result: 304 for a matching If-None-Match, else the best encoding.
+    This request's Odoo read stats go in the X-Odoo-Reads header, never in the (cached) body.
+    """
+    etag = encoded['etag']
+    # Quality-aware: "br;q=0" refuses brotli
+    accepted = request.accept_encodings
+    encoding = 'identity'
+    if 'br' in encoded and accepted['br'] > 0:
+        encoding = 'br'
+    elif accepted['gzip'] > 0:
+        encoding = 'gzip'
+    # Each encoding is a different representation, so it gets its own strong validator
+    tag = etag if encoding == 'identity' else f"{etag}-{encoding}"
+    if any(request.if_none_match.contains_weak(candidate) for candidate in (etag, f"{etag}-gzip", f"{etag}-br")):
+        response = Response(status=304)
+    else:
+        response = Response(encoded[encoding], mimetype='application/json')
+        if encoding != 'identity':
+            # Also tells Flask-Compress not to compress the body again
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(tag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    odoo_reads = get_odoo_read_memo_stats()
+    if odoo_reads is not None:
+        response.headers['X-Odoo-Reads'] = f"hits={odoo_reads['hits']}, misses={odoo_reads['misses']}"
+    return response
+
+def cached_json_response(version_key, build_payload):
+    """
+    Respond with the payload built by build_payload(), reusing the serialized/compressed bytes
+    stored under version_key when present. Pass version_key=None for uncacheable payloads.
+    """
+    encoded = cache_store.get('responses', version_key) if version_key is not None else None
+    if encoded is None:
+        encoded = encode_json_response(build_payload())
+        if version_key is not None:
+            cache_store.set('responses', version_key, encoded)
+    return send_encoded_response(encoded)
+
 @app.route('/api/all-departments-data', methods=['GET'])
 def all_departments_data():
     """
-    Fetch data for all departments (Creative and Creative Strategy) in a single call.
-    Uses caching and parallel processing to optimize performance.
+    Fetch data for all departments (Creative, Creative Strategy and Instructional Design) in a single call.
+    Uses caching, one shared DepartmentSnapshot for every department that needs fresh data,
+    and parallel processing to optimize performance.
     """
     try:
         period = request.args.get('period')
@@ -5969,7 +7239,28 @@ def all_departments_data():
         def dept_key_name(name):
             return 'creative' if name == 'Creative' else 'creative_strategy' if name == 'Creative Strategy' else 'instructional_design'
 
+        requested_keys = [dept_key_name(name) for name in ([selected_department] if selected_department else valid_departments)]
+        record_department_access(requested_keys, period, view_type, include)
+        prefetch_adjacent_periods(requested_keys, period, view_type)
+
+        shared = {'snapshot': None}
+
+        def build_shared_snapshot(department_names):
+            """Fetch Odoo data once for every department that needs fresh sections."""
+            if not department_names:
+                return
+            try:
+                shared['snapshot'] = build_department_snapshot(period, view_type, department_names)
+            except Exception as e:
+                print(f"Could not build shared department snapshot, departments will fetch separately: {e}")
+
+        def snapshot_for(name):
+            snapshot = shared['snapshot']
+            return snapshot if snapshot is not None and name in snapshot.department_ids else None
+
         def dept_functions(name):
+            if snapshot_for(name) is not None:
+                return department_section_functions(name, snapshot_for(name))
             if name == 'Creative':
                 return {
                     'employees': lambda: get_creative_employees(),
@@ -5998,40 +7289,70 @@ def all_departments_data():
             result = {}
             departments_to_process = [selected_department] if selected_department else list(valid_departments)
             cache_only = True
+
+            def section_missing(existing):
+                return (existing is None) or (isinstance(existing, (list, dict)) and len(existing) == 0)
+
+            cached_objects = {}
+            cached_timestamps = []
+            any_stale = False
+            for dept_name in departments_to_process:
+                cached_obj, stored_at, is_stale = get_cached_entry(dept_key_name(dept_name), period, view_type)
+                cached_objects[dept_name] = dict(cached_obj) if cached_obj else {}
+                if stored_at is not None:
+                    cached_timestamps.append(stored_at)
+                    any_stale = any_stale or is_stale
+
+            # Everything requested is already cached: the response is fully determined by the
+            # cache entries' timestamps, so a previously serialized copy can be sent as-is
+            response_key = None
+            if not any(section_missing(cached_objects[dept_name].get(part))
+                       for dept_name in departments_to_process for part in include):
+                response_key = ('all-departments-data', period, view_type, tuple(sorted(include)),
+                                selected_department, tuple(cached_timestamps), any_stale)
+                cached_response = cache_store.get('responses', response_key)
+                if cached_response is not None:
+                    return send_encoded_response(cached_response)
+            build_shared_snapshot([dept_name for dept_name in departments_to_process
+                                   if any(section_missing(cached_objects[dept_name].get(part)) for part in include)])
+
             for dept_name in departments_to_process:
                 key = dept_key_name(dept_name)
-                cached_obj = get_cached_data(key, period, view_type) or {}
-                out_obj = dict(cached_obj) if cached_obj else {}
+                out_obj = cached_objects[dept_name]
                 funcs = dept_functions(dept_name)
+                dept_changed = False
                 for part in include:
-                    existing = out_obj.get(part)
-                    missing = (existing is None) or (isinstance(existing, (list, dict)) and len(existing) == 0)
+                    missing = section_missing(out_obj.get(part))
                     if missing:
                         try:
                             out_obj[part] = funcs[part]()
                             cache_only = False
+                            dept_changed = True
                         except Exception as e:
                             print(f"Error computing {part} for {dept_name}: {e}")
                 # Ensure team_utilization is populated; if empty, fall back to sequential aggregator
                 if 'team_utilization' in include and not bool(out_obj.get('team_utilization')):
                     try:
-                        fallback = fetch_department_data_sequential(dept_name, period, view_type)
+                        fallback = fetch_department_data_sequential(dept_name, period, view_type, snapshot_for(dept_name))
                         if fallback and bool(fallback.get('team_utilization')):
                             out_obj['team_utilization'] = fallback['team_utilization']
                             cache_only = False
+                            dept_changed = True
                     except Exception as _e:
                         pass
                 if out_obj:
-                    set_cached_data(key, out_obj, period, view_type)
+                    # Re-storing untouched cached data would make a stale entry look fresh
+                    if dept_changed:
+                        set_cached_data(key, out_obj, period, view_type)
                     result[key] = out_obj
-            result['cached'] = cache_only
-            result['cache_timestamp'] = time.time()
-            return jsonify(result)
+            result['cached'] = 'stale' if (cache_only and any_stale) else cache_only
+            result['cache_timestamp'] = min(cached_timestamps) if (cache_only and cached_timestamps) else time.time()
+            return cached_json_response(response_key if cache_only else None, lambda: result)
 
-        # Check cache first (full payload path)
-        cached_creative = get_cached_data('creative', period, view_type)
-        cached_creative_strategy = get_cached_data('creative_strategy', period, view_type)
-        cached_instructional_design = get_cached_data('instructional_design', period, view_type)
+        # Check cache first (full payload path); stale entries are served while they revalidate
+        cached_creative, creative_ts, creative_stale = get_cached_entry('creative', period, view_type)
+        cached_creative_strategy, creative_strategy_ts, creative_strategy_stale = get_cached_entry('creative_strategy', period, view_type)
+        cached_instructional_design, instructional_design_ts, instructional_design_stale = get_cached_entry('instructional_design', period, view_type)
         
         print(f"Cache check - Creative: {'cached' if cached_creative else 'not cached'}")
         print(f"Cache check - Creative Strategy: {'cached' if cached_creative_strategy else 'not cached'}")
@@ -6040,51 +7361,69 @@ def all_departments_data():
         # If all are cached and valid, return cached data
         if cached_creative is not None and cached_creative_strategy is not None and cached_instructional_design is not None:
             print(f"Returning cached data for period: {period}, view_type: {view_type}")
-            # Get the cache timestamp for this specific request
-            cache_key = f"{period}_{view_type}" if period else f"default_{view_type}"
-            cache_timestamp = department_cache['cache_timestamps'].get(cache_key, time.time())
+            # Report the oldest entry served, and whether any of them is stale
+            cache_timestamp = min(creative_ts, creative_strategy_ts, instructional_design_ts)
+            any_stale = creative_stale or creative_strategy_stale or instructional_design_stale
+            response_key = ('all-departments-data', period, view_type, 'full',
+                            creative_ts, creative_strategy_ts, instructional_design_ts, any_stale)
+            cached_response = cache_store.get('responses', response_key)
+            if cached_response is not None:
+                return send_encoded_response(cached_response)
             
             # Safety: ensure core fields are populated for each department
             def _ensure_department_fields(dept_key, dept_name, data_obj):
+                """(data, changed, failed): fills missing fields on a copy so the cached entry is never mutated."""
+                if not data_obj:
+                    return data_obj, False, False
+                needs_employees = len(data_obj.get('employees') or []) == 0
+                needs_resources = len(data_obj.get('available_resources') or []) == 0
+                needs_timesheets = len(data_obj.get('timesheet_data') or []) == 0
+                needs_util = not bool(data_obj.get('team_utilization'))
+                if not (needs_employees or needs_resources or needs_timesheets or needs_util):
+                    return data_obj, False, False
                 try:
-                    if not data_obj:
-                        return data_obj
-                    needs_employees = len(data_obj.get('employees') or []) == 0
-                    needs_resources = len(data_obj.get('available_resources') or []) == 0
-                    needs_timesheets = len(data_obj.get('timesheet_data') or []) == 0
-                    needs_util = not bool(data_obj.get('team_utilization'))
-                    if not (needs_employees or needs_resources or needs_timesheets or needs_util):
-                        return data_obj
                     fetched = fetch_department_data_sequential(dept_name, period, view_type)
-                    if not fetched:
-                        return data_obj
-                    if needs_employees and len(fetched.get('employees') or []) > 0:
-                        data_obj['employees'] = fetched['employees']
-                    if needs_resources and len(fetched.get('available_resources') or []) > 0:
-                        data_obj['available_resources'] = fetched['available_resources']
-                    if needs_timesheets and len(fetched.get('timesheet_data') or []) > 0:
-                        data_obj['timesheet_data'] = fetched['timesheet_data']
-                    if needs_util and bool(fetched.get('team_utilization')):
-                        data_obj['team_utilization'] = fetched['team_utilization']
-                    set_cached_data(dept_key, data_obj, period, view_type)
                 except Exception:
-                    pass
-                return data_obj
-
-            cached_creative = _ensure_department_fields('creative', 'Creative', cached_creative)
-            cached_creative_strategy = _ensure_department_fields('creative_strategy', 'Creative Strategy', cached_creative_strategy)
-            cached_instructional_design = _ensure_department_fields('instructional_design', 'Instructional Design', cached_instructional_design)
-            
-            return jsonify({
+                    fetched = None
+                if not fetched:
+                    return data_obj, False, True
+                filled = dict(data_obj)
+                if needs_employees and len(fetched.get('employees') or []) > 0:
+                    filled['employees'] = fetched['employees']
+                if needs_resources and len(fetched.get('available_resources') or []) > 0:
+                    filled['available_resources'] = fetched['available_resources']
+                if needs_timesheets and len(fetched.get('timesheet_data') or []) > 0:
+                    filled['timesheet_data'] = fetched['timesheet_data']
+                if needs_util and bool(fetched.get('team_utilization')):
+                    filled['team_utilization'] = fetched['team_utilization']
+                changed = any(filled[key] is not data_obj.get(key) for key in filled)
+                failed = any(len(filled.get(key) or []) == 0 for key in ('employees', 'available_resources', 'timesheet_data')) \
+                    or not bool(filled.get('team_utilization'))
+                if changed:
+                    set_cached_data(dept_key, filled, period, view_type)
+                return filled, changed, failed
+
+            cached_creative, creative_changed, creative_failed = _ensure_department_fields('creative', 'Creative', cached_creative)
+            cached_creative_strategy, creative_strategy_changed, creative_strategy_failed = _ensure_department_fields('creative_strategy', 'Creative Strategy', cached_creative_strategy)
+            cached_instructional_design, instructional_design_changed, instructional_design_failed = _ensure_department_fields('instructional_design', 'Instructional Design', cached_instructional_design)
+            # The response key names the served cache timestamps, so only cache a payload that matches them
+            cacheable = not any((creative_changed, creative_failed, creative_strategy_changed, creative_strategy_failed,
+                                 instructional_design_changed, instructional_design_failed))
+            
+            return cached_json_response(response_key if cacheable else None, lambda: {
                 'creative': cached_creative,
                 'creative_strategy': cached_creative_strategy,
                 'instructional_design': cached_instructional_design,
-                'cached': True,
+                'cached': 'stale' if any_stale else True,
                 'cache_timestamp': cache_timestamp
             })
         
-        # Fetch data for departments that aren't cached using parallel processing
+        # Fetch data for departments that aren't cached from one shared snapshot
         result = {}
+        build_shared_snapshot([name for name, cached in (('Creative', cached_creative),
+                                                          ('Creative Strategy', cached_creative_strategy),
+                                                          ('Instructional Design', cached_instructional_design))
+                               if cached is None])
         
         # Use parallel processing for departments that need fresh data
         if not ENABLE_PARALLEL_PROCESSING:
@@ -6092,9 +7431,8 @@ def all_departments_data():
             # Fetch data sequentially
             if cached_creative is None:
                 print(f"Fetching Creative department data for period: {period}")
-                creative_data = fetch_department_data_sequential('Creative', period, view_type)
+                creative_data = fetch_department_data_sequential('Creative', period, view_type, snapshot_for('Creative'))
                 if creative_data:
-                    set_cached_data('creative', creative_data, period, view_type)
                     result['creative'] = creative_data
                 else:
                     # Fallback to original methods
@@ -6109,9 +7447,8 @@ def all_departments_data():
             
             if cached_creative_strategy is None:
                 print(f"Fetching Creative Strategy department data for period: {period}")
-                creative_strategy_data = fetch_department_data_sequential('Creative Strategy', period, view_type)
+                creative_strategy_data = fetch_department_data_sequential('Creative Strategy', period, view_type, snapshot_for('Creative Strategy'))
                 if creative_strategy_data:
-                    set_cached_data('creative_strategy', creative_strategy_data, period, view_type)
                     result['creative_strategy'] = creative_strategy_data
                 else:
                     # Fallback to original methods
@@ -6126,9 +7463,8 @@ def all_departments_data():
             
             if cached_instructional_design is None:
                 print(f"Fetching Instructional Design department data for period: {period}")
-                instructional_design_data = fetch_department_data_sequential('Instructional Design', period, view_type)
+                instructional_design_data = fetch_department_data_sequential('Instructional Design', period, view_type, snapshot_for('Instructional Design'))
                 if instructional_design_data:
-                    set_cached_data('instructional_design', instructional_design_data, period, view_type)
                     result['instructional_design'] = instructional_design_data
                 else:
                     # Fallback to original methods
@@ -6159,23 +7495,21 @@ def all_departments_data():
                     key = 'creative' if dept_name == 'Creative' else 'creative_strategy' if dept_name == 'Creative Strategy' else 'instructional_design'
                     if locals().get(f"cached_{key}") is None:
                         print(f"Fetching {dept_name} department data for period: {period}")
-                        futures[key] = executor.submit(fetch_department_data_parallel, dept_name, period, view_type)
+                        futures[key] = submit_with_odoo_context(executor, fetch_department_data_parallel, dept_name, period, view_type, snapshot_for(dept_name))
                 
                 # Wait for all parallel operations to complete
                 for department, future in futures.items():
                     try:
                         data = future.result(timeout=REQUEST_TIMEOUT)
                         if data:
-                            set_cached_data(department, data, period, view_type)
                             result[department] = data
                             print(f"Successfully fetched {department} data using parallel processing")
                         else:
                             # Fallback to sequential method if parallel fetch fails
                             print(f"Parallel fetch failed for {department}, falling back to sequential method")
                             proper_department_name = get_proper_department_name(department)
-                            fallback_data = fetch_department_data_sequential(proper_department_name, period, view_type)
+                            fallback_data = fetch_department_data_sequential(proper_department_name, period, view_type, snapshot_for(proper_department_name))
                             if fallback_data:
-                                set_cached_data(department, fallback_data, period, view_type)
                                 result[department] = fallback_data
                                 print(f"Successfully fetched {department} data using sequential method")
                             else:
@@ -6188,25 +7522,27 @@ def all_departments_data():
                                         'timesheet_data': get_creative_timesheet_data(period, view_type),
                                         'available_resources': get_available_creative_resources(view_type, period)
                                     }
+                                    set_cached_data(department, fallback_data, period, view_type)
                                 else:
                                     proper_department_name = get_proper_department_name(department)
                                     # Use sequential aggregator for all non-creative departments to keep logic unified
-                                    fallback_data = fetch_department_data_sequential(proper_department_name, period, view_type) or {
-                                        'employees': get_creative_strategy_employees(),
-                                        'team_utilization': get_creative_strategy_team_utilization_data(period, view_type),
-                                        'timesheet_data': get_creative_strategy_timesheet_data(period, view_type),
-                                        'available_resources': get_available_creative_strategy_resources(view_type, period)
-                                    }
-                                set_cached_data(department, fallback_data, period, view_type)
+                                    fallback_data = fetch_department_data_sequential(proper_department_name, period, view_type)
+                                    if not fallback_data:
+                                        fallback_data = {
+                                            'employees': get_creative_strategy_employees(),
+                                            'team_utilization': get_creative_strategy_team_utilization_data(period, view_type),
+                                            'timesheet_data': get_creative_strategy_timesheet_data(period, view_type),
+                                            'available_resources': get_available_creative_strategy_resources(view_type, period)
+                                        }
+                                        set_cached_data(department, fallback_data, period, view_type)
                                 result[department] = fallback_data
                     except Exception as e:
                         print(f"Error in parallel fetch for {department}: {e}")
                         # Fallback to sequential method
                         print(f"Trying sequential method for {department}")
                         proper_department_name = get_proper_department_name(department)
-                        fallback_data = fetch_department_data_sequential(proper_department_name, period, view_type)
+                        fallback_data = fetch_department_data_sequential(proper_department_name, period, view_type, snapshot_for(proper_department_name))
                         if fallback_data:
-                            set_cached_data(department, fallback_data, period, view_type)
                             result[department] = fallback_data
                             print(f"Successfully fetched {department} data using sequential method")
                         else:
@@ -6265,9 +7601,11 @@ def all_departments_data():
                 needs_util = not bool(data_obj.get('team_utilization'))
                 if not (needs_employees or needs_resources or needs_timesheets or needs_util):
                     return
-                fetched = fetch_department_data_sequential(dept_name, period, view_type)
+                fetched = fetch_department_data_sequential(dept_name, period, view_type, snapshot_for(dept_name))
                 if not fetched:
                     return
+                # Fill a copy: data_obj may be the dict held in the cache
+                data_obj = dict(data_obj)
                 if needs_employees and len(fetched.get('employees') or []) > 0:
                     data_obj['employees'] = fetched['employees']
                 if needs_resources and len(fetched.get('available_resources') or []) > 0:
@@ -6295,12 +7633,220 @@ def all_departments_data():
         print(f"Creative Strategy data available: {'yes' if 'creative_strategy' in result else 'no'}")
         print(f"Instructional Design data available: {'yes' if 'instructional_design' in result else 'no'}")
         
-        return jsonify(result)
+        # Freshly computed: not reusable, but still served pre-compressed with an ETag
+        return cached_json_response(None, lambda: result)
         
     except Exception as e:
         print(f"Error fetching all departments data: {e}")
         return jsonify({'error': str(e)}), 500
 
+# Utilization trend: team utilization for many periods in one request. The hours cubes of the combined
+# date range are built first (one timesheet read_group and one planning.slot fetch for consecutive
+# missing months), so each period's stats are then computed in memory.
+UTILIZATION_TREND_MAX_PERIODS = int(os.environ.get('UTILIZATION_TREND_MAX_PERIODS', '60'))
+TEAM_UTILIZATION_FUNCTIONS = {
+    'Creative': get_team_utilization_data,
+    'Creative Strategy': get_creative_strategy_team_utilization_data,
+    'Instructional Design': get_instructional_design_team_utilization_data
+}
+
+def period_for_date(day, view_type='monthly'):
+    """The monthly ('YYYY-MM'), weekly ('YYYY-WW') or daily ('YYYY-DDD') period containing day."""
+    if view_type == 'weekly':
+        return _week_period_for_date(day)
+    if view_type == 'daily':
+        return f"{day.year}-{day.timetuple().tm_yday:03d}"
+    return day.strftime('%Y-%m')
+
+PERIOD_REGEXES = {
+    'monthly': re.compile(r"\d{4}-\d{2}"),
+    'weekly': re.compile(r"\d{4}-\d{2}"),
+    'daily': re.compile(r"\d{4}-\d{3}")
+}
+
+def is_valid_period(period, view_type='monthly'):
+    """
+    True for a well-formed period that exists: a month 01-12 ('YYYY-MM'), a week whose Sunday falls
+    in the year ('YYYY-WW') or a day of the year ('YYYY-DDD'). get_date_range() silently falls back to
+    a default period on bad input, so anything that does not round-trip through it is rejected.
+    """
+    if not isinstance(period, str) or not PERIOD_REGEXES[view_type].fullmatch(period):
+        return False
+    year, number = map(int, period.split('-'))
+    if year < 1 or number < 1:
+        return False
+    try:
+        start_date, _ = get_date_range(view_type, period)
+    except (ValueError, OverflowError):
+        return False
+    return period_for_date(start_date, view_type) == period
+
+def invalid_periods_response(periods, view_type):
+    """A 400 response naming the malformed or out-of-range periods, or None when all are valid."""
+    invalid = [period for period in periods if not is_valid_period(period, view_type)]
+    if not invalid:
+        return None
+    expected = {'monthly': 'YYYY-MM', 'weekly': 'YYYY-WW', 'daily': 'YYYY-DDD'}[view_type]
+    return jsonify({'error': f"Invalid {view_type} period(s) {', '.join(invalid)}: expected {expected}"}), 400
+
+def periods_between(start_period, end_period, view_type='monthly'):
+    """Consecutive periods from start_period through end_period (at most UTILIZATION_TREND_MAX_PERIODS)."""
+    day, _ = get_date_range(view_type, start_period)
+    last_start, _ = get_date_range(view_type, end_period)
+    periods = []
+    while day <= last_start and len(periods) < UTILIZATION_TREND_MAX_PERIODS:
+        period = period_for_date(day, view_type)
+        if not periods or periods[-1] != period:
+            periods.append(period)
+        _, period_end = get_date_range(view_type, period)
+        day = max(period_end, day) + datetime.timedelta(days=1)
+    return periods
+
+def trailing_periods(count, view_type='monthly'):
+    """The last `count` periods up to and including the current one."""
+    count = max(1, min(count, UTILIZATION_TREND_MAX_PERIODS))
+    today = datetime.date.today()
+    if view_type == 'monthly':
+        first = today - relativedelta(months=count - 1)
+    elif view_type == 'weekly':
+        first = today - datetime.timedelta(weeks=count - 1)
+    else:
+        first = today - datetime.timedelta(days=count - 1)
+    return periods_between(period_for_date(first, view_type), period_for_date(today, view_type), view_type)
+
+def compute_utilization_trend(periods, view_type='monthly', department_names=DASHBOARD_DEPARTMENTS, include_employees=False):
+    """{period: {department: team utilization}} for many periods from one prefetch of their combined range."""
+    models, uid = connect_to_odoo()
+    if not models or not uid:
+        raise Exception("Could not connect to Odoo")
+    ranges = [get_date_range(view_type, period) for period in periods]
+    get_hours_cubes(models, uid, min(start for start, _ in ranges), max(end for _, end in ranges))
+    trend = {}
+    for period in periods:
+        snapshot = DepartmentSnapshot(models, uid, period, view_type, department_names)
+        trend[period] = {}
+        for name in department_names:
+            teams = TEAM_UTILIZATION_FUNCTIONS[name](period, view_type, snapshot=snapshot) or {}
+            if not include_employees:
+                teams = {team: {key: value for key, value in stats.items() if key != 'employees'}
+                         for team, stats in teams.items()}
+            trend[period][name] = teams
+    return trend
+
+@app.route('/api/utilization-trend', methods=['GET'])
+def utilization_trend():
+    """
+    Team utilization for several periods in one call.
+
+    Query: view_type, and either periods=P1,P2,... or start=P&end=P or last=N (trailing periods);
+    optional selected_department and include_employees=true.
+    """
+    try:
+        view_type = request.args.get('view_type', 'monthly')
+        if view_type not in ('monthly', 'weekly', 'daily'):
+            return jsonify({'error': f"Unsupported view_type '{view_type}'"}), 400
+        if request.args.get('periods'):
+            periods = [p.strip() for p in request.args['periods'].split(',') if p.strip()][:UTILIZATION_TREND_MAX_PERIODS]
+            error = invalid_periods_response(periods, view_type)
+            if error:
+                return error
+        elif request.args.get('start') and request.args.get('end'):
+            error = invalid_periods_response([request.args['start'], request.args['end']], view_type)
+            if error:
+                return error
+            periods = periods_between(request.args['start'], request.args['end'], view_type)
+        else:
+            last = request.args.get('last', '12')
+            if not last.isdecimal() or int(last) < 1:
+                return jsonify({'error': f"Invalid last '{last}': expected a positive number of periods"}), 400
+            periods = trailing_periods(int(last), view_type)
+        if not periods:
+            return jsonify({'error': 'No periods requested'}), 400
+
+        selected_department = request.args.get('selected_department')
+        department_names = [selected_department] if selected_department in DASHBOARD_DEPARTMENTS else list(DASHBOARD_DEPARTMENTS)
+        include_employees = request.args.get('include_employees', 'false').lower() in ('1', 'true', 'yes')
+
+        trend = compute_utilization_trend(periods, view_type, department_names, include_employees)
+        return cached_json_response(None, lambda: {
+            'success': True,
+            'view_type': view_type,
+            'periods': periods,
+            'data': trend
+        })
+    except Exception as e:
+        print(f"Error computing utilization trend: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def previous_period(period, view_type='monthly'):
+    """The period immediately before `period` (the one containing the day before it starts)."""
+    start_date, _ = get_date_range(view_type, period)
+    return period_for_date(start_date - datetime.timedelta(days=1), view_type)
+
+def utilization_deltas(current, previous):
+    """current - previous for every numeric team stat present in both, per department and team."""
+    deltas = {}
+    for name, teams in current.items():
+        deltas[name] = {}
+        for team, stats in teams.items():
+            before = (previous.get(name) or {}).get(team) or {}
+            deltas[name][team] = {
+                key: round(value - before[key], 2)
+                for key, value in stats.items()
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+                and isinstance(before.get(key), (int, float)) and not isinstance(before.get(key), bool)
+            }
+    return deltas
+
+def compute_utilization_comparison(period, compare_period=None, view_type='monthly', department_names=DASHBOARD_DEPARTMENTS, include_employees=False):
+    """
+    Team utilization of `period` against `compare_period` (default: the previous period) with deltas.
+
+    Both periods go through compute_utilization_trend, so the union of their date ranges is fetched
+    once into the hours cubes and each window is aggregated from that single result set.
+    """
+    compare_period = compare_period or previous_period(period, view_type)
+    trend = compute_utilization_trend([compare_period, period], view_type, department_names, include_employees)
+    return {
+        'period': period,
+        'compare_period': compare_period,
+        'current': trend[period],
+        'previous': trend[compare_period],
+        'deltas': utilization_deltas(trend[period], trend[compare_period])
+    }
+
+@app.route('/api/utilization-comparison', methods=['GET'])
+def utilization_comparison():
+    """
+    Team utilization of one period against another (default: the previous period), with deltas.
+
+    Query: view_type, period (default: the current period), optional compare_period,
+    selected_department and include_employees=true.
+    """
+    try:
+        view_type = request.args.get('view_type', 'monthly')
+        if view_type not in ('monthly', 'weekly', 'daily'):
+            return jsonify({'error': f"Unsupported view_type '{view_type}'"}), 400
+        period = request.args.get('period') or period_for_date(datetime.date.today(), view_type)
+        compare_period = request.args.get('compare_period')
+        error = invalid_periods_response([period] + ([compare_period] if compare_period else []), view_type)
+        if error:
+            return error
+
+        selected_department = request.args.get('selected_department')
+        department_names = [selected_department] if selected_department in DASHBOARD_DEPARTMENTS else list(DASHBOARD_DEPARTMENTS)
+        include_employees = request.args.get('include_employees', 'false').lower() in ('1', 'true', 'yes')
+
+        comparison = compute_utilization_comparison(period, compare_period, view_type, department_names, include_employees)
+        return cached_json_response(None, lambda: {
+            'success': True,
+            'view_type': view_type,
+            **comparison
+        })
+    except Exception as e:
+        print(f"Error computing utilization comparison: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/refresh-cache', methods=['POST'])
 def refresh_cache():
     """
@@ -6339,8 +7885,7 @@ def refresh_cache():
         set_cached_data('instructional_design', instructional_design_data, period, view_type)
         
         # Get the cache timestamp for this specific request
-        cache_key = f"{period}_{view_type}" if period else f"default_{view_type}"
-        cache_timestamp = department_cache['cache_timestamps'].get(cache_key, time.time())
+        cache_timestamp = get_cached_timestamp('instructional_design', period, view_type) or time.time()
         
         return jsonify({
             'message': 'Cache refreshed successfully',
@@ -6394,7 +7939,11 @@ def performance_metrics():
         connection_status = {
             'has_cached_connection': _odoo_connection_pool['models'] is not None,
             'last_used': _odoo_connection_pool['last_used'],
-            'connection_age': time.time() - _odoo_connection_pool['last_used'] if _odoo_connection_pool['last_used'] else None
+            'connection_age': time.time() - _odoo_connection_pool['last_used'] if _odoo_connection_pool['last_used'] else None,
+            'pool': get_odoo_pool_stats(),
+            'executor': get_odoo_executor_stats(),
+            'read_memo': get_odoo_read_memo_totals(),
+            'single_flight': get_single_flight_stats()
         }
         
         return jsonify({
@@ -7504,5 +9053,28 @@ def external_hours_endpoint():
         print(f"Error in /api/external-hours: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Background threads start once the whole module is defined, so their first run can use
+# everything above (they would otherwise race the rest of the import)
+_background_threads_started = False
+
+def start_background_threads():
+    """Start the cache sweeper, cache warmer, change detection and timesheet mirror threads (once)."""
+    global _background_threads_started
+    if _background_threads_started:
+        return
+    _background_threads_started = True
+    threading.Thread(target=_cache_sweeper_loop, daemon=True, name='cache-sweeper').start()
+    atexit.register(_cache_sweep_stop.set)
+    start_cache_warmer()
+    atexit.register(stop_cache_warmer)
+    if CHANGE_DETECTION_INTERVAL_SECONDS > 0:
+        threading.Thread(target=_change_detection_loop, daemon=True, name='odoo-change-detection').start()
+        atexit.register(_change_detection_stop.set)
+    if TIMESHEET_MIRROR_PATH:
+        threading.Thread(target=_timesheet_mirror_loop, daemon=True, name='timesheet-mirror').start()
+        atexit.register(_timesheet_mirror_stop.set)
+
+start_background_threads()
+
 if __name__ == '__main__':
     app.run(debug=False, host='0.0.0.0', port=5000) 
\ No newline at end of file
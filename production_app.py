@@ -24,6 +24,14 @@ for rule in app.url_map.iter_rules():
                 methods=rule.methods
             )
 
+# Copy request hooks (e.g. per-request Odoo deadlines) from your existing app
+for hook in app.before_request_funcs.get(None, []):
+    production_app.before_request(hook)
+for hook in app.after_request_funcs.get(None, []):
+    production_app.after_request(hook)
+for hook in app.teardown_request_funcs.get(None, []):
+    production_app.teardown_request(hook)
+
 @production_app.route('/')
 def serve_react_app():
     """Serve the React application"""